@@ -119,6 +119,12 @@ class APCI(PCI, DebugContents):
         , 'apduService', 'apduInvokeID', 'apduAbortRejectReason'
         )
 
+    __slots__ = ()
+    _pci_slots = PCI._pci_slots + ('apduType', 'apduSeg', 'apduMor', 'apduSA'
+        , 'apduSrv', 'apduNak', 'apduSeq', 'apduWin', 'apduMaxSegs'
+        , 'apduMaxResp', 'apduService', 'apduInvokeID', 'apduAbortRejectReason'
+        )
+
     def __init__(self, *args, **kwargs):
         if _debug: APCI._debug("__init__ %r %r", args, kwargs)
         super(APCI, self).__init__(*args, **kwargs)
@@ -366,6 +372,8 @@ class APCI(PCI, DebugContents):
 @bacpypes_debugging
 class APDU(APCI, PDUData):
 
+    __slots__ = APCI._pci_slots
+
     def __init__(self, *args, **kwargs):
         if _debug: APDU._debug("__init__ %r %r", args, kwargs)
         super(APDU, self).__init__(*args, **kwargs)
@@ -379,7 +387,7 @@ class APDU(APCI, PDUData):
         if _debug: APDU._debug("decode %s", str(pdu))
 
         APCI.decode(self, pdu)
-        self.pduData = pdu.get_data(len(pdu.pduData))
+        self.take_data(pdu)
 
     def apdu_contents(self, use_dict=None, as_class=dict):
         return PDUData.pdudata_contents(self, use_dict=use_dict, as_class=as_class)
@@ -412,6 +420,8 @@ class APDU(APCI, PDUData):
 @bacpypes_debugging
 class _APDU(APDU):
 
+    __slots__ = ()
+
     def encode(self, pdu):
         if _debug: _APDU._debug("encode %r", pdu)
 
@@ -422,7 +432,7 @@ class _APDU(APDU):
         if _debug: _APDU._debug("decode %r", pdu)
 
         APCI.update(self, pdu)
-        self.pduData = pdu.get_data(len(pdu.pduData))
+        self.take_data(pdu)
 
     def set_context(self, context):
         if _debug: _APDU._debug("set_context %r", context)
@@ -454,6 +464,9 @@ class _APDU(APDU):
 
 @bacpypes_debugging
 class ConfirmedRequestPDU(_APDU):
+
+    __slots__ = ()
+
     pduType = 0
 
     def __init__(self, choice=None, *args, **kwargs):
@@ -472,6 +485,9 @@ register_apdu_type(ConfirmedRequestPDU)
 
 @bacpypes_debugging
 class UnconfirmedRequestPDU(_APDU):
+
+    __slots__ = ()
+
     pduType = 1
 
     def __init__(self, choice=None, *args, **kwargs):
@@ -489,6 +505,9 @@ register_apdu_type(UnconfirmedRequestPDU)
 
 @bacpypes_debugging
 class SimpleAckPDU(_APDU):
+
+    __slots__ = ()
+
     pduType = 2
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -512,6 +531,9 @@ register_apdu_type(SimpleAckPDU)
 
 @bacpypes_debugging
 class ComplexAckPDU(_APDU):
+
+    __slots__ = ()
+
     pduType = 3
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -535,6 +557,9 @@ register_apdu_type(ComplexAckPDU)
 
 @bacpypes_debugging
 class SegmentAckPDU(_APDU):
+
+    __slots__ = ()
+
     pduType = 4
 
     def __init__(self, nak=None, srv=None, invokeID=None, sequenceNumber=None, windowSize=None, *args, **kwargs):
@@ -556,6 +581,9 @@ register_apdu_type(SegmentAckPDU)
 
 @bacpypes_debugging
 class ErrorPDU(_APDU):
+
+    __slots__ = ()
+
     pduType = 5
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -596,6 +624,9 @@ expand_enumerations(RejectReason)
 
 @bacpypes_debugging
 class RejectPDU(_APDU):
+
+    __slots__ = ()
+
     pduType = 6
 
     def __init__(self, invokeID=None, reason=None, context=None, *args, **kwargs):
@@ -642,6 +673,9 @@ expand_enumerations(AbortReason)
 
 @bacpypes_debugging
 class AbortPDU(_APDU):
+
+    __slots__ = ()
+
     pduType = 7
 
     def __init__(self, srv=None, invokeID=None, reason=None, context=None, *args, **kwargs):
@@ -697,15 +731,48 @@ class APCISequence(APCI, Sequence):
         # encode the tag list
         self._tag_list.encode(apdu)
 
-    def decode(self, apdu):
-        if _debug: APCISequence._debug("decode %r", apdu)
+    def decode(self, apdu, lazy=False):
+        """Decode the header fields and the service parameters.  If lazy is
+        true the parameters are decoded when one of them is first needed,
+        which might be never."""
+        if _debug: APCISequence._debug("decode %r lazy=%r", apdu, lazy)
 
         # copy the header fields
         self.update(apdu)
 
+        if lazy:
+            # keep the rest of the data for later
+            self._lazy_data = PDUData()
+            self._lazy_data.take_data(apdu)
+
+            # missing elements are found by __getattr__
+            for element in self.sequenceElements:
+                self.__dict__.pop(element.name, None)
+            return
+
+        self._decode_parameters(apdu)
+
+    def __getattr__(self, attr):
+        """Decode the service parameters the first time one is needed."""
+        lazy_data = self.__dict__.pop('_lazy_data', None)
+        if lazy_data is None:
+            raise AttributeError("%r object has no attribute %r" % (self.__class__.__name__, attr))
+        if _debug: APCISequence._debug("__getattr__ %r", attr)
+
+        try:
+            self._decode_parameters(lazy_data)
+        except AttributeError as err:
+            # not confused with a missing attribute
+            raise DecodingError(str(err))
+
+        return getattr(self, attr)
+
+    def _decode_parameters(self, pdu):
+        if _debug: APCISequence._debug("_decode_parameters %r", pdu)
+
         # create a tag list and decode the rest of the data
         self._tag_list = TagList()
-        self._tag_list.decode(apdu)
+        self._tag_list.decode(pdu)
         if _debug: APCISequence._debug("    - tag list: %r", self._tag_list)
 
         # pass the taglist to the Sequence for additional decoding
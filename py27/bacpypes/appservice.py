@@ -5,16 +5,18 @@ Application Layer
 """
 
 from time import time as _time
+from collections import OrderedDict
 
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
+from .settings import settings
 
 from .comm import Client, ServiceAccessPoint, ApplicationServiceElement
-from .task import OneShotTask
+from .task import OneShotTask, task_manager
 
 from .pdu import Address
 from .apdu import encode_max_segments_accepted, decode_max_segments_accepted, \
     encode_max_apdu_length_accepted, decode_max_apdu_length_accepted, \
-    AbortPDU, AbortReason, ComplexAckPDU, \
+    AbortPDU, AbortReason, APCISequence, ComplexAckPDU, \
     ConfirmedRequestPDU, Error, ErrorPDU, RejectPDU, SegmentAckPDU, \
     SimpleAckPDU, UnconfirmedRequestPDU, apdu_types, \
     unconfirmed_request_types, confirmed_request_types, complex_ack_types, \
@@ -25,6 +27,52 @@ from .errors import RejectException, AbortException, UnrecognizedService
 _debug = 0
 _log = ModuleLogger(globals())
 
+#
+#   APDUTiming
+#
+
+@bacpypes_debugging
+class APDUTiming(DebugContents):
+
+    """The round trip time of confirmed requests to a peer, smoothed like the
+    TCP retransmission timer (RFC 6298), and the number of retries and
+    timeouts.  Times are in milliseconds."""
+
+    _debug_contents = ('smoothedRTT', 'rttVariance', 'retries', 'timeouts')
+
+    # estimator gains
+    alpha = 0.125
+    beta = 0.25
+
+    def __init__(self):
+        self.smoothedRTT = None
+        self.rttVariance = None
+
+        self.retries = 0
+        self.timeouts = 0
+
+    def sample(self, rtt):
+        """Update the estimate with the time it took for a response."""
+        if _debug: APDUTiming._debug("sample %r", rtt)
+
+        if self.smoothedRTT is None:
+            self.smoothedRTT = rtt
+            self.rttVariance = rtt / 2.0
+        else:
+            self.rttVariance = (1.0 - self.beta) * self.rttVariance + \
+                self.beta * abs(self.smoothedRTT - rtt)
+            self.smoothedRTT = (1.0 - self.alpha) * self.smoothedRTT + \
+                self.alpha * rtt
+
+    def timeout(self, default, minimum, maximum, retry=0):
+        """Return how long to wait for a response, the default until there
+        is an estimate, and doubled for each retry."""
+        if self.smoothedRTT is None:
+            return default
+
+        msecs = max(minimum, self.smoothedRTT + 4.0 * self.rttVariance)
+        return int(min(msecs * (2 ** retry), maximum))
+
 #
 #   SSM - Segmentation State Machine
 #
@@ -71,6 +119,10 @@ class SSM(OneShotTask, DebugContents):
         self.segmentSize = None             # how big the pieces are
         self.segmentCount = None
 
+        self.segmentTemplate = None         # header fields of the segments
+        self.segmentData = None             # content being sent
+        self.segmentChunks = None           # content being received
+
         self.retryCount = None
         self.segmentRetryCount = None
         self.sentAllSegments = None
@@ -146,19 +198,15 @@ class SSM(OneShotTask, DebugContents):
         # set the context
         self.segmentAPDU = apdu
 
-    def get_segment(self, indx):
-        """This function returns an APDU coorisponding to a particular
-        segment of a confirmed request or complex ack.  The segmentAPDU
-        is the context."""
-        if _debug: SSM._debug("get_segment %r", indx)
+        # built when the first segment is sent or the second one received
+        self.segmentTemplate = None
+        self.segmentData = None
+        self.segmentChunks = None
 
-        # check for no context
-        if not self.segmentAPDU:
-            raise RuntimeError("no segmentation context established")
-
-        # check for invalid segment number
-        if indx >= self.segmentCount:
-            raise RuntimeError("invalid segment number %r, APDU has %r segments" % (indx, self.segmentCount))
+    def get_segment_template(self):
+        """This function returns an APDU with the header fields that are
+        the same for every segment of the segmentAPDU."""
+        if _debug: SSM._debug("get_segment_template")
 
         if self.segmentAPDU.apduType == ConfirmedRequestPDU.pduType:
             if _debug: SSM._debug("    - confirmed request context")
@@ -186,6 +234,33 @@ class SSM(OneShotTask, DebugContents):
         # make sure the destination is set
         segAPDU.pduDestination = self.pdu_address
 
+        return segAPDU
+
+    def get_segment(self, indx):
+        """This function returns an APDU coorisponding to a particular
+        segment of a confirmed request or complex ack.  The segmentAPDU
+        is the context."""
+        if _debug: SSM._debug("get_segment %r", indx)
+
+        # check for no context
+        if not self.segmentAPDU:
+            raise RuntimeError("no segmentation context established")
+
+        # check for invalid segment number
+        if indx >= self.segmentCount:
+            raise RuntimeError("invalid segment number %r, APDU has %r segments" % (indx, self.segmentCount))
+
+        # the template and the content are shared by the segments and the
+        # retries
+        if not self.segmentTemplate:
+            self.segmentTemplate = self.get_segment_template()
+            self.segmentData = self.segmentAPDU.pduData
+
+        # copy the header fields from the template
+        template = self.segmentTemplate
+        segAPDU = template.__class__.__new__(template.__class__)
+        segAPDU.update(template)
+
         # segmented message?
         if (self.segmentCount != 1):
             segAPDU.apduSeg = True
@@ -203,24 +278,40 @@ class SSM(OneShotTask, DebugContents):
             segAPDU.apduSeg = False
             segAPDU.apduMor = False
 
-        # add the content
+        # the content is a slice of the string
         offset = indx * self.segmentSize
-        segAPDU.put_data( self.segmentAPDU.pduData[offset:offset+self.segmentSize] )
+        segAPDU.pduData = self.segmentData[offset:offset+self.segmentSize]
 
         # success
         return segAPDU
 
     def append_segment(self, apdu):
         """This function appends the apdu content to the end of the current
-        APDU being built.  The segmentAPDU is the context."""
+        APDU being built.  The segmentAPDU is the context, the segments are
+        collected and joined together by join_segments()."""
         if _debug: SSM._debug("append_segment %r", apdu)
 
         # check for no context
         if not self.segmentAPDU:
             raise RuntimeError("no segmentation context established")
 
+        # start with the content of the first segment
+        if self.segmentChunks is None:
+            self.segmentChunks = [self.segmentAPDU.pduData]
+
         # append the data
-        self.segmentAPDU.put_data(apdu.pduData)
+        self.segmentChunks.append(apdu.pduData)
+
+    def join_segments(self):
+        """This function joins the segments that have been appended to the
+        segmentAPDU and returns it."""
+        if _debug: SSM._debug("join_segments")
+
+        if self.segmentChunks is not None:
+            self.segmentAPDU.pduData = ''.join(self.segmentChunks)
+            self.segmentChunks = None
+
+        return self.segmentAPDU
 
     def in_window(self, seqA, seqB):
         if _debug: SSM._debug("in_window %r %r", seqA, seqB)
@@ -261,10 +352,15 @@ class ClientSSM(SSM):
         # initialize the retry count
         self.retryCount = 0
 
+        # round trip time of the peer and when the request was sent, None
+        # when it has been sent more than once
+        self.apduTiming = sap.apdu_timing(pdu_address, self.device_info)
+        self.sentTime = None
+
         # acquire the device info
         if self.device_info:
             if _debug: ClientSSM._debug("    - acquire device information")
-            self.ssmSAP.deviceInfoCache.acquire(self.device_info)
+            self.ssmSAP.deviceInfoCache.acquire(self.pdu_address)
 
     def set_state(self, newState, timer=0):
         """This function is called when the client wants to change state."""
@@ -276,7 +372,7 @@ class ClientSSM(SSM):
         # when completed or aborted, remove tracking
         if (newState == COMPLETED) or (newState == ABORTED):
             if _debug: ClientSSM._debug("    - remove from active transactions")
-            self.ssmSAP.clientTransactions.remove(self)
+            self.ssmSAP.remove_transaction(self)
 
             # release the device info
             if self.device_info:
@@ -374,7 +470,8 @@ class ClientSSM(SSM):
             # unsegmented
             self.sentAllSegments = True
             self.retryCount = 0
-            self.set_state(AWAIT_CONFIRMATION, self.apduTimeout)
+            self.sentTime = task_manager().get_time()
+            self.set_state(AWAIT_CONFIRMATION, self.confirmation_timeout())
         else:
             # segmented
             self.sentAllSegments = False
@@ -445,6 +542,26 @@ class ClientSSM(SSM):
         # return it
         return abort_pdu
 
+    def confirmation_timeout(self):
+        """Return how long to wait for the response to the request."""
+        if not settings.adaptive_apdu_timeout:
+            return self.apduTimeout
+
+        return self.apduTiming.timeout(
+            self.apduTimeout, self.ssmSAP.minApduTimeout, self.ssmSAP.maxApduTimeout,
+            self.retryCount,
+            )
+
+    def no_response(self):
+        """The peer did not respond, count the timeout and abort."""
+        if _debug: ClientSSM._debug("no_response")
+
+        self.apduTiming.timeouts += 1
+        self.ssmSAP.apdu_timing_updated(self)
+
+        abort = self.abort(AbortReason.noResponse)
+        self.response(abort)
+
     def segmented_request(self, apdu):
         """This function is called when the client is sending a segmented request
         and receives an apdu."""
@@ -465,7 +582,7 @@ class ClientSSM(SSM):
             # final ack received?
             elif self.sentAllSegments:
                 if _debug: ClientSSM._debug("    - all done sending request")
-                self.set_state(AWAIT_CONFIRMATION, self.apduTimeout)
+                self.set_state(AWAIT_CONFIRMATION, self.confirmation_timeout())
 
             # more segments to send
             else:
@@ -529,6 +646,7 @@ class ClientSSM(SSM):
             if _debug: ClientSSM._debug("    - retry segmented request")
 
             self.segmentRetryCount += 1
+            self.apduTiming.retries += 1
             self.start_timer(self.segmentTimeout)
 
             if self.initialSequenceNumber == 0:
@@ -537,13 +655,19 @@ class ClientSSM(SSM):
                 self.fill_window(self.initialSequenceNumber)
         else:
             if _debug: ClientSSM._debug("    - abort, no response from the device")
-
-            abort = self.abort(AbortReason.noResponse)
-            self.response(abort)
+            self.no_response()
 
     def await_confirmation(self, apdu):
         if _debug: ClientSSM._debug("await_confirmation %r", apdu)
 
+        # the time for the response is only known when the request was
+        # sent once, a response to a retry could be for either one, and an
+        # abort may come from the server giving up on its application
+        if (self.sentTime is not None) and (apdu.apduType not in (SegmentAckPDU.pduType, AbortPDU.pduType)):
+            self.apduTiming.sample((task_manager().get_time() - self.sentTime) * 1000.0)
+            self.sentTime = None
+            self.ssmSAP.apdu_timing_updated(self)
+
         if (apdu.apduType == AbortPDU.pduType):
             if _debug: ClientSSM._debug("    - server aborted")
 
@@ -607,16 +731,21 @@ class ClientSSM(SSM):
         if self.retryCount < self.numberOfApduRetries:
             if _debug: ClientSSM._debug("    - no response, try again (%d < %d)", self.retryCount, self.numberOfApduRetries)
             self.retryCount += 1
+            self.apduTiming.retries += 1
 
             # save the retry count, indication acts like the request is coming
             # from the application so the retryCount gets re-initialized.
             saveCount = self.retryCount
             self.indication(self.segmentAPDU)
             self.retryCount = saveCount
+            self.sentTime = None
+
+            # wait longer for each retry
+            if self.state == AWAIT_CONFIRMATION:
+                self.restart_timer(self.confirmation_timeout())
         else:
             if _debug: ClientSSM._debug("    - retry count exceeded")
-            abort = self.abort(AbortReason.noResponse)
-            self.response(abort)
+            self.no_response()
 
     def segmented_confirmation(self, apdu):
         if _debug: ClientSSM._debug("segmented_confirmation %r", apdu)
@@ -664,7 +793,7 @@ class ClientSSM(SSM):
             self.request(segack)
 
             self.set_state(COMPLETED)
-            self.response(self.segmentAPDU)
+            self.response(self.join_segments())
 
         elif apdu.apduSeq == ((self.initialSequenceNumber + self.actualWindowSize) % 256):
             if _debug: ClientSSM._debug("    - last segment in the group")
@@ -682,9 +811,7 @@ class ClientSSM(SSM):
 
     def segmented_confirmation_timeout(self):
         if _debug: ClientSSM._debug("segmented_confirmation_timeout")
-
-        abort = self.abort(AbortReason.noResponse)
-        self.response(abort)
+        self.no_response()
 
 #
 #   ServerSSM - Server Segmentation State Machine
@@ -700,7 +827,7 @@ class ServerSSM(SSM):
         # acquire the device info
         if self.device_info:
             if _debug: ServerSSM._debug("    - acquire device information")
-            self.ssmSAP.deviceInfoCache.acquire(self.device_info)
+            self.ssmSAP.deviceInfoCache.acquire(self.pdu_address)
 
     def set_state(self, newState, timer=0):
         """This function is called when the client wants to change state."""
@@ -712,7 +839,7 @@ class ServerSSM(SSM):
         # when completed or aborted, remove tracking
         if (newState == COMPLETED) or (newState == ABORTED):
             if _debug: ServerSSM._debug("    - remove from active transactions")
-            self.ssmSAP.serverTransactions.remove(self)
+            self.ssmSAP.remove_transaction(self)
 
             # release the device info
             if self.device_info:
@@ -1030,7 +1157,7 @@ class ServerSSM(SSM):
 
             # forward the whole thing to the application
             self.set_state(AWAIT_RESPONSE, self.ssmSAP.applicationTimeout)
-            self.request(self.segmentAPDU)
+            self.request(self.join_segments())
 
         elif apdu.apduSeq == ((self.initialSequenceNumber + self.actualWindowSize) % 256):
                 if _debug: ServerSSM._debug("    - last segment in the group")
@@ -1146,18 +1273,29 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
         self.localDevice = localDevice
         self.deviceInfoCache = deviceInfoCache
 
-        # client settings
+        # client settings, the transactions are indexed by the peer address
+        # and invoke ID, and the invoke IDs in use are kept for each peer
         self.nextInvokeID = 1
-        self.clientTransactions = []
+        self.clientTransactions = {}
+        self.clientInvokeIDs = {}
 
         # server settings
-        self.serverTransactions = []
+        self.serverTransactions = {}
+        self.serverInvokeIDs = {}
 
         # confirmed request defaults
         self.numberOfApduRetries = 3
         self.apduTimeout = 3000
         self.maxApduLengthAccepted = 1024
 
+        # limits of the adaptive timeout, and the round trip times of the
+        # peers that are not in the device information cache, least recently
+        # used first
+        self.minApduTimeout = 200
+        self.maxApduTimeout = 12000
+        self.apduTimings = OrderedDict()
+        self.apduTimingsLimit = 1024
+
         # segmentation defaults
         self.segmentationSupported = 'noSegmentation'
         self.segmentTimeout = 1500
@@ -1175,23 +1313,101 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
         """Called by clients to get an unused invoke ID."""
         if _debug: StateMachineAccessPoint._debug("get_next_invoke_id")
 
-        initialID = self.nextInvokeID
-        while 1:
-            invokeID = self.nextInvokeID
-            self.nextInvokeID = (self.nextInvokeID + 1) % 256
-
-            # see if we've checked for them all
-            if initialID == self.nextInvokeID:
-                raise RuntimeError("no available invoke ID")
+        # the invoke IDs in use for this peer
+        in_use = self.clientInvokeIDs.get(addr, ())
 
-            for tr in self.clientTransactions:
-                if (invokeID == tr.invokeID) and (addr == tr.pdu_address):
-                    break
-            else:
+        invokeID = self.nextInvokeID
+        for i in range(256):
+            if invokeID not in in_use:
                 break
+            invokeID = (invokeID + 1) % 256
+        else:
+            raise RuntimeError("no available invoke ID")
+
+        self.nextInvokeID = (invokeID + 1) % 256
 
         return invokeID
 
+    def add_transaction(self, tr):
+        """Add a client or server transaction to the tables, the invoke ID
+        of the transaction must be set."""
+        if _debug: StateMachineAccessPoint._debug("add_transaction %r", tr)
+
+        if isinstance(tr, ClientSSM):
+            transactions, invoke_ids = self.clientTransactions, self.clientInvokeIDs
+        else:
+            transactions, invoke_ids = self.serverTransactions, self.serverInvokeIDs
+
+        key = (tr.pdu_address, tr.invokeID)
+        if key in transactions:
+            raise RuntimeError("invoke ID in use")
+
+        transactions[key] = tr
+        invoke_ids.setdefault(tr.pdu_address, set()).add(tr.invokeID)
+
+    def remove_transaction(self, tr):
+        """Remove a client or server transaction from the tables."""
+        if _debug: StateMachineAccessPoint._debug("remove_transaction %r", tr)
+
+        if isinstance(tr, ClientSSM):
+            transactions, invoke_ids = self.clientTransactions, self.clientInvokeIDs
+        else:
+            transactions, invoke_ids = self.serverTransactions, self.serverInvokeIDs
+
+        key = (tr.pdu_address, tr.invokeID)
+        if transactions.get(key) is not tr:
+            raise RuntimeError("transaction not found")
+        del transactions[key]
+
+        in_use = invoke_ids[tr.pdu_address]
+        in_use.discard(tr.invokeID)
+        if not in_use:
+            del invoke_ids[tr.pdu_address]
+
+    def apdu_timing(self, addr, device_info=None):
+        """Return the round trip time of confirmed requests to the peer, kept
+        in the device information when there is some."""
+        if _debug: StateMachineAccessPoint._debug("apdu_timing %r %r", addr, device_info)
+
+        if device_info:
+            apdu_timing = getattr(device_info, 'apduTiming', None)
+            if apdu_timing is None:
+                # the peer moved into the cache
+                apdu_timing = self.apduTimings.pop(addr, None) or APDUTiming()
+                device_info.apduTiming = apdu_timing
+        else:
+            # move the peer to the end, it is the most recently used
+            apdu_timing = self.apduTimings.pop(addr, None) or APDUTiming()
+            self.apduTimings[addr] = apdu_timing
+
+            # forget the peers that have not been used for the longest time
+            while len(self.apduTimings) > self.apduTimingsLimit:
+                self.apduTimings.popitem(last=False)
+
+        return apdu_timing
+
+    def apdu_timing_updated(self, tr):
+        """The round trip time or the counters of the peer of a client
+        transaction have changed."""
+        if _debug: StateMachineAccessPoint._debug("apdu_timing_updated %r", tr)
+
+        # give the cache a chance to save it
+        if tr.device_info:
+            self.deviceInfoCache.update_device_info(tr.device_info)
+
+    def transaction_counts(self):
+        """Return a dictionary of the number of client and server
+        transactions in progress for each peer."""
+        if _debug: StateMachineAccessPoint._debug("transaction_counts")
+
+        counts = {}
+        for addr, in_use in self.clientInvokeIDs.items():
+            counts[addr] = (len(in_use), 0)
+        for addr, in_use in self.serverInvokeIDs.items():
+            counts[addr] = (counts.get(addr, (0, 0))[0], len(in_use))
+
+        return counts
+
     def confirmation(self, pdu):
         """Packets coming up the stack are APDU's."""
         if _debug: StateMachineAccessPoint._debug("confirmation %r", pdu)
@@ -1225,15 +1441,14 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
 
         if isinstance(apdu, ConfirmedRequestPDU):
             # find duplicates of this request
-            for tr in self.serverTransactions:
-                if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.pdu_address):
-                    break
-            else:
+            tr = self.serverTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+            if not tr:
                 # build a server transaction
                 tr = ServerSSM(self, apdu.pduSource)
+                tr.invokeID = apdu.apduInvokeID
 
                 # add it to our transactions to track it
-                self.serverTransactions.append(tr)
+                self.add_transaction(tr)
 
             # let it run with the apdu
             tr.indication(apdu)
@@ -1248,10 +1463,8 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
             or isinstance(apdu, RejectPDU):
 
             # find the client transaction this is acking
-            for tr in self.clientTransactions:
-                if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.pdu_address):
-                    break
-            else:
+            tr = self.clientTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+            if not tr:
                 return
 
             # send the packet on to the transaction
@@ -1260,19 +1473,15 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
         elif isinstance(apdu, AbortPDU):
             # find the transaction being aborted
             if apdu.apduSrv:
-                for tr in self.clientTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.pdu_address):
-                        break
-                else:
+                tr = self.clientTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+                if not tr:
                     return
 
                 # send the packet on to the transaction
                 tr.confirmation(apdu)
             else:
-                for tr in self.serverTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.pdu_address):
-                        break
-                else:
+                tr = self.serverTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+                if not tr:
                     return
 
                 # send the packet on to the transaction
@@ -1281,19 +1490,15 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
         elif isinstance(apdu, SegmentAckPDU):
             # find the transaction being aborted
             if apdu.apduSrv:
-                for tr in self.clientTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.pdu_address):
-                        break
-                else:
+                tr = self.clientTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+                if not tr:
                     return
 
                 # send the packet on to the transaction
                 tr.confirmation(apdu)
             else:
-                for tr in self.serverTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.pdu_address):
-                        break
-                else:
+                tr = self.serverTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+                if not tr:
                     return
 
                 # send the packet on to the transaction
@@ -1334,9 +1539,8 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
                 apdu.apduInvokeID = self.get_next_invoke_id(apdu.pduDestination)
             else:
                 # verify the invoke ID isn't already being used
-                for tr in self.clientTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduDestination == tr.pdu_address):
-                        raise RuntimeError("invoke ID in use")
+                if (apdu.pduDestination, apdu.apduInvokeID) in self.clientTransactions:
+                    raise RuntimeError("invoke ID in use")
 
             # warning for bogus requests
             if (apdu.pduDestination.addrType != Address.localStationAddr) and (apdu.pduDestination.addrType != Address.remoteStationAddr):
@@ -1347,7 +1551,8 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
             if _debug: StateMachineAccessPoint._debug("    - client segmentation state machine: %r", tr)
 
             # add it to our transactions to track it
-            self.clientTransactions.append(tr)
+            tr.invokeID = apdu.apduInvokeID
+            self.add_transaction(tr)
 
             # let it run
             tr.indication(apdu)
@@ -1366,10 +1571,8 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
                 or isinstance(apdu, RejectPDU) \
                 or isinstance(apdu, AbortPDU):
             # find the appropriate server transaction
-            for tr in self.serverTransactions:
-                if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduDestination == tr.pdu_address):
-                    break
-            else:
+            tr = self.serverTransactions.get((apdu.pduDestination, apdu.apduInvokeID))
+            if not tr:
                 return
 
             # pass control to the transaction
@@ -1407,7 +1610,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
             if not error_found:
                 try:
                     xpdu = atype()
-                    xpdu.decode(apdu)
+                    xpdu.decode(apdu, lazy=settings.lazy_decode)
                 except RejectException as err:
                     ApplicationServiceAccessPoint._debug("    - decoding reject: %r", err)
                     error_found = err
@@ -1458,7 +1661,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
 
             try:
                 xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu.decode(apdu, lazy=settings.lazy_decode)
             except RejectException as err:
                 ApplicationServiceAccessPoint._debug("    - decoding reject: %r", err)
                 return
@@ -1480,11 +1683,15 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
     def sap_indication(self, apdu):
         if _debug: ApplicationServiceAccessPoint._debug("sap_indication %r", apdu)
 
-        if isinstance(apdu, ConfirmedRequestPDU):
+        if isinstance(apdu, (ConfirmedRequestPDU, UnconfirmedRequestPDU)) \
+                and not isinstance(apdu, APCISequence):
+            if _debug: ApplicationServiceAccessPoint._debug("    - already encoded")
+            xpdu = apdu
+
+        elif isinstance(apdu, ConfirmedRequestPDU):
             try:
                 xpdu = ConfirmedRequestPDU()
                 apdu.encode(xpdu)
-                apdu._xpdu = xpdu
             except Exception as err:
                 ApplicationServiceAccessPoint._exception("confirmed request encoding error: %r", err)
                 return
@@ -1493,7 +1700,6 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
             try:
                 xpdu = UnconfirmedRequestPDU()
                 apdu.encode(xpdu)
-                apdu._xpdu = xpdu
             except Exception as err:
                 ApplicationServiceAccessPoint._exception("unconfirmed request encoding error: %r", err)
                 return
@@ -1527,7 +1733,7 @@ class ApplicationServiceAccessPoint(ApplicationServiceElement, ServiceAccessPoin
 
             try:
                 xpdu = atype()
-                xpdu.decode(apdu)
+                xpdu.decode(apdu, lazy=settings.lazy_decode)
             except Exception as err:
                 ApplicationServiceAccessPoint._exception("complex ack decoding error: %r", err)
                 return
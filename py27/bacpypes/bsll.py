@@ -135,7 +135,7 @@ class BSLCI(PCI, DebugContents):
         self.bslciFunction = pdu.get()
         self.bslciLength = pdu.get_short()
 
-        if (self.bslciLength != len(pdu.pduData) + 4):
+        if (self.bslciLength != pdu.remaining() + 4):
             raise DecodingError("invalid BSLCI length")
 
 #
@@ -153,7 +153,7 @@ class BSLPDU(BSLCI, PDUData):
 
     def decode(self, pdu):
         BSLCI.decode(self, pdu)
-        self.pduData = pdu.get_data(len(pdu.pduData))
+        self.take_data(pdu)
 
 #
 #   Result
@@ -237,7 +237,7 @@ class AccessRequest(BSLCI):
     def decode(self, bslpdu):
         BSLCI.update(self, bslpdu)
         self.bslciHashFn = bslpdu.get()
-        self.bslciUsername = bslpdu.get_data(len(bslpdu.pduData))
+        self.bslciUsername = bslpdu.get_data(bslpdu.remaining())
 
 register_bslpdu_type(AccessRequest)
 
@@ -269,7 +269,7 @@ class AccessChallenge(BSLCI):
     def decode(self, bslpdu):
         BSLCI.update(self, bslpdu)
         self.bslciHashFn = bslpdu.get()
-        self.bslciChallenge = bslpdu.get_data(len(bslpdu.pduData))
+        self.bslciChallenge = bslpdu.get_data(bslpdu.remaining())
 
 register_bslpdu_type(AccessChallenge)
 
@@ -301,7 +301,7 @@ class AccessResponse(BSLCI):
     def decode(self, bslpdu):
         BSLCI.update(self, bslpdu)
         self.bslciHashFn = bslpdu.get()
-        self.bslciResponse = bslpdu.get_data(len(bslpdu.pduData))
+        self.bslciResponse = bslpdu.get_data(bslpdu.remaining())
 
 register_bslpdu_type(AccessResponse)
 
@@ -334,7 +334,7 @@ class DeviceToDeviceAPDU(BSLPDU):
         BSLCI.update(self, bslpdu)
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(DeviceToDeviceAPDU)
 
@@ -365,7 +365,7 @@ class RouterToRouterNPDU(BSLPDU):
         BSLCI.update(self, bslpdu)
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(RouterToRouterNPDU)
 
@@ -411,7 +411,7 @@ class ProxyToServerUnicastNPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ProxyToServerUnicastNPDU)
 
@@ -457,7 +457,7 @@ class ProxyToServerBroadcastNPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ProxyToServerBroadcastNPDU)
 
@@ -503,7 +503,7 @@ class ServerToProxyUnicastNPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ServerToProxyUnicastNPDU)
 
@@ -531,7 +531,7 @@ class ServerToProxyBroadcastNPDU(BSLPDU):
         BSLCI.update(self, bslpdu)
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ServerToProxyBroadcastNPDU)
 
@@ -577,7 +577,7 @@ class ClientToLESUnicastNPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ClientToLESUnicastNPDU)
 
@@ -623,7 +623,7 @@ class ClientToLESBroadcastNPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ClientToLESBroadcastNPDU)
 
@@ -669,7 +669,7 @@ class LESToClientUnicastNPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(LESToClientUnicastNPDU)
 
@@ -715,7 +715,7 @@ class LESToClientBroadcastNPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(LESToClientBroadcastNPDU)
 
@@ -761,7 +761,7 @@ class ClientToServerUnicastAPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ClientToServerUnicastAPDU)
 
@@ -807,7 +807,7 @@ class ClientToServerBroadcastAPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ClientToServerBroadcastAPDU)
 
@@ -853,7 +853,7 @@ class ServerToClientUnicastAPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ServerToClientUnicastAPDU)
 
@@ -899,7 +899,7 @@ class ServerToClientBroadcastAPDU(BSLPDU):
         self.bslciAddress = LocalStation(bslpdu.get_data(addrLen))
 
         # get the rest of the data
-        self.pduData = bslpdu.get_data(len(bslpdu.pduData))
+        self.take_data(bslpdu)
 
 register_bslpdu_type(ServerToClientBroadcastAPDU)
 
@@ -57,8 +57,8 @@ class _MultiplexServer(Server):
 @bacpypes_debugging
 class UDPMultiplexer:
 
-    def __init__(self, addr=None, noBroadcast=False):
-        if _debug: UDPMultiplexer._debug("__init__ %r noBroadcast=%r", addr, noBroadcast)
+    def __init__(self, addr=None, noBroadcast=False, shard=None):
+        if _debug: UDPMultiplexer._debug("__init__ %r noBroadcast=%r shard=%r", addr, noBroadcast, shard)
 
         # check for some options
         specialBroadcast = False
@@ -92,15 +92,25 @@ class UDPMultiplexer:
             UDPMultiplexer._debug("    - addrBroadcastTuple: %r", self.addrBroadcastTuple)
             UDPMultiplexer._debug("    - route_aware: %r", settings.route_aware)
 
+        # sharded directors share the port with other processes
+        if shard:
+            from .shard import ShardUDPDirector
+
         # create and bind the direct address
         self.direct = _MultiplexClient(self)
-        self.directPort = UDPDirector(self.addrTuple)
+        if shard:
+            self.directPort = ShardUDPDirector(self.addrTuple, shard)
+        else:
+            self.directPort = UDPDirector(self.addrTuple)
         bind(self.direct, self.directPort)
 
         # create and bind the broadcast address for non-Windows
         if specialBroadcast and (not noBroadcast) and sys.platform in ('linux2', 'darwin'):
             self.broadcast = _MultiplexClient(self)
-            self.broadcastPort = UDPDirector(self.addrBroadcastTuple, reuse=True)
+            if shard:
+                self.broadcastPort = ShardUDPDirector(self.addrBroadcastTuple, shard, broadcast=True, reuse=True)
+            else:
+                self.broadcastPort = UDPDirector(self.addrBroadcastTuple, reuse=True)
             bind(self.broadcast, self.broadcastPort)
         else:
             self.broadcast = None
@@ -290,6 +300,32 @@ class AnnexJCodec(Client, Server):
         # send it downstream
         self.request(pdu)
 
+    def fan_out(self, rpdu, destinations):
+        """Encode the BVLL PDU once and send the same octets to each of the
+        destinations."""
+        if _debug: AnnexJCodec._debug("fan_out %r %r", rpdu, destinations)
+
+        # encode it as a generic BVLL PDU
+        bvlpdu = BVLPDU()
+        rpdu.encode(bvlpdu)
+
+        # encode it as a PDU
+        pdu = PDU()
+        bvlpdu.encode(pdu)
+
+        # the octets are shared by the copies, nothing downstream changes
+        # the data of a PDU it is sending
+        data = pdu.pduData
+
+        for destination in destinations:
+            xpdu = PDU()
+            xpdu.update(pdu)
+            xpdu.pduData = data
+            xpdu.pduDestination = destination
+
+            # send it downstream
+            self.request(xpdu)
+
     def confirmation(self, pdu):
         if _debug: AnnexJCodec._debug("confirmation %r", pdu)
 
@@ -328,6 +364,22 @@ class BIPSAP(ServiceAccessPoint):
         # this is a response from the ASE, send this downstream
         self.request(pdu)
 
+    def fan_out(self, xpdu, destinations):
+        """Send the same PDU downstream to each of the destinations.  When
+        the element below knows how, the PDU is encoded once."""
+        if _debug: BIPSAP._debug("fan_out %r %r", xpdu, destinations)
+
+        if not destinations:
+            return
+
+        fan_out = getattr(self.clientPeer, 'fan_out', None)
+        if fan_out:
+            fan_out(xpdu, destinations)
+        else:
+            for destination in destinations:
+                xpdu.pduDestination = destination
+                self.request(xpdu)
+
 #
 #   BIPSimple
 #
@@ -731,6 +783,9 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
         self.bbmdBDT = []
         self.bbmdFDT = []
 
+        # destinations of the peers, built when they are needed
+        self.bbmdPeerDestinations = {}
+
         # install so process_task runs
         self.install_task()
 
@@ -761,18 +816,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
             xpdu = ForwardedNPDU(self.bbmdAddress, pdu, user_data=pdu.pduUserData)
             if _debug: BIPBBMD._debug("    - forwarded xpdu: %r", xpdu)
 
-            # send it to the peers
-            for bdte in self.bbmdBDT:
-                if bdte != self.bbmdAddress:
-                    xpdu.pduDestination = Address( ((bdte.addrIP|~bdte.addrMask), bdte.addrPort) )
-                    BIPBBMD._debug("    - sending to peer: %r", xpdu.pduDestination)
-                    self.request(xpdu)
-
-            # send it to the registered foreign devices
-            for fdte in self.bbmdFDT:
-                xpdu.pduDestination = fdte.fdAddress
-                if _debug: BIPBBMD._debug("    - sending to foreign device: %r", xpdu.pduDestination)
-                self.request(xpdu)
+            # send it to the peers and the registered foreign devices
+            self.fan_out(xpdu, self.peer_destinations() + [fdte.fdAddress for fdte in self.bbmdFDT])
 
         else:
             BIPBBMD._warning("invalid destination address: %r", pdu.pduDestination)
@@ -820,15 +865,16 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
             xpdu = ForwardedNPDU(pdu.bvlciAddress, pdu, destination=None, user_data=pdu.pduUserData)
             if _debug: BIPBBMD._debug("    - forwarded xpdu: %r", xpdu)
 
+            destinations = []
+
             # if this was unicast to us, do next hop
             if pdu.pduDestination.addrType == Address.localStationAddr:
                 if _debug: BIPBBMD._debug("    - unicast message")
 
                 # if this BBMD is listed in its BDT, send a local broadcast
                 if self.bbmdAddress in self.bbmdBDT:
-                    xpdu.pduDestination = LocalBroadcast()
                     if _debug: BIPBBMD._debug("    - local broadcast")
-                    self.request(xpdu)
+                    destinations.append(LocalBroadcast())
 
             elif pdu.pduDestination.addrType == Address.localBroadcastAddr:
                 if _debug: BIPBBMD._debug("    - directed broadcast message")
@@ -837,10 +883,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
                 BIPBBMD._warning("invalid destination address: %r", pdu.pduDestination)
 
             # send it to the registered foreign devices
-            for fdte in self.bbmdFDT:
-                xpdu.pduDestination = fdte.fdAddress
-                if _debug: BIPBBMD._debug("    - sending to foreign device: %r", xpdu.pduDestination)
-                self.request(xpdu)
+            destinations.extend(fdte.fdAddress for fdte in self.bbmdFDT)
+            self.fan_out(xpdu, destinations)
 
         elif isinstance(pdu, RegisterForeignDevice):
             # process the request
@@ -890,23 +934,10 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
             xpdu = ForwardedNPDU(pdu.pduSource, pdu, user_data=pdu.pduUserData)
             if _debug: BIPBBMD._debug("    - forwarded xpdu: %r", xpdu)
 
-            # send it to the peers
-            for bdte in self.bbmdBDT:
-                if bdte == self.bbmdAddress:
-                    xpdu.pduDestination = LocalBroadcast()
-                    if _debug: BIPBBMD._debug("    - local broadcast")
-                    self.request(xpdu)
-                else:
-                    xpdu.pduDestination = Address( ((bdte.addrIP|~bdte.addrMask), bdte.addrPort) )
-                    if _debug: BIPBBMD._debug("    - sending to peer: %r", xpdu.pduDestination)
-                    self.request(xpdu)
-
-            # send it to the other registered foreign devices
-            for fdte in self.bbmdFDT:
-                if fdte.fdAddress != pdu.pduSource:
-                    xpdu.pduDestination = fdte.fdAddress
-                    if _debug: BIPBBMD._debug("    - sending to foreign device: %r", xpdu.pduDestination)
-                    self.request(xpdu)
+            # send it to the peers, a local broadcast for this one, and the
+            # other registered foreign devices
+            self.fan_out(xpdu, self.peer_destinations(local_broadcast=True)
+                + [fdte.fdAddress for fdte in self.bbmdFDT if fdte.fdAddress != pdu.pduSource])
 
         elif isinstance(pdu, OriginalUnicastNPDU):
             # send it upstream if there is a network layer
@@ -930,18 +961,8 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
             xpdu = ForwardedNPDU(pdu.pduSource, pdu, user_data=pdu.pduUserData)
             if _debug: BIPBBMD._debug("    - forwarded xpdu: %r", xpdu)
 
-            # send it to the peers
-            for bdte in self.bbmdBDT:
-                if bdte != self.bbmdAddress:
-                    xpdu.pduDestination = Address( ((bdte.addrIP|~bdte.addrMask), bdte.addrPort) )
-                    if _debug: BIPBBMD._debug("    - sending to peer: %r", xpdu.pduDestination)
-                    self.request(xpdu)
-
-            # send it to the registered foreign devices
-            for fdte in self.bbmdFDT:
-                xpdu.pduDestination = fdte.fdAddress
-                if _debug: BIPBBMD._debug("    - sending to foreign device: %r", xpdu.pduDestination)
-                self.request(xpdu)
+            # send it to the peers and the registered foreign devices
+            self.fan_out(xpdu, self.peer_destinations() + [fdte.fdAddress for fdte in self.bbmdFDT])
 
         else:
             BIPBBMD._warning("invalid pdu type: %s", type(pdu))
@@ -1006,6 +1027,24 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
                 if _debug: BIPBBMD._debug("foreign device expired: %r", fdte.fdAddress)
                 del self.bbmdFDT[i]
 
+    def peer_destinations(self, local_broadcast=False):
+        """Return the directed broadcast addresses of the peers in the BDT.
+        This BBMD is skipped, or it is a local broadcast if local_broadcast
+        is true.  The lists are kept until the BDT changes."""
+        destinations = self.bbmdPeerDestinations.get(local_broadcast, None)
+        if destinations is None:
+            destinations = []
+            for bdte in self.bbmdBDT:
+                if bdte != self.bbmdAddress:
+                    destinations.append(Address( ((bdte.addrIP|~bdte.addrMask), bdte.addrPort) ))
+                elif local_broadcast:
+                    destinations.append(LocalBroadcast())
+            if _debug: BIPBBMD._debug("peer_destinations %r: %r", local_broadcast, destinations)
+
+            self.bbmdPeerDestinations[local_broadcast] = destinations
+
+        return destinations
+
     def add_peer(self, addr):
         if _debug: BIPBBMD._debug("add_peer %r", addr)
 
@@ -1023,6 +1062,7 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
                 break
         else:
             self.bbmdBDT.append(addr)
+            self.bbmdPeerDestinations = {}
 
     def delete_peer(self, addr):
         if _debug: BIPBBMD._debug("delete_peer %r", addr)
@@ -1039,6 +1079,7 @@ class BIPBBMD(BIPSAP, Client, Server, RecurringTask, DebugContents):
         for i in range(len(self.bbmdBDT)-1, -1, -1):
             if addr == self.bbmdBDT[i]:
                 del self.bbmdBDT[i]
+                self.bbmdPeerDestinations = {}
                 break
         else:
             pass
@@ -1064,6 +1105,9 @@ class BIPNAT(BIPSAP, Client, Server, RecurringTask, DebugContents):
         self.bbmdBDT = []
         self.bbmdFDT = []
 
+        # destinations of the peers, built when they are needed
+        self.bbmdPeerDestinations = None
+
         # install so process_task runs
         self.install_task()
 
@@ -1088,18 +1132,9 @@ class BIPNAT(BIPSAP, Client, Server, RecurringTask, DebugContents):
             xpdu = ForwardedNPDU(self.bbmdAddress, pdu, user_data=pdu.pduUserData)
             if _debug: BIPNAT._debug("    - forwarded xpdu: %r", xpdu)
 
-            # send it to the peers, all of them have all F's mask
-            for bdte in self.bbmdBDT:
-                if bdte != self.bbmdAddress:
-                    xpdu.pduDestination = Address((bdte.addrIP, bdte.addrPort))
-                    BIPNAT._debug("        - sending to peer: %r", xpdu.pduDestination)
-                    self.request(xpdu)
-
-            # send it to the registered foreign devices
-            for fdte in self.bbmdFDT:
-                xpdu.pduDestination = fdte.fdAddress
-                if _debug: BIPNAT._debug("        - sending to foreign device: %r", xpdu.pduDestination)
-                self.request(xpdu)
+            # send it to the peers, all of them have all F's mask, and the
+            # registered foreign devices
+            self.fan_out(xpdu, self.peer_destinations() + [fdte.fdAddress for fdte in self.bbmdFDT])
 
         else:
             BIPNAT._warning("invalid destination address: %r", pdu.pduDestination)
@@ -1152,10 +1187,7 @@ class BIPNAT(BIPSAP, Client, Server, RecurringTask, DebugContents):
             if _debug: BIPNAT._debug("    - forwarded xpdu: %r", xpdu)
 
             # send it to the registered foreign devices
-            for fdte in self.bbmdFDT:
-                xpdu.pduDestination = fdte.fdAddress
-                if _debug: BIPNAT._debug("        - sending to foreign device: %r", xpdu.pduDestination)
-                self.request(xpdu)
+            self.fan_out(xpdu, [fdte.fdAddress for fdte in self.bbmdFDT])
 
         elif isinstance(pdu, RegisterForeignDevice):
             ###TODO verify this is from an acceptable address
@@ -1212,21 +1244,10 @@ class BIPNAT(BIPSAP, Client, Server, RecurringTask, DebugContents):
             xpdu = ForwardedNPDU(pdu.pduSource, pdu, user_data=pdu.pduUserData)
             if _debug: BIPNAT._debug("    - forwarded xpdu: %r", xpdu)
 
-            # send it to the peers
-            for bdte in self.bbmdBDT:
-                if bdte == self.bbmdAddress:
-                    if _debug: BIPNAT._debug("        - no local broadcast")
-                else:
-                    xpdu.pduDestination = Address((bdte.addrIP, bdte.addrPort))
-                    if _debug: BIPNAT._debug("        - sending to peer: %r", xpdu.pduDestination)
-                    self.request(xpdu)
-
-            # send it to the other registered foreign devices
-            for fdte in self.bbmdFDT:
-                if fdte.fdAddress != pdu.pduSource:
-                    xpdu.pduDestination = fdte.fdAddress
-                    if _debug: BIPNAT._debug("        - sending to foreign device: %r", xpdu.pduDestination)
-                    self.request(xpdu)
+            # send it to the peers, no local broadcast, and the other
+            # registered foreign devices
+            self.fan_out(xpdu, self.peer_destinations()
+                + [fdte.fdAddress for fdte in self.bbmdFDT if fdte.fdAddress != pdu.pduSource])
 
         elif isinstance(pdu, OriginalUnicastNPDU):
             ###TODO verify this is from a peer
@@ -1304,6 +1325,16 @@ class BIPNAT(BIPSAP, Client, Server, RecurringTask, DebugContents):
                 if _debug: BIPNAT._debug("foreign device expired: %r", fdte.fdAddress)
                 del self.bbmdFDT[i]
 
+    def peer_destinations(self):
+        """Return the addresses of the peers in the BDT other than this one,
+        the list is kept until the BDT changes."""
+        if self.bbmdPeerDestinations is None:
+            self.bbmdPeerDestinations = [Address((bdte.addrIP, bdte.addrPort))
+                for bdte in self.bbmdBDT if bdte != self.bbmdAddress]
+            if _debug: BIPNAT._debug("peer_destinations: %r", self.bbmdPeerDestinations)
+
+        return self.bbmdPeerDestinations
+
     def add_peer(self, addr):
         if _debug: BIPNAT._debug("add_peer %r", addr)
 
@@ -1325,6 +1356,7 @@ class BIPNAT(BIPSAP, Client, Server, RecurringTask, DebugContents):
                 break
         else:
             self.bbmdBDT.append(addr)
+            self.bbmdPeerDestinations = None
 
     def delete_peer(self, addr):
         if _debug: BIPNAT._debug("delete_peer %r", addr)
@@ -1341,6 +1373,7 @@ class BIPNAT(BIPSAP, Client, Server, RecurringTask, DebugContents):
         for i in range(len(self.bbmdBDT)-1, -1, -1):
             if addr == self.bbmdBDT[i]:
                 del self.bbmdBDT[i]
+                self.bbmdPeerDestinations = None
                 break
         else:
             pass
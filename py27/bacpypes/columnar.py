@@ -0,0 +1,350 @@
+#!/usr/bin/python
+
+"""
+Columnar
+
+The results of a ReadPropertyMultiple request are normally decoded into a
+list of ReadAccessResult objects, each with a list of ReadAccessResultElement
+objects, each with an Any that is cast out to get the value.  Applications
+that poll the same few numeric properties from many objects only want the
+numbers, so the read_access_columns() function walks the tags of the ack
+directly and fills one column for each part of the results, one row for
+each property.
+
+The columns are arrays from the array module, or NumPy arrays that share
+the same memory when NumPy is installed.
+"""
+
+import struct
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
+
+from .errors import DecodingError
+from .primitivedata import Tag, ObjectIdentifier
+from .basetypes import PropertyIdentifier
+from .apdu import ComplexAckPDU, ReadPropertyMultipleACK
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# value for the rows that do not have a number
+NaN = float('nan')
+
+# tag classes
+_application = Tag.applicationTagClass
+_context = Tag.contextTagClass
+_opening = Tag.openingTagClass
+_closing = Tag.closingTagClass
+
+_unpack_long = struct.Struct('>L').unpack_from
+_unpack_short = struct.Struct('>H').unpack_from
+_unpack_real = struct.Struct('>f').unpack_from
+_unpack_double = struct.Struct('>d').unpack_from
+
+# array indexes are unsigned 32 bit values or -1, there is no 'q' array
+# and a long is only 32 bits on some platforms
+_index_typecode = 'l' if (array('l').itemsize >= 8) else 'd'
+
+#
+#   ReadAccessColumns
+#
+
+@bacpypes_debugging
+class ReadAccessColumns(DebugContents):
+
+    """
+    The results of a ReadPropertyMultiple request, one row for each property
+    that was read.  Object identifiers are packed into an unsigned long like
+    they are encoded, property identifiers are the enumerated value, and a
+    property array index, error class or error code that is not present
+    is -1.
+
+    The value column is a float for Real, Double, Unsigned, Integer,
+    Enumerated and Boolean values, and for bit strings (like the status
+    flags) it is the sum of 2**n for each bit n that is set.  It is NaN for
+    other values, for errors, and for values that are not a single
+    primitive value.  The valueTag column is the application tag number of
+    the value, or -1 when there is no single primitive value.
+    """
+
+    _debug_contents = (
+        'objectIdentifier', 'propertyIdentifier', 'propertyArrayIndex',
+        'value', 'valueTag', 'errorClass', 'errorCode',
+        )
+
+    def __init__(self):
+        if _debug: ReadAccessColumns._debug("__init__")
+
+        self.objectIdentifier = array('I')
+        self.propertyIdentifier = array('I')
+        self.propertyArrayIndex = array(_index_typecode)
+        self.value = array('d')
+        self.valueTag = array('i')
+        self.errorClass = array('i')
+        self.errorCode = array('i')
+
+    def __len__(self):
+        return len(self.objectIdentifier)
+
+    def to_numpy(self):
+        """Change the columns into NumPy arrays, the arrays share the memory
+        of the columns they replace."""
+        if _debug: ReadAccessColumns._debug("to_numpy")
+        if not numpy:
+            raise RuntimeError("NumPy is not available")
+
+        for attr in self._debug_contents:
+            column = getattr(self, attr)
+            if isinstance(column, array):
+                setattr(self, attr, numpy.frombuffer(column, dtype=column.typecode))
+
+    def object_identifier(self, row):
+        """Return the object identifier of a row as a tuple."""
+        return ObjectIdentifier(int(self.objectIdentifier[row])).value
+
+    def property_identifier(self, row):
+        """Return the property identifier of a row, the name when it is a
+        known property."""
+        return PropertyIdentifier(int(self.propertyIdentifier[row])).value
+
+#
+#   read_access_columns
+#
+
+@bacpypes_debugging
+def read_access_columns(apdu, use_numpy=True):
+    """Decode the results of a ReadPropertyMultiple request into columns.
+    The apdu is a ComplexAckPDU that has not been decoded, a
+    ReadPropertyMultipleACK (which is only walked without decoding it when
+    it was decoded lazily), or the encoded service parameters.
+    """
+    if _debug: read_access_columns._debug("read_access_columns %r use_numpy=%r", apdu, use_numpy)
+
+    if isinstance(apdu, ReadPropertyMultipleACK):
+        lazy_data = apdu.__dict__.get('_lazy_data')
+        if lazy_data is None:
+            if _debug: read_access_columns._debug("    - encode the results again")
+            pdu = ComplexAckPDU()
+            apdu.encode(pdu)
+            data, offset = pdu.pduData, 0
+        else:
+            data, offset = lazy_data._pduData, lazy_data.pduOffset
+
+    elif isinstance(apdu, ComplexAckPDU):
+        if apdu.apduService != ReadPropertyMultipleACK.serviceChoice:
+            raise DecodingError("ReadPropertyMultiple ack expected")
+        data, offset = apdu._pduData, apdu.pduOffset
+
+    elif isinstance(apdu, (str, bytearray)):
+        data, offset = apdu, 0
+
+    else:
+        raise TypeError("ReadPropertyMultiple ack expected")
+
+    # octets of a str are characters
+    if not isinstance(data, bytearray):
+        data = bytearray(data)
+
+    columns = ReadAccessColumns()
+    try:
+        _decode_results(data, offset, columns)
+    except (IndexError, struct.error):
+        raise DecodingError("no more packet data")
+
+    if use_numpy and numpy:
+        columns.to_numpy()
+
+    return columns
+
+#
+#   _tag
+#
+
+def _tag(data, offset):
+    """Decode a tag header, return the tag number, tag class, the length
+    (or value for application booleans) and the offset of the tag data."""
+    tag = data[offset]
+    offset += 1
+
+    number = tag >> 4
+    if (number == 0x0F):
+        number = data[offset]
+        offset += 1
+
+    lvt = tag & 0x07
+    if (lvt == 5):
+        lvt = data[offset]
+        offset += 1
+        if (lvt == 254):
+            lvt = _unpack_short(data, offset)[0]
+            offset += 2
+        elif (lvt == 255):
+            lvt = _unpack_long(data, offset)[0]
+            offset += 4
+    elif (lvt == 6):
+        return number, _opening, 0, offset
+    elif (lvt == 7):
+        return number, _closing, 0, offset
+
+    return number, (tag >> 3) & 0x01, lvt, offset
+
+
+def _unsigned(data, offset, length):
+    value = 0
+    for i in range(offset, offset + length):
+        value = (value << 8) + data[i]
+    return value
+
+#
+#   _primitive_value
+#
+
+def _primitive_value(data, number, lvt, offset):
+    """Return the application tagged value as a float."""
+    if (number == Tag.realAppTag) and (lvt == 4):
+        return _unpack_real(data, offset)[0]
+    elif (number == Tag.unsignedAppTag) or (number == Tag.enumeratedAppTag):
+        return float(_unsigned(data, offset, lvt))
+    elif (number == Tag.integerAppTag):
+        value = _unsigned(data, offset, lvt)
+        if lvt and (data[offset] & 0x80):
+            value -= 1 << (lvt * 8)
+        return float(value)
+    elif (number == Tag.booleanAppTag):
+        return float(lvt)
+    elif (number == Tag.bitStringAppTag) and lvt:
+        value = 0
+        for i in range((lvt - 1) * 8 - data[offset]):
+            if data[offset + 1 + (i >> 3)] & (0x80 >> (i & 0x07)):
+                value |= 1 << i
+        return float(value)
+    elif (number == Tag.doubleAppTag) and (lvt == 8):
+        return _unpack_double(data, offset)[0]
+
+    return NaN
+
+#
+#   _decode_results
+#
+
+def _decode_results(data, offset, columns):
+    """Walk the list of read access results and append the rows."""
+    end = len(data)
+
+    add_object = columns.objectIdentifier.append
+    add_property = columns.propertyIdentifier.append
+    add_index = columns.propertyArrayIndex.append
+    add_value = columns.value.append
+    add_tag = columns.valueTag.append
+    add_class = columns.errorClass.append
+    add_code = columns.errorCode.append
+
+    while offset < end:
+        # objectIdentifier [0]
+        number, cls, lvt, offset = _tag(data, offset)
+        if (number != 0) or (cls != _context) or (lvt != 4):
+            raise DecodingError("objectIdentifier expected")
+        objid = _unpack_long(data, offset)[0]
+        offset += 4
+
+        # listOfResults [1]
+        number, cls, lvt, offset = _tag(data, offset)
+        if (number != 1) or (cls != _opening):
+            raise DecodingError("listOfResults expected")
+
+        while True:
+            number, cls, lvt, offset = _tag(data, offset)
+            if (cls == _closing):
+                if (number != 1):
+                    raise DecodingError("mismatched close tag")
+                break
+
+            # propertyIdentifier [2]
+            if (number != 2) or (cls != _context):
+                raise DecodingError("propertyIdentifier expected")
+            prop = _unsigned(data, offset, lvt)
+            offset += lvt
+
+            # propertyArrayIndex [3] is optional
+            number, cls, lvt, offset = _tag(data, offset)
+            if (number == 3) and (cls == _context):
+                index = _unsigned(data, offset, lvt)
+                offset += lvt
+                number, cls, lvt, offset = _tag(data, offset)
+            else:
+                index = -1
+
+            if (number == 4) and (cls == _opening):
+                # propertyValue [4], the value is only kept when it is a
+                # single application tagged value
+                value = NaN
+                value_tag = -1
+                items = depth = 0
+                while True:
+                    number, cls, lvt, offset = _tag(data, offset)
+                    if (cls == _opening):
+                        if not depth:
+                            items += 1
+                        depth += 1
+                    elif (cls == _closing):
+                        if not depth:
+                            if (number != 4):
+                                raise DecodingError("mismatched close tag")
+                            break
+                        depth -= 1
+                    else:
+                        if not depth:
+                            items += 1
+                            if (cls == _application):
+                                value = _primitive_value(data, number, lvt, offset)
+                                value_tag = number
+                        if (cls != _application) or (number != Tag.booleanAppTag):
+                            offset += lvt
+
+                if items != 1:
+                    value = NaN
+                    value_tag = -1
+
+                error_class = error_code = -1
+
+            elif (number == 5) and (cls == _opening):
+                # propertyAccessError [5]
+                number, cls, lvt, offset = _tag(data, offset)
+                if (number != Tag.enumeratedAppTag) or (cls != _application):
+                    raise DecodingError("errorClass expected")
+                error_class = _unsigned(data, offset, lvt)
+                offset += lvt
+
+                number, cls, lvt, offset = _tag(data, offset)
+                if (number != Tag.enumeratedAppTag) or (cls != _application):
+                    raise DecodingError("errorCode expected")
+                error_code = _unsigned(data, offset, lvt)
+                offset += lvt
+
+                number, cls, lvt, offset = _tag(data, offset)
+                if (number != 5) or (cls != _closing):
+                    raise DecodingError("mismatched close tag")
+
+                value = NaN
+                value_tag = -1
+
+            else:
+                raise DecodingError("propertyValue or propertyAccessError expected")
+
+            add_object(objid)
+            add_property(prop)
+            add_index(index)
+            add_value(value)
+            add_tag(value_tag)
+            add_class(error_class)
+            add_code(error_code)
+
+    if offset != end:
+        raise DecodingError("no more packet data")
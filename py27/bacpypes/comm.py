@@ -9,7 +9,7 @@ import struct
 from copy import copy as _copy
 
 from .errors import DecodingError, ConfigurationError
-from .debugging import ModuleLogger, DebugContents, bacpypes_debugging, btox
+from .debugging import ModuleLogger, DebugContents, SlotsPickleMixIn, bacpypes_debugging, btox
 
 # some debugging
 _debug = 0
@@ -19,6 +19,10 @@ _log = ModuleLogger(globals())
 _short_mask = 0xFFFFL
 _long_mask = 0xFFFFFFFFL
 
+# decode multi-byte fields in place
+_unpack_short = struct.Struct('>H').unpack_from
+_unpack_long = struct.Struct('>L').unpack_from
+
 # maps of named clients and servers
 client_map = {}
 server_map = {}
@@ -37,6 +41,11 @@ class PCI(DebugContents):
 
     _debug_contents = ('pduUserData+', 'pduSource', 'pduDestination')
 
+    # the fields are slots of the classes that combine a PCI with PDUData,
+    # each PCI class extends the names with its own fields
+    __slots__ = ()
+    _pci_slots = ('pduUserData', 'pduSource', 'pduDestination')
+
     def __init__(self, *args, **kwargs):
         if _debug: PCI._debug("__init__ %r %r", args, kwargs)
 
@@ -98,7 +107,9 @@ class PCI(DebugContents):
 #
 
 @bacpypes_debugging
-class PDUData(object):
+class PDUData(SlotsPickleMixIn):
+
+    __slots__ = ('_pduData', 'pduOffset')
 
     def __init__(self, data=None, *args, **kwargs):
         if _debug: PDUData._debug("__init__ %r %r %r", data, args, kwargs)
@@ -107,6 +118,9 @@ class PDUData(object):
         # is another class in the __mro__ of this thing being constructed
         super(PDUData, self).__init__(*args, **kwargs)
 
+        # the offset of the next octet to decode
+        self.pduOffset = 0
+
         # function acts like a copy constructor
         if data is None:
             self.pduData = b''
@@ -117,29 +131,68 @@ class PDUData(object):
         else:
             raise TypeError("string expected")
 
+    def _get_pdu_data(self):
+        # the data that has been decoded is removed when the rest is
+        # needed as a whole
+        if self.pduOffset:
+            self._pduData = self._pduData[self.pduOffset:]
+            self.pduOffset = 0
+
+        return self._pduData
+
+    def _set_pdu_data(self, data):
+        self._pduData = data
+        self.pduOffset = 0
+
+    # the data that has not been decoded yet, decoding moves the offset
+    # rather than slicing the string
+    pduData = property(_get_pdu_data, _set_pdu_data)
+
+    def remaining(self):
+        """Return the number of octets that have not been decoded."""
+        return len(self._pduData) - self.pduOffset
+
+    def take_data(self, pdu):
+        """Take the data that has not been decoded from another PDU without
+        copying it, the other PDU is left with no data."""
+        self._pduData = pdu._pduData
+        self.pduOffset = pdu.pduOffset
+
+        pdu._pduData = b''
+        pdu.pduOffset = 0
+
     def get(self):
-        if len(self.pduData) == 0:
+        offset = self.pduOffset
+        if offset >= len(self._pduData):
             raise DecodingError("no more packet data")
 
-        octet = ord(self.pduData[0])
-        self.pduData = self.pduData[1:]
-
-        return octet
+        self.pduOffset = offset + 1
+        return ord(self._pduData[offset])
 
     def get_data(self, dlen):
-        if len(self.pduData) < dlen:
+        offset = self.pduOffset
+        end = offset + dlen
+        if end > len(self._pduData):
             raise DecodingError("no more packet data")
 
-        data = self.pduData[:dlen]
-        self.pduData = self.pduData[dlen:]
-
-        return data
+        self.pduOffset = end
+        return self._pduData[offset:end]
 
     def get_short(self):
-        return struct.unpack('>H',self.get_data(2))[0]
+        offset = self.pduOffset
+        if offset + 2 > len(self._pduData):
+            raise DecodingError("no more packet data")
+
+        self.pduOffset = offset + 2
+        return _unpack_short(self._pduData, offset)[0]
 
     def get_long(self):
-        return struct.unpack('>L',self.get_data(4))[0]
+        offset = self.pduOffset
+        if offset + 4 > len(self._pduData):
+            raise DecodingError("no more packet data")
+
+        self.pduOffset = offset + 4
+        return _unpack_long(self._pduData, offset)[0]
 
     def put(self, n):
         # pduData is a string
@@ -197,6 +250,8 @@ class PDUData(object):
 @bacpypes_debugging
 class PDU(PCI, PDUData):
 
+    __slots__ = PCI._pci_slots
+
     def __init__(self, data=None, **kwargs):
         if _debug: PDU._debug("__init__ %r %r", data, kwargs)
 
@@ -283,10 +283,10 @@ class Sequence(object):
                     taglist.Pop()
 
                 try:
-                    # make a backup of the tag list in case the structure manages to
-                    # decode some content but not all of it.  This is not supposed to
-                    # happen if the ASN.1 has been formed correctly.
-                    backup = taglist.tagList[:]
+                    # make a backup of the tag list position in case the structure
+                    # manages to decode some content but not all of it.  This is not
+                    # supposed to happen if the ASN.1 has been formed correctly.
+                    backup = taglist.position
 
                     # build a value and decode it
                     value = element.klass()
@@ -302,7 +302,7 @@ class Sequence(object):
                         setattr(self, element.name, None)
 
                         # restore the backup
-                        taglist.tagList = backup
+                        taglist.position = backup
                     else:
                         raise
 
@@ -1259,20 +1259,8 @@ class Any:
     def decode(self, taglist):
         if _debug: Any._debug("decode %r", taglist)
 
-        lvl = 0
-        while len(taglist) != 0:
-            tag = taglist.Peek()
-            if tag.tagClass == Tag.openingTagClass:
-                lvl += 1
-            elif tag.tagClass == Tag.closingTagClass:
-                lvl -= 1
-                if lvl < 0: break
-
-            self.tagList.append(taglist.Pop())
-
-        # make sure everything balances
-        if lvl > 0:
-            raise DecodingError("mismatched open/close tags")
+        # take the tags up to the closing tag of the enclosing structure
+        self.tagList.extend(taglist.pop_balanced())
 
     def cast_in(self, element):
         """encode the element into the internal tag list."""
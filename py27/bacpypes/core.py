@@ -11,8 +11,17 @@ import threading
 import time
 import traceback
 import warnings
+import functools
 
-from .task import TaskManager
+from collections import deque
+
+try:
+    import selectors
+except ImportError:
+    selectors = None
+
+from .task import task_manager
+from .histogram import Histogram
 from .debugging import bacpypes_debugging, ModuleLogger
 
 # some debugging
@@ -22,8 +31,19 @@ _log = ModuleLogger(globals())
 # globals
 running = False
 taskManager = None
-deferredFns = []
+deferredFns = deque()
+deferredBudget = None
+deferredTimeBudget = None
+deferredStats = {
+    'queued': 0,            # functions deferred
+    'called': 0,            # functions called
+    'maxDepth': 0,          # deepest the queue has been
+    'budgetExceeded': 0,    # times the queue was left with work to do
+    }
 sleeptime = 0.0
+socketSelector = None
+instruments = None
+eventLoop = None
 
 #
 #   stop
@@ -34,7 +54,7 @@ def stop(*args):
     """Call to stop running, may be called with a signum and frame
     parameter if called as a signal handler."""
     if _debug: stop._debug("stop")
-    global running, taskManager
+    global running, taskManager, eventLoop
 
     if args:
         sys.stderr.write("===== TERM Signal, %s\n" % time.strftime("%d-%b-%Y %H:%M:%S"))
@@ -47,6 +67,11 @@ def stop(*args):
         if _debug: stop._debug("    - trigger")
         taskManager.trigger.set()
 
+    # stop the asyncio event loop
+    if eventLoop:
+        if _debug: stop._debug("    - stop event loop")
+        eventLoop.call_soon_threadsafe(eventLoop.stop)
+
 #
 #   dump_stack
 #
@@ -65,14 +90,23 @@ def dump_stack(debug_handler):
 def print_stack(sig, frame):
     """Signal handler to print a stack trace and some interesting values."""
     if _debug: print_stack._debug("print_stack %r %r", sig, frame)
-    global running, deferredFns, sleeptime
+    global running, deferredFns, sleeptime, socketSelector, eventLoop
 
     sys.stderr.write("==== USR1 Signal, %s\n" % time.strftime("%d-%b-%Y %H:%M:%S"))
 
     sys.stderr.write("---------- globals\n")
     sys.stderr.write("    running: %r\n" % (running,))
     sys.stderr.write("    deferredFns: %r\n" % (deferredFns,))
+    sys.stderr.write("    deferredStats: %r\n" % (deferredStats,))
     sys.stderr.write("    sleeptime: %r\n" % (sleeptime,))
+    if socketSelector:
+        sys.stderr.write("    socketSelector: %r\n" % (socketSelector,))
+    if eventLoop:
+        sys.stderr.write("    eventLoop: %r\n" % (eventLoop,))
+
+    if instruments:
+        sys.stderr.write("---------- instruments\n")
+        dump_instruments(sys.stderr)
 
     sys.stderr.write("---------- stack\n")
     traceback.print_stack(frame)
@@ -93,6 +127,128 @@ def print_stack(sig, frame):
 
     sys.stderr.flush()
 
+#
+#   SocketSelector
+#
+
+@bacpypes_debugging
+class SocketSelector:
+
+    """
+    An alternative to asyncore.loop(count=1) built on the selectors module
+    (epoll on Linux).  Dispatchers in the asyncore socket map are registered
+    once and their interest is only modified when the answers from their
+    readable() and writable() methods change, then every ready file
+    descriptor is handled in one pass.
+    """
+
+    def __init__(self, socket_map=None):
+        if _debug: SocketSelector._debug("__init__")
+        if not selectors:
+            raise RuntimeError("selectors module not available")
+
+        # default to the asyncore map
+        if socket_map is None:
+            socket_map = asyncore.socket_map
+        self.socket_map = socket_map
+
+        # the selector, what has been registered and the interest of each
+        self.selector = selectors.DefaultSelector()
+        self.registered = {}
+        self.interest = {}
+
+    def __repr__(self):
+        return "<%s %s, %d registered>" % (
+            self.__class__.__name__,
+            self.selector.__class__.__name__,
+            len(self.registered),
+            )
+
+    def update(self):
+        """Bring the selector registrations in line with the socket map."""
+        registered = self.registered
+        interest = self.interest
+        selector = self.selector
+        EVENT_READ = selectors.EVENT_READ
+        EVENT_WRITE = selectors.EVENT_WRITE
+
+        seen = 0
+        for fd, obj in list(self.socket_map.items()):
+            # same rules as asyncore.poll()
+            events = 0
+            if obj.readable():
+                events = EVENT_READ
+            if obj.writable() and not obj.accepting:
+                events |= EVENT_WRITE
+
+            current = registered.get(fd, None)
+            if current is obj:
+                if interest[fd] == events:
+                    seen += 1
+                elif events:
+                    selector.modify(fd, events, obj)
+                    interest[fd] = events
+                    seen += 1
+                else:
+                    self._unregister(fd)
+                continue
+
+            if current is not None:
+                # the file descriptor has been reused by a new dispatcher
+                self._unregister(fd)
+
+            if events:
+                selector.register(fd, events, obj)
+                registered[fd] = obj
+                interest[fd] = events
+                seen += 1
+
+        # dispatchers that have been closed and removed from the map
+        if seen != len(registered):
+            for fd in [fd for fd in registered if fd not in self.socket_map]:
+                if _debug: SocketSelector._debug("    - unregister %r", fd)
+                self._unregister(fd)
+
+    def _unregister(self, fd):
+        del self.registered[fd]
+        del self.interest[fd]
+        try:
+            self.selector.unregister(fd)
+        except (KeyError, ValueError, OSError):
+            pass
+
+    def poll(self, timeout=0.0):
+        """Wait for socket activity and dispatch every ready descriptor."""
+        self.update()
+
+        # nothing to wait for, just sleep like asyncore does
+        if not self.registered:
+            if timeout:
+                time.sleep(timeout)
+            return
+
+        socket_map = self.socket_map
+        for key, mask in self.selector.select(timeout):
+            fd = key.fd
+            obj = key.data
+
+            # may have been closed by an earlier handler in this pass
+            if socket_map.get(fd, None) is not obj:
+                continue
+
+            if mask & selectors.EVENT_READ:
+                asyncore.read(obj)
+            if (mask & selectors.EVENT_WRITE) and (socket_map.get(fd, None) is obj):
+                asyncore.write(obj)
+
+    def close(self):
+        """Release the selector."""
+        if _debug: SocketSelector._debug("close")
+
+        self.selector.close()
+        self.registered = {}
+        self.interest = {}
+
 #
 #   run
 #
@@ -100,9 +256,9 @@ def print_stack(sig, frame):
 SPIN = 1.0
 
 @bacpypes_debugging
-def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
-    if _debug: run._debug("run spin=%r sigterm=%r, sigusr1=%r", spin, sigterm, sigusr1)
-    global running, taskManager, deferredFns, sleeptime
+def run(spin=SPIN, sigterm=stop, sigusr1=print_stack, selector=False):
+    if _debug: run._debug("run spin=%r sigterm=%r, sigusr1=%r selector=%r", spin, sigterm, sigusr1, selector)
+    global running, taskManager, deferredFns, sleeptime, socketSelector
 
     # install the signal handlers if they have been provided (issue #112)
     if isinstance(threading.current_thread(), threading._MainThread):
@@ -113,8 +269,16 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
     elif sigterm or sigusr1:
         warnings.warn("no signal handlers for child threads")
 
-    # reference the task manager (a singleton)
-    taskManager = TaskManager()
+    # reference the task manager (a singleton), make one if necessary
+    taskManager = task_manager()
+    if instruments:
+        taskManager.lateness = instruments['lateness']
+
+    # use a selector rather than asyncore.loop() if requested
+    if selector:
+        socketSelector = SocketSelector()
+    else:
+        socketSelector = None
 
     # count how many times we are going through the loop
     loopCount = 0
@@ -123,6 +287,8 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
     while running:
 #       if _debug: run._debug("    - time: %r", time.time())
         loopCount += 1
+        if instruments:
+            loop_start = time.time()
 
         # get the next task
         task, delta = taskManager.get_next_task()
@@ -151,21 +317,21 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
 #           if _debug: run._debug("    - delta: %r", delta)
 
             # loop for socket activity
-            asyncore.loop(timeout=delta, count=1)
-
-            # check for deferred functions
-            while deferredFns:
-                # get a reference to the list
-                fnlist = deferredFns
-                deferredFns = []
-
-                # call the functions
-                for fn, args, kwargs in fnlist:
-#                   if _debug: run._debug("    - call: %r %r %r", fn, args, kwargs)
-                    fn(*args, **kwargs)
-
-                # done with this list
-                del fnlist
+            if instruments:
+                io_start = time.time()
+            if socketSelector:
+                socketSelector.poll(delta)
+            else:
+                asyncore.loop(timeout=delta, count=1)
+            if instruments:
+                instruments['io'].record(time.time() - io_start)
+                instruments['deferred'].record(len(deferredFns))
+
+            # check for deferred functions, within the budget
+            run_deferred(deferredBudget, deferredTimeBudget)
+
+            if instruments:
+                instruments['loop'].record(time.time() - loop_start)
 
         except KeyboardInterrupt:
             if _debug: run._info("keyboard interrupt")
@@ -175,6 +341,11 @@ def run(spin=SPIN, sigterm=stop, sigusr1=print_stack):
 
     running = False
 
+    # release the selector
+    if socketSelector:
+        socketSelector.close()
+        socketSelector = None
+
 #
 #   run_once
 #
@@ -189,8 +360,10 @@ def run_once():
     if _debug: run_once._debug("run_once")
     global taskManager, deferredFns
 
-    # reference the task manager (a singleton)
-    taskManager = TaskManager()
+    # reference the task manager (a singleton), make one if necessary
+    taskManager = task_manager()
+    if instruments:
+        taskManager.lateness = instruments['lateness']
 
     try:
         delta = 0.0
@@ -204,18 +377,7 @@ def run_once():
                 taskManager.process_task(task)
 
             # check for deferred functions
-            while deferredFns:
-                # get a reference to the list
-                fnlist = deferredFns
-                deferredFns = []
-
-                # call the functions
-                for fn, args, kwargs in fnlist:
-                    if _debug: run_once._debug("    - call: %r %r %r", fn, args, kwargs)
-                    fn(*args, **kwargs)
-
-                # done with this list
-                del fnlist
+            run_deferred()
 
     except KeyboardInterrupt:
         if _debug: run_once._info("keyboard interrupt")
@@ -229,16 +391,125 @@ def run_once():
 @bacpypes_debugging
 def deferred(fn, *args, **kwargs):
     if _debug: deferred._debug("deferred %r %r %r", fn, args, kwargs)
-    global deferredFns, taskManager
+    global deferredFns, taskManager, eventLoop
+
+    # the asyncio event loop will call it, safe from other threads
+    if eventLoop:
+        eventLoop.call_soon_threadsafe(functools.partial(fn, *args, **kwargs))
+        return
 
-    # append it to the list
+    # append it to the queue, this is safe to call from other threads
     deferredFns.append((fn, args, kwargs))
 
+    # keep track of the depth
+    deferredStats['queued'] += 1
+    depth = len(deferredFns)
+    if depth > deferredStats['maxDepth']:
+        deferredStats['maxDepth'] = depth
+
     # trigger the task manager event
     if taskManager and taskManager.trigger:
         if _debug: deferred._debug("    - trigger")
         taskManager.trigger.set()
 
+#
+#   run_deferred
+#
+
+@bacpypes_debugging
+def run_deferred(count=None, duration=None):
+    """Call deferred functions until the queue is empty, or the count of
+    functions have been called, or the duration (in seconds) has passed.
+    Functions deferred along the way are included.  Returns the number of
+    functions called."""
+    global deferredFns, deferredStats
+
+    # nothing to do
+    if not deferredFns:
+        return 0
+
+    if duration is not None:
+        stop_time = time.time() + duration
+
+    called = 0
+    try:
+        while deferredFns:
+            if (count is not None) and (called >= count):
+                break
+            if (duration is not None) and called and (time.time() >= stop_time):
+                break
+
+            fn, args, kwargs = deferredFns.popleft()
+            called += 1
+
+#           if _debug: run_deferred._debug("    - call: %r %r %r", fn, args, kwargs)
+            fn(*args, **kwargs)
+
+        # the rest waits for the next pass through the loop
+        if deferredFns:
+            deferredStats['budgetExceeded'] += 1
+    finally:
+        deferredStats['called'] += called
+
+    return called
+
+#
+#   set_deferred_budget
+#
+
+@bacpypes_debugging
+def set_deferred_budget(count=None, duration=None):
+    """Limit the number of deferred functions, or the time in seconds spent
+    calling them, in each pass through the run() loop so socket activity
+    and tasks are not starved.  None is no limit."""
+    if _debug: set_deferred_budget._debug("set_deferred_budget count=%r duration=%r", count, duration)
+    global deferredBudget, deferredTimeBudget
+
+    deferredBudget = count
+    deferredTimeBudget = duration
+
+#
+#   enable_instrumentation
+#
+
+@bacpypes_debugging
+def enable_instrumentation(enable=True):
+    """Start (or stop) recording histograms of how long each pass through
+    the run() loop takes, how much of that is waiting for socket activity,
+    the length of the deferred function queue, and how late tasks are
+    processed.  The histograms are in the instruments dict."""
+    if _debug: enable_instrumentation._debug("enable_instrumentation %r", enable)
+    global instruments, taskManager
+
+    if enable:
+        instruments = {
+            'loop': Histogram('loop'),
+            'io': Histogram('io'),
+            'deferred': Histogram('deferred', unit='functions', scale=1),
+            'lateness': Histogram('lateness'),
+            }
+    else:
+        instruments = None
+
+    # the task manager keeps track of lateness
+    if taskManager:
+        taskManager.lateness = instruments and instruments['lateness']
+
+#
+#   dump_instruments
+#
+
+def dump_instruments(file=None):
+    """Write a summary of the histograms to the file, defaults to stderr."""
+    if file is None:
+        file = sys.stderr
+    if not instruments:
+        file.write("    instrumentation not enabled\n")
+        return
+
+    for name in ('loop', 'io', 'deferred', 'lateness'):
+        instruments[name].dump(file)
+
 #
 #   enable_sleeping
 #
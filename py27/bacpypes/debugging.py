@@ -82,12 +82,42 @@ def ModuleLogger(globs):
 _debug = 0
 _log = ModuleLogger(globals())
 
+#
+#   SlotsPickleMixIn
+#
+
+class SlotsPickleMixIn(object):
+
+    """
+    Python 2 only pickles objects with slots using protocol 2 or later
+    unless the class provides the state, so this collects the slots of all
+    of the classes and the dictionary if there is one.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self):
+        state = {}
+        for klass in self.__class__.__mro__:
+            for attr in klass.__dict__.get('__slots__', ()):
+                if hasattr(self, attr):
+                    state[attr] = getattr(self, attr)
+
+        state.update(getattr(self, '__dict__', {}))
+        return state
+
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
 #
 #   DebugContents
 #
 
 class DebugContents(object):
 
+    __slots__ = ()
+
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         """Debug the contents of an object."""
         if _debug: _log.debug("debug_contents indent=%r file=%r _ids=%r", indent, file, _ids)
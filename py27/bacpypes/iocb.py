@@ -904,6 +904,154 @@ class SieveQueue(IOQController):
         # send the request
         self.request_fn(iocb.args[0])
 
+#
+#   WindowQueue
+#
+
+@bacpypes_debugging
+class WindowQueue(IOController):
+
+    """
+    A WindowQueue is like a SieveQueue that has up to window_size requests
+    active at the same time rather than just one.  The active requests are
+    found by the invoke ID of the request PDU, which is assigned when it
+    is sent, so the request being sent is also kept in case the response
+    comes back before the request function returns.
+    """
+
+    def __init__(self, request_fn, address=None, window_size=1):
+        if _debug: WindowQueue._debug("__init__ %r %r window_size=%r", request_fn, address, window_size)
+        IOController.__init__(self, str(address))
+
+        # save a reference to the request function
+        self.request_fn = request_fn
+        self.address = address
+
+        # the number of requests that can be active
+        self.window_size = window_size
+
+        # active iocb's by invoke ID and the one being sent
+        self.active_iocbs = {}
+        self.sending_iocb = None
+
+        # create an IOQueue for iocb's requested when the window is full
+        self.ioQueue = IOQueue(str(address) + " queue")
+
+    def abort(self, err):
+        """Abort all pending requests."""
+        if _debug: WindowQueue._debug("abort %r", err)
+
+        while True:
+            iocb = self.ioQueue.get(block=0)
+            if not iocb:
+                break
+            if _debug: WindowQueue._debug("    - iocb: %r", iocb)
+
+            # change the state
+            iocb.ioState = ABORTED
+            iocb.ioError = err
+
+            # notify the client
+            iocb.trigger()
+
+    def request_io(self, iocb):
+        """Called by a client to start processing a request."""
+        if _debug: WindowQueue._debug("request_io %r", iocb)
+
+        # bind the iocb to this controller
+        iocb.ioController = self
+
+        # if the window is full, queue it
+        if self.sending_iocb or (len(self.active_iocbs) >= self.window_size):
+            if _debug: WindowQueue._debug("    - window full, request queued")
+
+            iocb.ioState = PENDING
+            self.ioQueue.put(iocb)
+            return
+
+        self._process(iocb)
+
+    def _process(self, iocb):
+        try:
+            # hopefully there won't be an error
+            err = None
+
+            # let derived class figure out how to process this
+            self.process_io(iocb)
+        except:
+            # extract the error
+            err = sys.exc_info()[1]
+            if _debug: WindowQueue._debug("    - process_io() exception: %r", err)
+
+        # if there was an error, abort the request
+        if err:
+            if _debug: WindowQueue._debug("    - aborting")
+            self.abort_io(iocb, err)
+
+    def process_io(self, iocb):
+        if _debug: WindowQueue._debug("process_io %r", iocb)
+
+        # this is now an active request
+        self.active_io(iocb)
+
+        # send the request
+        apdu = iocb.args[0]
+        self.sending_iocb = iocb
+        try:
+            self.request_fn(apdu)
+        finally:
+            self.sending_iocb = None
+
+        # wait for the response with the same invoke ID
+        if iocb.ioState == ACTIVE:
+            self.active_iocbs[apdu.apduInvokeID] = iocb
+
+    def find_io(self, invoke_id):
+        """Return the active iocb for a response."""
+        if _debug: WindowQueue._debug("find_io %r", invoke_id)
+
+        iocb = self.active_iocbs.get(invoke_id, None)
+        if not iocb:
+            iocb = self.sending_iocb
+
+        return iocb
+
+    def complete_io(self, iocb, msg):
+        """Called by a handler to return data to the client."""
+        if _debug: WindowQueue._debug("complete_io %r %r", iocb, msg)
+
+        # normal completion
+        IOController.complete_io(self, iocb, msg)
+
+        # no longer active
+        self._finished(iocb)
+
+    def abort_io(self, iocb, err):
+        """Called by a handler or a client to abort a transaction."""
+        if _debug: WindowQueue._debug("abort_io %r %r", iocb, err)
+
+        # normal abort
+        IOController.abort_io(self, iocb, err)
+
+        # no longer active
+        self._finished(iocb)
+
+    def _finished(self, iocb):
+        invoke_id = getattr(iocb.args[0], 'apduInvokeID', None)
+        if self.active_iocbs.get(invoke_id, None) is iocb:
+            del self.active_iocbs[invoke_id]
+
+        # look for more to do
+        if self.ioQueue.queue:
+            deferred(WindowQueue._trigger, self)
+
+    def _trigger(self):
+        """Called to launch the next requests in the queue."""
+        if _debug: WindowQueue._debug("_trigger")
+
+        while self.ioQueue.queue and (len(self.active_iocbs) < self.window_size):
+            self._process(self.ioQueue.get())
+
 #
 #   SieveClientController
 #
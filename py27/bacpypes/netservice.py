@@ -700,7 +700,6 @@ class NetworkServiceAccessPoint(ServiceAccessPoint, Server, DebugContents):
         # encode it as a generic NPDU
         xpdu = NPDU(user_data=npdu.pduUserData)
         npdu.encode(xpdu)
-        npdu._xpdu = xpdu
 
         # tell the adapter to process the NPDU
         adapter.process_npdu(xpdu)
@@ -711,7 +710,6 @@ class NetworkServiceAccessPoint(ServiceAccessPoint, Server, DebugContents):
         # encode it as a generic NPDU
         xpdu = NPDU(user_data=npdu.pduUserData)
         npdu.encode(xpdu)
-        npdu._xpdu = xpdu
 
         # tell the adapter to process the NPDU
         adapter.process_npdu(xpdu)
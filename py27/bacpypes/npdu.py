@@ -31,6 +31,11 @@ class NPCI(PCI, DebugContents):
         , 'npduHopCount', 'npduNetMessage', 'npduVendorID'
         )
 
+    __slots__ = ()
+    _pci_slots = PCI._pci_slots + ('npduVersion', 'npduControl', 'npduDADR'
+        , 'npduSADR', 'npduHopCount', 'npduNetMessage', 'npduVendorID'
+        )
+
     whoIsRouterToNetwork            = 0x00
     iAmRouterToNetwork              = 0x01
     iCouldBeRouterToNetwork         = 0x02
@@ -147,7 +152,7 @@ class NPCI(PCI, DebugContents):
         PCI.update(self, pdu)
 
         # check the length
-        if len(pdu.pduData) < 2:
+        if pdu.remaining() < 2:
             raise DecodingError("invalid length")
 
         # only version 1 messages supported
@@ -257,6 +262,8 @@ class NPCI(PCI, DebugContents):
 @bacpypes_debugging
 class NPDU(NPCI, PDUData):
 
+    __slots__ = NPCI._pci_slots
+
     def __init__(self, *args, **kwargs):
         super(NPDU, self).__init__(*args, **kwargs)
 
@@ -266,7 +273,7 @@ class NPDU(NPCI, PDUData):
 
     def decode(self, pdu):
         NPCI.decode(self, pdu)
-        self.pduData = pdu.get_data(len(pdu.pduData))
+        self.take_data(pdu)
 
     def npdu_contents(self, use_dict=None, as_class=dict):
         return PDUData.pdudata_contents(self, use_dict=use_dict, as_class=as_class)
@@ -334,7 +341,7 @@ class WhoIsRouterToNetwork(NPDU):
 
     def decode(self, npdu):
         NPCI.update(self, npdu)
-        if npdu.pduData:
+        if npdu.remaining():
             self.wirtnNetwork = npdu.get_short()
         else:
             self.wirtnNetwork = None
@@ -372,7 +379,7 @@ class IAmRouterToNetwork(NPDU):
     def decode(self, npdu):
         NPCI.update(self, npdu)
         self.iartnNetworkList = []
-        while npdu.pduData:
+        while npdu.remaining():
             self.iartnNetworkList.append(npdu.get_short())
 
     def npdu_contents(self, use_dict=None, as_class=dict):
@@ -482,7 +489,7 @@ class RouterBusyToNetwork(NPDU):
     def decode(self, npdu):
         NPCI.update(self, npdu)
         self.rbtnNetworkList = []
-        while npdu.pduData:
+        while npdu.remaining():
             self.rbtnNetworkList.append(npdu.get_short())
 
     def npdu_contents(self, use_dict=None, as_class=dict):
@@ -518,7 +525,7 @@ class RouterAvailableToNetwork(NPDU):
     def decode(self, npdu):
         NPCI.update(self, npdu)
         self.ratnNetworkList = []
-        while npdu.pduData:
+        while npdu.remaining():
             self.ratnNetworkList.append(npdu.get_short())
 
     def npdu_contents(self, use_dict=None, as_class=dict):
@@ -10,7 +10,7 @@ import time
 import re
 import unicodedata
 
-from .debugging import ModuleLogger, btox
+from .debugging import ModuleLogger, SlotsPickleMixIn, btox
 
 from .errors import DecodingError, InvalidTag, InvalidParameterDatatype
 from .pdu import PDUData
@@ -26,7 +26,9 @@ _log = ModuleLogger(globals())
 #   Tag
 #
 
-class Tag(object):
+class Tag(SlotsPickleMixIn):
+
+    __slots__ = ('tagClass', 'tagNumber', 'tagLVT', 'tagData')
 
     applicationTagClass     = 0
     contextTagClass         = 1
@@ -274,6 +276,8 @@ class Tag(object):
 
 class ApplicationTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, *args):
         if len(args) == 1 and isinstance(args[0], PDUData):
             Tag.__init__(self, args[0])
@@ -291,6 +295,8 @@ class ApplicationTag(Tag):
 
 class ContextTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, *args):
         if len(args) == 1 and isinstance(args[0], PDUData):
             Tag.__init__(self, args[0])
@@ -308,6 +314,8 @@ class ContextTag(Tag):
 
 class OpeningTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, context):
         if isinstance(context, PDUData):
             Tag.__init__(self, context)
@@ -324,6 +332,8 @@ class OpeningTag(Tag):
 
 class ClosingTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, context):
         if isinstance(context, PDUData):
             Tag.__init__(self, context)
@@ -341,31 +351,58 @@ class ClosingTag(Tag):
 class TagList(object):
 
     def __init__(self, arg=None):
-        self.tagList = []
+        # the tags and the position of the next one to decode, tags before
+        # the position have been decoded but are kept so a decoder can
+        # back up by saving and restoring the position
+        self._tags = []
+        self.position = 0
 
         if isinstance(arg, list):
-            self.tagList = arg
+            self._tags = arg
         elif isinstance(arg, TagList):
-            self.tagList = arg.tagList[:]
+            self._tags = arg._tags[arg.position:]
         elif isinstance(arg, PDUData):
             self.decode(arg)
 
+    def _get_tag_list(self):
+        if self.position:
+            return self._tags[self.position:]
+        return self._tags
+
+    def _set_tag_list(self, tags):
+        self._tags = tags
+        self.position = 0
+
+    # the tags that have not been decoded
+    tagList = property(_get_tag_list, _set_tag_list)
+
     def append(self, tag):
-        self.tagList.append(tag)
+        self._tags.append(tag)
 
     def extend(self, taglist):
-        self.tagList.extend(taglist)
+        self._tags.extend(taglist)
+
+    def __iter__(self):
+        return iter(self._tags[self.position:])
 
     def __getitem__(self, item):
-        return self.tagList[item]
+        if isinstance(item, slice):
+            return self._tags[self.position:][item]
+
+        if item < 0:
+            item += len(self._tags) - self.position
+        if item < 0:
+            raise IndexError("tag list index out of range")
+
+        return self._tags[self.position + item]
 
     def __len__(self):
-        return len(self.tagList)
+        return len(self._tags) - self.position
 
     def Peek(self):
         """Return the tag at the front of the list."""
-        if self.tagList:
-            tag = self.tagList[0]
+        if self.position < len(self._tags):
+            tag = self._tags[self.position]
         else:
             tag = None
 
@@ -373,24 +410,55 @@ class TagList(object):
 
     def push(self, tag):
         """Return a tag back to the front of the list."""
-        self.tagList = [tag] + self.tagList
+        position = self.position
+        if position and (self._tags[position - 1] is tag):
+            self.position = position - 1
+        else:
+            self._tags.insert(position, tag)
 
     def Pop(self):
         """Remove the tag from the front of the list and return it."""
-        if self.tagList:
-            tag = self.tagList[0]
-            del self.tagList[0]
+        if self.position < len(self._tags):
+            tag = self._tags[self.position]
+            self.position += 1
         else:
             tag = None
 
         return tag
 
+    def pop_balanced(self):
+        """Remove the tags from the front of the list up to a closing tag
+        that does not match an opening tag, or the end of the list, and
+        return them."""
+        tags = self._tags
+        start = i = self.position
+        end = len(tags)
+
+        lvl = 0
+        while i < end:
+            tag_class = tags[i].tagClass
+            if tag_class == Tag.openingTagClass:
+                lvl += 1
+            elif tag_class == Tag.closingTagClass:
+                lvl -= 1
+                if lvl < 0: break
+            i += 1
+
+        # make sure everything balances
+        if lvl > 0:
+            raise DecodingError("mismatched open/close tags")
+
+        self.position = i
+        return tags[start:i]
+
     def get_context(self, context):
         """Return a tag or a list of tags context encoded."""
+        tags = self._tags
+
         # forward pass
-        i = 0
-        while i < len(self.tagList):
-            tag = self.tagList[i]
+        i = self.position
+        while i < len(tags):
+            tag = tags[i]
 
             # skip application stuff
             if tag.tagClass == Tag.applicationTagClass:
@@ -404,18 +472,17 @@ class TagList(object):
             # check for context encoded group
             elif tag.tagClass == Tag.openingTagClass:
                 keeper = tag.tagNumber == context
-                rslt = []
                 i += 1
+                start = i
                 lvl = 0
-                while i < len(self.tagList):
-                    tag = self.tagList[i]
+                while i < len(tags):
+                    tag = tags[i]
                     if tag.tagClass == Tag.openingTagClass:
                         lvl += 1
                     elif tag.tagClass == Tag.closingTagClass:
                         lvl -= 1
                         if lvl < 0: break
 
-                    rslt.append(tag)
                     i += 1
 
                 # make sure everything balances
@@ -424,7 +491,7 @@ class TagList(object):
 
                 # get everything we need?
                 if keeper:
-                    return TagList(rslt)
+                    return TagList(tags[start:i])
             else:
                 raise InvalidTag("unexpected tag")
 
@@ -436,23 +503,26 @@ class TagList(object):
 
     def encode(self, pdu):
         """encode the tag list into a PDU."""
-        for tag in self.tagList:
+        for tag in self._tags[self.position:]:
             tag.encode(pdu)
 
     def decode(self, pdu):
         """decode the tags from a PDU."""
-        while pdu.pduData:
-            self.tagList.append( Tag(pdu) )
+        tags = self._tags
+        while pdu.remaining():
+            tags.append( Tag(pdu) )
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
-        for tag in self.tagList:
+        for tag in self._tags[self.position:]:
             tag.debug_contents(indent+1, file, _ids)
 
 #
 #   Atomic
 #
 
-class Atomic(object):
+class Atomic(SlotsPickleMixIn):
+
+    __slots__ = ('value',)
 
     _app_tag = None
 
@@ -504,7 +574,10 @@ class Atomic(object):
         """Return True if arg is valid value for the class."""
         raise NotImplementedError("call on a derived class of Atomic")
 
-class CommonMath:
+class CommonMath(object):
+
+    __slots__ = ()
+
     def __add__(self, other):
         return self.value + other.value if isinstance(other, Atomic) else (self.value + other)
 
@@ -539,6 +612,8 @@ class CommonMath:
 
 class Null(Atomic):
 
+    __slots__ = ()
+
     _app_tag = Tag.nullAppTag
 
     def __init__(self, arg=None):
@@ -581,6 +656,8 @@ class Null(Atomic):
 
 class Boolean(Atomic):
 
+    __slots__ = ()
+
     _app_tag = Tag.booleanAppTag
 
     def __init__(self, arg=None):
@@ -627,6 +704,8 @@ class Boolean(Atomic):
 
 class Unsigned(Atomic, CommonMath):
 
+    __slots__ = ()
+
     _app_tag = Tag.unsignedAppTag
     _low_limit = 0
     _high_limit = None
@@ -706,10 +785,16 @@ class Unsigned(Atomic, CommonMath):
         return "%s(%s)" % (self.__class__.__name__, self.value)
 
 class Unsigned8(Unsigned):
+
+    __slots__ = ()
+
     _low_limit = 0
     _high_limit = 255
 
 class Unsigned16(Unsigned):
+
+    __slots__ = ()
+
     _low_limit = 0
     _high_limit = 65535
 
@@ -719,6 +804,8 @@ class Unsigned16(Unsigned):
 
 class Integer(Atomic, CommonMath):
 
+    __slots__ = ()
+
     _app_tag = Tag.integerAppTag
 
     def __init__(self,arg = None):
@@ -794,6 +881,8 @@ class Integer(Atomic, CommonMath):
 
 class Real(Atomic, CommonMath):
 
+    __slots__ = ()
+
     _app_tag = Tag.realAppTag
 
     def __init__(self, arg=None):
@@ -839,6 +928,8 @@ class Real(Atomic, CommonMath):
 
 class Double(Atomic, CommonMath):
 
+    __slots__ = ()
+
     _app_tag = Tag.doubleAppTag
 
     def __init__(self,arg = None):
@@ -884,6 +975,8 @@ class Double(Atomic, CommonMath):
 
 class OctetString(Atomic):
 
+    __slots__ = ()
+
     _app_tag = Tag.octetStringAppTag
 
     def __init__(self, arg=None):
@@ -924,6 +1017,8 @@ class OctetString(Atomic):
 
 class CharacterString(Atomic):
 
+    __slots__ = ('strEncoding', 'strValue')
+
     _app_tag = Tag.characterStringAppTag
 
     def __init__(self, arg=None):
@@ -1001,6 +1096,8 @@ class CharacterString(Atomic):
 
 class BitString(Atomic):
 
+    __slots__ = ()
+
     _app_tag = Tag.bitStringAppTag
     bitNames = {}
     bitLen = 0
@@ -1148,25 +1245,64 @@ class BitString(Atomic):
 #   Enumerated
 #
 
+#
+#   expand_enumerations
+#
+
+def expand_enumerations(klass):
+    # build a value dictionary
+    xlateTable = {}
+
+    for c in klass.__mro__:
+        enumerations = getattr(c, 'enumerations', {})
+        if enumerations:
+            for name, value in enumerations.items():
+                # save the results
+                xlateTable[name] = value
+                xlateTable[value] = name
+
+                # save the name in the class
+                setattr(klass, name, value)
+
+    # save the dictionary in the class
+    setattr(klass, '_xlate_table', xlateTable)
+
+#
+#   _EnumeratedMetaclass
+#
+
+class _EnumeratedMetaclass(type):
+
+    """
+    Expand the enumerations when the class is created, rather than checking
+    for the translation table each time an instance is created.  Classes
+    that change their enumerations later call expand_enumerations() again.
+    """
+
+    def __init__(cls, *args):
+        super(_EnumeratedMetaclass, cls).__init__(*args)
+        expand_enumerations(cls)
+
+#
+#   Enumerated
+#
+
 class Enumerated(Atomic):
 
+    __metaclass__ = _EnumeratedMetaclass
+    __slots__ = ()
+
     _app_tag = Tag.enumeratedAppTag
 
     enumerations = {}
     _xlate_table = {}
 
     def __init__(self, arg=None):
-        self.value = 0L
-
-        # see if the class has a translate table
-        if '_xlate_table' not in self.__class__.__dict__:
-            expand_enumerations(self.__class__)
-
         # initialize the object
-        if arg is None:
-            pass
-        elif isinstance(arg, Tag):
-            self.decode(arg)
+        if isinstance(arg, basestring):
+            if arg not in self._xlate_table:
+                raise ValueError("undefined enumeration '%s'" % (arg,))
+            self.value = arg
         elif isinstance(arg, (int, long)):
             if (arg < 0):
                 raise ValueError("unsigned integer required")
@@ -1174,10 +1310,10 @@ class Enumerated(Atomic):
             # convert it to a string if you can
             self.value = self._xlate_table.get(arg, arg)
 
-        elif isinstance(arg, basestring):
-            if arg not in self._xlate_table:
-                raise ValueError("undefined enumeration '%s'" % (arg,))
-            self.value = arg
+        elif arg is None:
+            self.value = 0L
+        elif isinstance(arg, Tag):
+            self.decode(arg)
         elif isinstance(arg, Enumerated):
             self.value = arg.value
         else:
@@ -1228,6 +1364,25 @@ class Enumerated(Atomic):
         else:
             return 0
 
+    def __eq__(self, other):
+        # names and values that are already translated compare directly
+        if isinstance(other, Enumerated):
+            return self.value == other.value
+        elif isinstance(other, basestring) and (other in self._xlate_table):
+            return self.value == other
+        elif isinstance(other, (int, long)) and (other >= 0):
+            return self.value == self._xlate_table.get(other, other)
+
+        return self.value == self.__class__(other).value
+
+    def __lt__(self, other):
+        """Compare in enumeration order, not alphabetic order."""
+        # hoop jump it
+        if not isinstance(other, self.__class__):
+            other = self.__class__(other)
+
+        return self.get_long() < other.get_long()
+
     def encode(self, tag):
         if isinstance(self.value, int):
             value = long(self.value)
@@ -1238,12 +1393,15 @@ class Enumerated(Atomic):
         else:
             raise TypeError("%s is an invalid enumeration value datatype" % (type(self.value),))
 
-        # rip apart the number
-        data = bytearray(struct.pack('>L', value))
-
-        # reduce the value to the smallest number of octets
-        while (len(data) > 1) and (data[0] == 0):
-            del data[0]
+        # use the smallest number of octets
+        if (value < 0x100):
+            data = struct.pack('>B', value)
+        elif (value < 0x10000):
+            data = struct.pack('>H', value)
+        elif (value < 0x1000000):
+            data = struct.pack('>L', value)[1:]
+        else:
+            data = struct.pack('>L', value)
 
         # encode the tag
         tag.set_app_data(Tag.enumeratedAppTag, data)
@@ -1276,28 +1434,6 @@ class Enumerated(Atomic):
     def __str__(self):
         return "%s(%s)" % (self.__class__.__name__, self.value)
 
-#
-#   expand_enumerations
-#
-
-def expand_enumerations(klass):
-    # build a value dictionary
-    xlateTable = {}
-
-    for c in klass.__mro__:
-        enumerations = getattr(c, 'enumerations', {})
-        if enumerations:
-            for name, value in enumerations.items():
-                # save the results
-                xlateTable[name] = value
-                xlateTable[value] = name
-
-                # save the name in the class
-                setattr(klass, name, value)
-
-    # save the dictionary in the class
-    setattr(klass, '_xlate_table', xlateTable)
-
 
 #
 #   Date
@@ -1337,6 +1473,8 @@ _date_patterns = [
 
 class Date(Atomic):
 
+    __slots__ = ()
+
     _app_tag = Tag.dateAppTag
 
     def __init__(self, arg=None, year=255, month=255, day=255, day_of_week=255):
@@ -1538,6 +1676,8 @@ class Date(Atomic):
 
 class Time(Atomic):
 
+    __slots__ = ()
+
     _app_tag = Tag.timeAppTag
     _time_regex = re.compile("^([*]|[0-9]+)[:]([*]|[0-9]+)(?:[:]([*]|[0-9]+)(?:[.]([*]|[0-9]+))?)?$")
 
@@ -1657,6 +1797,9 @@ class Time(Atomic):
 #
 
 class ObjectType(Enumerated):
+
+    __slots__ = ()
+
     vendor_range = (128, 1023)
     enumerations = \
         { 'accessCredential':32
@@ -1732,6 +1875,8 @@ expand_enumerations(ObjectType)
 
 class ObjectIdentifier(Atomic):
 
+    __slots__ = ()
+
     _app_tag = Tag.objectIdentifierAppTag
     objectTypeClass = ObjectType
 
@@ -1744,7 +1889,9 @@ class ObjectIdentifier(Atomic):
             pass
         elif len(args) == 1:
             arg = args[0]
-            if isinstance(arg, Tag):
+            if isinstance(arg, tuple):
+                self.set_tuple(*arg)
+            elif isinstance(arg, Tag):
                 self.decode(arg)
             elif isinstance(arg, int):
                 self.set_long(long(arg))
@@ -1760,8 +1907,6 @@ class ObjectIdentifier(Atomic):
                     raise ValueError("invalid format")
 
                 self.set_tuple(objType, objInstance)
-            elif isinstance(arg, tuple):
-                self.set_tuple(*arg)
             elif isinstance(arg, ObjectIdentifier):
                 self.value = arg.value
             else:
@@ -1802,7 +1947,7 @@ class ObjectIdentifier(Atomic):
             objType = int(objType)
         elif isinstance(objType, basestring):
             # turn it back into an integer
-            objType = self.objectTypeClass()[objType]
+            objType = self.objectTypeClass._xlate_table[objType]
         else:
             raise TypeError("invalid datatype for objType")
 
@@ -1814,7 +1959,7 @@ class ObjectIdentifier(Atomic):
         objType = (value >> 22) & 0x03FF
 
         # try and make it pretty
-        objType = self.objectTypeClass()[objType] or objType
+        objType = self.objectTypeClass._xlate_table.get(objType, objType)
 
         # suck out the instance
         objInstance = value & 0x003FFFFF
@@ -5,7 +5,8 @@ from ..capability import Capability
 
 from ..pdu import GlobalBroadcast
 
-from ..apdu import WhoIsRequest, IAmRequest, IHaveRequest, SimpleAckPDU
+from ..apdu import WhoIsRequest, IAmRequest, IHaveRequest, SimpleAckPDU, \
+    UnconfirmedRequestPDU
 from ..errors import ExecutionError, InconsistentParameters, \
     MissingRequiredParameter, ParameterOutOfRange
 from ..task import FunctionTask
@@ -14,6 +15,23 @@ from ..task import FunctionTask
 _debug = 0
 _log = ModuleLogger(globals())
 
+# properties of the local device that change the I-Am
+_i_am_properties = (
+    'objectIdentifier', 'maxApduLengthAccepted', 'segmentationSupported',
+    'vendorIdentifier', 'objectName',
+    )
+
+#
+#   _monitor
+#
+
+def _monitor(obj, properties, fn):
+    """Add the function to the property monitors of the object, once."""
+    for prop in properties:
+        monitors = obj._property_monitors[prop]
+        if fn not in monitors:
+            monitors.append(fn)
+
 #
 #   Who-Is I-Am Services
 #
@@ -25,6 +43,9 @@ class WhoIsIAmServices(Capability):
         if _debug: WhoIsIAmServices._debug("__init__")
         Capability.__init__(self)
 
+        # the encoded I-Am parameters, built when they are first needed
+        self._i_am_data = None
+
     def startup(self):
         if _debug: WhoIsIAmServices._debug("startup")
 
@@ -115,13 +136,21 @@ class WhoIsIAmServices(Capability):
             if _debug: WhoIsIAmServices._debug("    - no local device")
             return
 
+        # encode the parameters the first time and after they change
+        if self._i_am_data is None:
+            xpdu = UnconfirmedRequestPDU()
+            IAmRequest(
+                iAmDeviceIdentifier=self.localDevice.objectIdentifier,
+                maxAPDULengthAccepted=self.localDevice.maxApduLengthAccepted,
+                segmentationSupported=self.localDevice.segmentationSupported,
+                vendorID=self.localDevice.vendorIdentifier,
+                ).encode(xpdu)
+
+            self._i_am_data = bytes(xpdu.pduData)
+            _monitor(self.localDevice, _i_am_properties, self._i_am_changed)
+
         # create a I-Am "response" back to the source
-        iAm = IAmRequest(
-            iAmDeviceIdentifier=self.localDevice.objectIdentifier,
-            maxAPDULengthAccepted=self.localDevice.maxApduLengthAccepted,
-            segmentationSupported=self.localDevice.segmentationSupported,
-            vendorID=self.localDevice.vendorIdentifier,
-            )
+        iAm = UnconfirmedRequestPDU(IAmRequest.serviceChoice, self._i_am_data)
 
         # defaults to a global broadcast
         if not address:
@@ -132,6 +161,12 @@ class WhoIsIAmServices(Capability):
         # away it goes
         self.request(iAm)
 
+    def _i_am_changed(self, old_value, new_value):
+        """One of the local device properties in the I-Am has changed."""
+        if _debug: WhoIsIAmServices._debug("_i_am_changed %r %r", old_value, new_value)
+
+        self._i_am_data = None
+
     def do_IAmRequest(self, apdu):
         """Respond to an I-Am request."""
         if _debug: WhoIsIAmServices._debug("do_IAmRequest %r", apdu)
@@ -168,6 +203,9 @@ class WhoHasIHaveServices(Capability):
         if _debug: WhoHasIHaveServices._debug("__init__")
         Capability.__init__(self)
 
+        # object identifier to the object and its encoded I-Have parameters
+        self._i_have_data = {}
+
     def who_has(self, thing, address=None):
         if _debug: WhoHasIHaveServices._debug("who_has %r address=%r", thing, address)
 
@@ -227,12 +265,24 @@ class WhoHasIHaveServices(Capability):
             if _debug: WhoIsIAmServices._debug("    - no local device")
             return
 
+        # encode the parameters the first time and after they change
+        obj, data = self._i_have_data.get(thing.objectIdentifier, (None, None))
+        if obj is not thing:
+            xpdu = UnconfirmedRequestPDU()
+            IHaveRequest(
+                deviceIdentifier=self.localDevice.objectIdentifier,
+                objectIdentifier=thing.objectIdentifier,
+                objectName=thing.objectName,
+                ).encode(xpdu)
+
+            data = bytes(xpdu.pduData)
+            self._i_have_data[thing.objectIdentifier] = (thing, data)
+
+            _monitor(self.localDevice, ('objectIdentifier',), self._i_have_changed)
+            _monitor(thing, ('objectIdentifier', 'objectName'), self._i_have_changed)
+
         # build the request
-        iHave = IHaveRequest(
-            deviceIdentifier=self.localDevice.objectIdentifier,
-            objectIdentifier=thing.objectIdentifier,
-            objectName=thing.objectName,
-            )
+        iHave = UnconfirmedRequestPDU(IHaveRequest.serviceChoice, data)
 
         # defaults to a global broadcast
         if not address:
@@ -243,6 +293,12 @@ class WhoHasIHaveServices(Capability):
         # send it along
         self.request(iHave)
 
+    def _i_have_changed(self, old_value, new_value):
+        """The identifier or name of an object has changed."""
+        if _debug: WhoHasIHaveServices._debug("_i_have_changed %r %r", old_value, new_value)
+
+        self._i_have_data.clear()
+
     def do_IHaveRequest(self, apdu):
         """Respond to a I-Have request."""
         if _debug: WhoHasIHaveServices._debug("do_IHaveRequest %r", apdu)
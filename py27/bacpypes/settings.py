@@ -31,6 +31,14 @@ settings = Settings(
     max_bytes=1048576,
     backup_count=5,
     route_aware=False,
+    task_manager="heap",
+    recurring_spread=False,
+    clock="wall",
+    lazy_decode=False,
+    request_window=1,
+    adaptive_apdu_timeout=False,
+    read_coalesce_window=0,
+    single_flight=False,
 )
 
 
@@ -45,6 +53,14 @@ def os_settings():
         ("max_bytes", "BACPYPES_MAX_BYTES"),
         ("backup_count", "BACPYPES_BACKUP_COUNT"),
         ("route_aware", "BACPYPES_ROUTE_AWARE"),
+        ("task_manager", "BACPYPES_TASK_MANAGER"),
+        ("recurring_spread", "BACPYPES_RECURRING_SPREAD"),
+        ("clock", "BACPYPES_CLOCK"),
+        ("lazy_decode", "BACPYPES_LAZY_DECODE"),
+        ("request_window", "BACPYPES_REQUEST_WINDOW"),
+        ("adaptive_apdu_timeout", "BACPYPES_ADAPTIVE_APDU_TIMEOUT"),
+        ("read_coalesce_window", "BACPYPES_READ_COALESCE_WINDOW"),
+        ("single_flight", "BACPYPES_SINGLE_FLIGHT"),
     ):
         env_value = os.getenv(env_name, None)
         if env_value is not None:
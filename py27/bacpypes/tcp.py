@@ -9,7 +9,7 @@ import socket
 import errno
 
 import cPickle as pickle
-from time import time as _time, sleep as _sleep
+from time import sleep as _sleep
 from StringIO import StringIO
 
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
@@ -294,7 +294,7 @@ class TCPClientActor(TCPClient):
         self._connect_timeout = director.connect_timeout
         if self._connect_timeout:
             self.connect_timeout_task = FunctionTask(self.connect_timeout)
-            self.connect_timeout_task.install_task(_time() + self._connect_timeout)
+            self.connect_timeout_task.install_task(delta=self._connect_timeout)
         else:
             self.connect_timeout_task = None
 
@@ -308,7 +308,7 @@ class TCPClientActor(TCPClient):
         self._idle_timeout = director.idle_timeout
         if self._idle_timeout:
             self.idle_timeout_task = FunctionTask(self.idle_timeout)
-            self.idle_timeout_task.install_task(_time() + self._idle_timeout)
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
         else:
             self.idle_timeout_task = None
 
@@ -399,7 +399,7 @@ class TCPClientActor(TCPClient):
 
         # reschedule the timer
         if self.idle_timeout_task:
-            self.idle_timeout_task.install_task(_time() + self._idle_timeout)
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
 
         # continue as usual
         TCPClient.indication(self, pdu)
@@ -412,7 +412,7 @@ class TCPClientActor(TCPClient):
 
         # reschedule the timer
         if self.idle_timeout_task:
-            self.idle_timeout_task.install_task(_time() + self._idle_timeout)
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
 
         # process this as a response from the director
         self.director.response(pdu)
@@ -500,7 +500,7 @@ class TCPClientDirector(Server, ServiceAccessPoint, DebugContents):
         # see if it should be reconnected
         if actor.peer in self.reconnect:
             connect_task = FunctionTask(self.connect, actor.peer)
-            connect_task.install_task(_time() + self.reconnect[actor.peer])
+            connect_task.install_task(delta=self.reconnect[actor.peer])
 
     def actor_error(self, actor, error):
         if _debug: TCPClientDirector._debug("actor_error %r %r", actor, error)
@@ -665,7 +665,7 @@ class TCPServerActor(TCPServer):
         self._idle_timeout = director.idle_timeout
         if self._idle_timeout:
             self.idle_timeout_task = FunctionTask(self.idle_timeout)
-            self.idle_timeout_task.install_task(_time() + self._idle_timeout)
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
         else:
             self.idle_timeout_task = None
 
@@ -720,7 +720,7 @@ class TCPServerActor(TCPServer):
 
         # reschedule the timer
         if self.idle_timeout_task:
-            self.idle_timeout_task.install_task(_time() + self._idle_timeout)
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
 
         # continue as usual
         TCPServer.indication(self, pdu)
@@ -738,7 +738,7 @@ class TCPServerActor(TCPServer):
 
         # reschedule the timer
         if self.idle_timeout_task:
-            self.idle_timeout_task.install_task(_time() + self._idle_timeout)
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
 
         # process this as a response from the director
         self.director.response(pdu)
@@ -9,8 +9,6 @@ import socket
 import cPickle as pickle
 import Queue as queue
 
-from time import time as _time
-
 from .debugging import ModuleLogger, bacpypes_debugging
 
 from .core import deferred
@@ -45,7 +43,7 @@ class UDPActor:
         self.timeout = director.timeout
         if self.timeout > 0:
             self.timer = FunctionTask(self.idle_timeout)
-            self.timer.install_task(_time() + self.timeout)
+            self.timer.install_task(delta=self.timeout)
         else:
             self.timer = None
 
@@ -63,7 +61,7 @@ class UDPActor:
 
         # reschedule the timer
         if self.timer:
-            self.timer.install_task(_time() + self.timeout)
+            self.timer.install_task(delta=self.timeout)
 
         # put it in the outbound queue for the director
         self.director.request.put(pdu)
@@ -73,7 +71,7 @@ class UDPActor:
 
         # reschedule the timer
         if self.timer:
-            self.timer.install_task(_time() + self.timeout)
+            self.timer.install_task(delta=self.timeout)
 
         # process this as a response from the director
         self.director.response(pdu)
@@ -125,8 +123,8 @@ class UDPPickleActor(UDPActor):
 @bacpypes_debugging
 class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
 
-    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, sid=None, sapID=None):
-        if _debug: UDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r sid=%r sapID=%r", address, timeout, reuse, actorClass, sid, sapID)
+    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, sid=None, sapID=None, reuse_port=False):
+        if _debug: UDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r sid=%r sapID=%r reuse_port=%r", address, timeout, reuse, actorClass, sid, sapID, reuse_port)
         Server.__init__(self, sid)
         ServiceAccessPoint.__init__(self, sapID)
 
@@ -150,6 +148,13 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         if reuse:
             self.set_reuse_addr()
 
+        # if the port is shared by more than one process, each one gets
+        # a share of the unicast traffic and a copy of the broadcasts
+        if reuse_port:
+            if not hasattr(socket, 'SO_REUSEPORT'):
+                raise RuntimeError("SO_REUSEPORT not supported")
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
         # proceed with the bind
         try:
             self.bind(address)
@@ -0,0 +1,548 @@
+#!/usr/bin/python
+
+"""
+Asyncio Integration
+
+This module runs the stack on an asyncio event loop rather than the
+blocking loop in core.run().  Tasks are scheduled with loop.call_at(),
+deferred functions are passed to loop.call_soon_threadsafe(), the UDP and
+TCP server directors are asyncio protocols, and an IOCB can be awaited.
+"""
+
+import sys
+import functools
+import socket
+import asyncio
+
+from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
+
+from . import core
+from . import task as _task
+from .task import TaskManager, FunctionTask, OneShotFunction
+from .comm import PDU, Server, ServiceAccessPoint
+from .iocb import ABORTED
+from .udp import UDPActor, UDPDirector
+from .tcp import TCPServerDirector
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   IOCBAbort
+#
+
+class IOCBAbort(RuntimeError):
+
+    """
+    Raised when an awaited IOCB is aborted with something that is not an
+    exception, like an Error, Reject or Abort PDU.  The original error is
+    the first argument.
+    """
+
+    pass
+
+#
+#   AsyncioTaskManager
+#
+
+# @bacpypes_debugging - implicit via metaclass
+class AsyncioTaskManager(TaskManager):
+
+    def __init__(self, loop=None):
+        if _debug: AsyncioTaskManager._debug("__init__ loop=%r", loop)
+
+        # the event loop and the handles of scheduled tasks
+        self.loop = loop or asyncio.get_event_loop()
+        self.handles = {}
+
+        # pass along initialization
+        TaskManager.__init__(self)
+
+        # the event loop does not need to be woken up
+        if self.trigger:
+            self.trigger.close()
+            self.trigger = None
+
+    def install_task(self, task):
+        if _debug: AsyncioTaskManager._debug("install_task %r @ %r", task, task.taskTime)
+
+        # if the taskTime is None is hasn't been computed correctly
+        if task.taskTime is None:
+            raise RuntimeError("task time is None")
+
+        # if this is already installed, suspend it
+        if task.isScheduled:
+            self.suspend_task(task)
+
+        # translate the task time into the event loop time
+        when = self.loop.time() + (task.taskTime - self.get_time())
+
+        self.handles[task] = self.loop.call_at(when, self._run_task, task)
+        task.isScheduled = True
+
+    def suspend_task(self, task):
+        if _debug: AsyncioTaskManager._debug("suspend_task %r", task)
+
+        handle = self.handles.pop(task, None)
+        if handle:
+            handle.cancel()
+        else:
+            if _debug: AsyncioTaskManager._debug("    - task not found")
+
+        task.isScheduled = False
+
+    def get_next_task(self):
+        """The event loop runs the tasks, there is never anything to do."""
+        return (None, None)
+
+    def _run_task(self, task):
+        if _debug: AsyncioTaskManager._debug("_run_task %r", task)
+
+        # no longer scheduled
+        del self.handles[task]
+        task.isScheduled = False
+
+        try:
+            self.process_task(task)
+        except Exception as err:
+            AsyncioTaskManager._exception("an error has occurred: %s", err)
+
+#
+#   enable
+#
+
+@bacpypes_debugging
+def enable(loop=None):
+    """Switch the stack over to the asyncio event loop, this must be called
+    before any other task manager has been created."""
+    if _debug: enable._debug("enable loop=%r", loop)
+
+    if loop is None:
+        loop = asyncio.get_event_loop()
+
+    # the task manager is a singleton, it cannot be some other kind and
+    # calling this again returns the one already created
+    if _task._task_manager and not isinstance(_task._task_manager, AsyncioTaskManager):
+        raise RuntimeError("another task manager has already been created")
+    task_manager = AsyncioTaskManager(loop)
+    if task_manager.loop is not loop:
+        raise RuntimeError("the task manager is using another event loop")
+
+    core.taskManager = task_manager
+    core.eventLoop = loop
+    core.running = True
+
+    # move anything that has already been deferred over to the loop
+    while core.deferredFns:
+        fn, args, kwargs = core.deferredFns.popleft()
+        loop.call_soon(functools.partial(fn, *args, **kwargs))
+
+    return loop
+
+#
+#   run
+#
+
+@bacpypes_debugging
+def run(loop=None, sigterm=core.stop):
+    """Like core.run(), but the stack runs on an asyncio event loop until
+    core.stop() is called."""
+    if _debug: run._debug("run loop=%r sigterm=%r", loop, sigterm)
+
+    loop = enable(loop)
+
+    # stop cleanly when terminated
+    if (sigterm is not None) and hasattr(loop, 'add_signal_handler') and (sys.platform != 'win32'):
+        import signal
+        loop.add_signal_handler(signal.SIGTERM, sigterm)
+
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        if _debug: run._info("keyboard interrupt")
+    finally:
+        core.running = False
+        core.eventLoop = None
+
+#
+#   iocb_future
+#
+
+@bacpypes_debugging
+def iocb_future(iocb, loop=None):
+    """Return a future that resolves to the response of the IOCB, or raises
+    the error when it is aborted."""
+    if _debug: iocb_future._debug("iocb_future %r loop=%r", iocb, loop)
+
+    if loop is None:
+        loop = core.eventLoop or asyncio.get_event_loop()
+    future = loop.create_future()
+
+    def iocb_complete(iocb):
+        if _debug: iocb_future._debug("iocb_complete %r", iocb)
+        if future.done():
+            return
+
+        if iocb.ioState == ABORTED:
+            err = iocb.ioError
+            if not isinstance(err, BaseException):
+                err = IOCBAbort(err)
+            future.set_exception(err)
+        else:
+            future.set_result(iocb.ioResponse)
+
+    def iocb_callback(iocb):
+        # the IOCB might be completed in another thread
+        loop.call_soon_threadsafe(iocb_complete, iocb)
+
+    if iocb.ioComplete.is_set():
+        iocb_complete(iocb)
+    else:
+        iocb.add_callback(iocb_callback)
+
+    return future
+
+#
+#   _DatagramQueue
+#
+#   UDP actors put their outbound PDUs in the director request queue, this
+#   looks enough like a queue to send them on the transport.
+#
+
+class _DatagramQueue:
+
+    def __init__(self, director):
+        self.director = director
+
+    def put(self, pdu):
+        self.director.sendto(pdu)
+
+    def empty(self):
+        return True
+
+#
+#   AsyncioUDPDirector
+#
+
+@bacpypes_debugging
+class AsyncioUDPDirector(asyncio.DatagramProtocol, Server, ServiceAccessPoint):
+
+    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, sid=None, sapID=None, loop=None, reuse_port=False):
+        if _debug: AsyncioUDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r sid=%r sapID=%r reuse_port=%r", address, timeout, reuse, actorClass, sid, sapID, reuse_port)
+        Server.__init__(self, sid)
+        ServiceAccessPoint.__init__(self, sapID)
+
+        # check the actor class
+        if not issubclass(actorClass, UDPActor):
+            raise TypeError("actorClass must be a subclass of UDPActor")
+        self.actorClass = actorClass
+
+        # save the timeout for actors
+        self.timeout = timeout
+
+        # save the address
+        self.address = address
+
+        # the event loop
+        self.loop = loop or core.eventLoop or asyncio.get_event_loop()
+
+        # make the socket here so bind errors are raised to the caller
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if reuse:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            self.socket.bind(address)
+        except socket.error as err:
+            if _debug: AsyncioUDPDirector._debug("    - bind error: %r", err)
+            self.socket.close()
+            raise
+        if _debug: AsyncioUDPDirector._debug("    - getsockname: %r", self.socket.getsockname())
+
+        # allow it to send broadcasts
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.socket.setblocking(False)
+
+        # actors send through the transport when it is ready
+        self.transport = None
+        self.pending = []
+        self.request = _DatagramQueue(self)
+
+        # start with an empty peer pool
+        self.peers = {}
+
+        # the loop will call connection_made
+        self.loop.create_task(self.loop.create_datagram_endpoint(lambda: self, sock=self.socket))
+
+    # actors are managed the same way as the asyncore director
+    add_actor = UDPDirector.add_actor
+    del_actor = UDPDirector.del_actor
+    actor_error = UDPDirector.actor_error
+    get_actor = UDPDirector.get_actor
+    indication = UDPDirector.indication
+    _response = UDPDirector._response
+
+    def connection_made(self, transport):
+        if _debug: AsyncioUDPDirector._debug("connection_made %r", transport)
+
+        self.transport = transport
+
+        # send what has been waiting
+        pending, self.pending = self.pending, []
+        for pdu in pending:
+            self.sendto(pdu)
+
+    def datagram_received(self, data, addr):
+        if _debug: AsyncioUDPDirector._debug("datagram_received(%r) %d octets from %s", self.address, len(data), addr)
+
+        # already running in the loop, no need to defer
+        self._response(PDU(data, source=addr))
+
+    def error_received(self, exc):
+        if _debug: AsyncioUDPDirector._debug("error_received %r", exc)
+
+        self.handle_error(exc)
+
+    def connection_lost(self, exc):
+        if _debug: AsyncioUDPDirector._debug("connection_lost %r", exc)
+
+        self.transport = None
+
+    def sendto(self, pdu):
+        """Send a PDU on the transport."""
+        if _debug: AsyncioUDPDirector._debug("sendto %r", pdu)
+
+        if not self.transport:
+            self.pending.append(pdu)
+            return
+
+        self.transport.sendto(pdu.pduData, pdu.pduDestination)
+
+    def close_socket(self):
+        """Close the socket."""
+        if _debug: AsyncioUDPDirector._debug("close_socket")
+
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+
+    def handle_error(self, error=None):
+        if _debug: AsyncioUDPDirector._debug("handle_error %r", error)
+
+#
+#   AsyncioTCPServerActor
+#
+
+@bacpypes_debugging
+class AsyncioTCPServerActor(asyncio.Protocol):
+
+    def __init__(self, director):
+        if _debug: AsyncioTCPServerActor._debug("__init__ %r", director)
+
+        # keep track of the director
+        self.director = director
+
+        # filled in when the connection is made
+        self.transport = None
+        self.peer = None
+
+        # idle timer and flush state
+        self._idle_timeout = director.idle_timeout
+        self.idle_timeout_task = None
+        self.flush_task = None
+
+    def connection_made(self, transport):
+        if _debug: AsyncioTCPServerActor._debug("connection_made %r", transport)
+
+        self.transport = transport
+        self.peer = transport.get_extra_info('peername')[:2]
+
+        # add a timer
+        if self._idle_timeout:
+            self.idle_timeout_task = FunctionTask(self.idle_timeout)
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
+
+        # tell the director this is a new actor
+        self.director.add_actor(self)
+
+    def data_received(self, data):
+        if _debug: AsyncioTCPServerActor._debug("data_received %d octets", len(data))
+
+        self.response(PDU(data))
+
+    def connection_lost(self, exc):
+        if _debug: AsyncioTCPServerActor._debug("connection_lost %r", exc)
+
+        if exc is not None:
+            self.handle_error(exc)
+
+        self.transport = None
+        self.handle_close()
+
+    def handle_error(self, error=None):
+        if _debug: AsyncioTCPServerActor._debug("handle_error %r", error)
+
+        # pass along to the director
+        if error is not None:
+            self.director.actor_error(self, error)
+
+    def handle_close(self):
+        if _debug: AsyncioTCPServerActor._debug("handle_close")
+
+        # if there's a flush task, cancel it
+        if self.flush_task:
+            self.flush_task.suspend_task()
+            self.flush_task = None
+
+        # if there is an idle timeout, cancel it
+        if self.idle_timeout_task:
+            if _debug: AsyncioTCPServerActor._debug("    - canceling idle timeout")
+            self.idle_timeout_task.suspend_task()
+            self.idle_timeout_task = None
+
+        # tell the director this is gone
+        if self.peer in self.director.servers:
+            self.director.del_actor(self)
+
+        # close the transport
+        if self.transport:
+            transport, self.transport = self.transport, None
+            transport.close()
+
+    def idle_timeout(self):
+        if _debug: AsyncioTCPServerActor._debug("idle_timeout")
+
+        # shut it down
+        self.handle_close()
+
+    def indication(self, pdu):
+        if _debug: AsyncioTCPServerActor._debug("indication %r", pdu)
+
+        # additional downstream data is tossed while flushing
+        if self.flush_task:
+            if _debug: AsyncioTCPServerActor._debug("    - flushing")
+            return
+
+        # reschedule the timer
+        if self.idle_timeout_task:
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
+
+        # send it along
+        if self.transport:
+            self.transport.write(pdu.pduData)
+
+    def response(self, pdu):
+        if _debug: AsyncioTCPServerActor._debug("response %r", pdu)
+
+        # upstream data is tossed while flushing
+        if self.flush_task:
+            if _debug: AsyncioTCPServerActor._debug("    - flushing")
+            return
+
+        # save the source
+        pdu.pduSource = self.peer
+
+        # reschedule the timer
+        if self.idle_timeout_task:
+            self.idle_timeout_task.install_task(delta=self._idle_timeout)
+
+        # process this as a response from the director
+        self.director.response(pdu)
+
+    def flush(self):
+        if _debug: AsyncioTCPServerActor._debug("flush")
+
+        # clear out the old task
+        self.flush_task = None
+
+        # if the outgoing buffer has data, re-schedule another attempt
+        if self.transport and self.transport.get_write_buffer_size():
+            self.flush_task = OneShotFunction(self.flush)
+            return
+
+        # close up shop, all done
+        self.handle_close()
+
+#
+#   AsyncioTCPServerDirector
+#
+
+@bacpypes_debugging
+class AsyncioTCPServerDirector(Server, ServiceAccessPoint, DebugContents):
+
+    _debug_contents = ('port', 'idle_timeout', 'actorClass', 'servers')
+
+    def __init__(self, address, listeners=5, idle_timeout=0, reuse=False, actorClass=AsyncioTCPServerActor, cid=None, sapID=None, loop=None):
+        if _debug:
+            AsyncioTCPServerDirector._debug("__init__ %r listeners=%r idle_timeout=%r reuse=%r actorClass=%r cid=%r sapID=%r"
+                , address, listeners, idle_timeout, reuse, actorClass, cid, sapID
+                )
+        Server.__init__(self, cid)
+        ServiceAccessPoint.__init__(self, sapID)
+
+        # save the address and timeout
+        self.port = address
+        self.idle_timeout = idle_timeout
+
+        # check the actor class
+        if not issubclass(actorClass, AsyncioTCPServerActor):
+            raise TypeError("actorClass must be a subclass of AsyncioTCPServerActor")
+        self.actorClass = actorClass
+
+        # start with an empty pool of servers
+        self.servers = {}
+
+        # the event loop
+        self.loop = loop or core.eventLoop or asyncio.get_event_loop()
+
+        # make the listening socket here so bind errors are raised
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if reuse:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.socket.bind(address)
+        except socket.error as err:
+            if _debug: AsyncioTCPServerDirector._debug("    - bind error: %r", err)
+            self.socket.close()
+            raise
+        self.socket.listen(listeners)
+        self.socket.setblocking(False)
+
+        # the loop will accept connections
+        self.server = None
+        future = asyncio.ensure_future(
+            self.loop.create_server(lambda: self.actorClass(self), sock=self.socket),
+            loop=self.loop,
+            )
+        future.add_done_callback(self._server_started)
+
+    def _server_started(self, future):
+        if _debug: AsyncioTCPServerDirector._debug("_server_started %r", future)
+
+        self.server = future.result()
+
+    # actors are managed the same way as the asyncore director
+    add_actor = TCPServerDirector.add_actor
+    del_actor = TCPServerDirector.del_actor
+    actor_error = TCPServerDirector.actor_error
+    get_actor = TCPServerDirector.get_actor
+    indication = TCPServerDirector.indication
+
+    def close_socket(self):
+        """Close the listening socket and all of the connections."""
+        if _debug: AsyncioTCPServerDirector._debug("close_socket")
+
+        for actor in list(self.servers.values()):
+            actor.handle_close()
+
+        if self.server:
+            self.server.close()
+            self.server = None
+        if self.socket:
+            self.socket.close()
+            self.socket = None
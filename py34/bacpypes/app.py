@@ -7,10 +7,12 @@ Application Module
 import warnings
 
 from .debugging import bacpypes_debugging, DebugContents, ModuleLogger
+from .settings import settings
 
 from .core import deferred
 from .comm import ApplicationServiceElement, bind
-from .iocb import IOController, SieveQueue
+from .task import FunctionTask
+from .iocb import IOCB, IOController, WindowQueue, PENDING
 
 from .pdu import Address
 
@@ -22,9 +24,13 @@ from .netservice import NetworkServiceAccessPoint, NetworkServiceElement
 from .bvllservice import BIPSimple, BIPForeign, AnnexJCodec, UDPMultiplexer
 
 from .apdu import UnconfirmedRequestPDU, ConfirmedRequestPDU, \
-    SimpleAckPDU, ComplexAckPDU, ErrorPDU, RejectPDU, AbortPDU, Error
+    SimpleAckPDU, ComplexAckPDU, ErrorPDU, RejectPDU, AbortPDU, AbortReason, \
+    RejectReason, Error, ReadPropertyRequest, ReadPropertyACK, \
+    ReadAccessSpecification, ReadPropertyMultipleRequest, ReadRangeRequest
+from .basetypes import PropertyIdentifier, PropertyReference
 
-from .errors import ExecutionError, UnrecognizedService, AbortException, RejectException
+from .errors import ExecutionError, UnrecognizedService, AbortException, RejectException, \
+    DecodingError
 
 # for computing protocol services supported
 from .apdu import confirmed_request_types, unconfirmed_request_types, \
@@ -55,6 +61,9 @@ class DeviceInfo(DebugContents):
         'vendorID',
         'maxNpduLength',
         'maxSegmentsAccepted',
+        'requestWindow',
+        'readPropertyMultiple',
+        'apduTiming',
         )
 
     def __init__(self, device_identifier, address):
@@ -68,6 +77,17 @@ class DeviceInfo(DebugContents):
         self.vendorID = None                            # vendor identifier
         self.maxNpduLength = None           # maximum we can send in transit (see 19.4)
 
+        # confirmed requests the application can have in progress at the
+        # same time, None for the request_window setting
+        self.requestWindow = None
+
+        # true if read property requests can be combined into read property
+        # multiple requests, None when it is not known
+        self.readPropertyMultiple = None
+
+        # round trip time of confirmed requests, see appservice.APDUTiming
+        self.apduTiming = None
+
 #
 #   DeviceInfoCache
 #
@@ -409,6 +429,14 @@ class Application(ApplicationServiceElement, Collector):
 @bacpypes_debugging
 class ApplicationIOController(IOController, Application):
 
+    # estimated size of a read access result in the ack, a real value of
+    # a different object, and the size of the ack header
+    readResultSize = 16
+    readMultipleOverhead = 5
+
+    # requests that can share a request already in progress
+    singleFlightTypes = (ReadPropertyRequest, ReadPropertyMultipleRequest, ReadRangeRequest)
+
     def __init__(self, *args, **kwargs):
         if _debug: ApplicationIOController._debug("__init__")
         IOController.__init__(self)
@@ -417,9 +445,103 @@ class ApplicationIOController(IOController, Application):
         # queues for each address
         self.queue_by_address = {}
 
+        # addresses of devices that are too busy for more than one request
+        # and do not have device information
+        self.too_busy = set()
+
+        # read property requests waiting to be combined by address, and the
+        # addresses of devices that do not support read property multiple
+        # and do not have device information
+        self.read_batches = {}
+        self.no_read_multiple = set()
+
+        # reads in progress and the requests waiting for them, by the
+        # address and the encoded request
+        self.in_flight = {}
+        self.single_flight_hits = 0
+        self.single_flight_misses = 0
+
     def process_io(self, iocb):
         if _debug: ApplicationIOController._debug("process_io %r", iocb)
 
+        # maybe share the response of the same read
+        if settings.single_flight and isinstance(iocb.args[0], self.singleFlightTypes):
+            self._single_flight(iocb)
+            return
+
+        self._send_io(iocb)
+
+    def _send_io(self, iocb):
+        if _debug: ApplicationIOController._debug("_send_io %r", iocb)
+
+        # maybe combine it with other reads from the same device
+        if settings.read_coalesce_window and isinstance(iocb.args[0], ReadPropertyRequest):
+            if self.read_multiple(iocb.args[0].pduDestination):
+                self._read_batch(iocb)
+                return
+
+        self._queue_io(iocb)
+
+    def _single_flight(self, iocb):
+        if _debug: ApplicationIOController._debug("_single_flight %r", iocb)
+
+        apdu = iocb.args[0]
+
+        # the parameters are the same if they encode the same
+        xpdu = ConfirmedRequestPDU()
+        apdu.encode(xpdu)
+        key = (apdu.pduDestination, xpdu.apduService, bytes(xpdu.pduData))
+
+        # wait for the one in progress
+        flight = self.in_flight.get(key, None)
+        if flight:
+            if _debug: ApplicationIOController._debug("    - in flight: %r", flight[0])
+            self.single_flight_hits += 1
+            flight[1].append(iocb)
+            return
+        self.single_flight_misses += 1
+
+        # the request is sent in its own block so the one that started it
+        # can be aborted without stopping the others
+        flight_iocb = IOCB(apdu)
+        flight_iocb.add_callback(self._single_flight_complete, key)
+        self.in_flight[key] = (flight_iocb, [iocb])
+
+        flight_iocb.ioController = self
+        flight_iocb.ioState = PENDING
+        try:
+            self._send_io(flight_iocb)
+        except Exception as err:
+            self.abort_io(flight_iocb, err)
+
+    def _single_flight_complete(self, flight_iocb, key):
+        if _debug: ApplicationIOController._debug("_single_flight_complete %r %r", flight_iocb, key)
+
+        # every request still waiting gets the same response
+        for iocb in self.in_flight.pop(key)[1]:
+            if iocb.ioState != PENDING:
+                continue
+            if flight_iocb.ioError is not None:
+                self.abort_io(iocb, flight_iocb.ioError)
+            else:
+                self.complete_io(iocb, flight_iocb.ioResponse)
+
+    def single_flight_stats(self):
+        """Return the number of reads that shared a read in progress, the
+        number that were sent, and the fraction that were shared."""
+        if _debug: ApplicationIOController._debug("single_flight_stats")
+
+        total = self.single_flight_hits + self.single_flight_misses
+        return {
+            'hits': self.single_flight_hits,
+            'misses': self.single_flight_misses,
+            'hit_rate': float(self.single_flight_hits) / total if total else 0.0,
+            'in_flight': len(self.in_flight),
+            }
+
+    def _queue_io(self, iocb):
+        if _debug: ApplicationIOController._debug("_queue_io %r", iocb)
+
         # get the destination address from the pdu
         destination_address = iocb.args[0].pduDestination
         if _debug: ApplicationIOController._debug("    - destination_address: %r", destination_address)
@@ -427,13 +549,195 @@ class ApplicationIOController(IOController, Application):
         # look up the queue
         queue = self.queue_by_address.get(destination_address, None)
         if not queue:
-            queue = SieveQueue(self._app_request, destination_address)
+            queue = WindowQueue(
+                self._app_request, destination_address,
+                self.request_window(destination_address),
+                )
             self.queue_by_address[destination_address] = queue
         if _debug: ApplicationIOController._debug("    - queue: %r", queue)
 
         # ask the queue to process the request
         queue.request_io(iocb)
 
+    def request_window(self, address):
+        """Return the number of requests that can be in progress to the
+        device at the same time."""
+        if _debug: ApplicationIOController._debug("request_window %r", address)
+
+        device_info = self.deviceInfoCache.get_device_info(address)
+        if device_info and (device_info.requestWindow is not None):
+            return device_info.requestWindow
+        if address in self.too_busy:
+            return 1
+
+        return settings.request_window
+
+    def read_multiple(self, address):
+        """Return true if read property requests to the device can be
+        combined into read property multiple requests."""
+        if _debug: ApplicationIOController._debug("read_multiple %r", address)
+
+        device_info = self.deviceInfoCache.get_device_info(address)
+        if device_info and (device_info.readPropertyMultiple is not None):
+            return device_info.readPropertyMultiple
+
+        return address not in self.no_read_multiple
+
+    def read_batch_size(self, address):
+        """Return the number of reads that can be combined so the ack is
+        likely to fit in the largest APDU the device will send."""
+        if _debug: ApplicationIOController._debug("read_batch_size %r", address)
+
+        device_info = self.deviceInfoCache.get_device_info(address)
+        if device_info and device_info.maxApduLengthAccepted:
+            max_apdu_length = device_info.maxApduLengthAccepted
+        else:
+            max_apdu_length = getattr(getattr(self, 'localDevice', None), 'maxApduLengthAccepted', 1024)
+
+        return max(1, (max_apdu_length - self.readMultipleOverhead) // self.readResultSize)
+
+    def _read_batch(self, iocb):
+        if _debug: ApplicationIOController._debug("_read_batch %r", iocb)
+
+        address = iocb.args[0].pduDestination
+
+        # start a new batch and send it when the window closes
+        batch = self.read_batches.get(address, None)
+        if batch is None:
+            batch = self.read_batches[address] = []
+            FunctionTask(self._read_batch_ready, address, batch).install_task(
+                delta=settings.read_coalesce_window / 1000.0,
+                )
+
+        batch.append(iocb)
+
+        # send it early if it is full
+        if len(batch) >= self.read_batch_size(address):
+            self._read_batch_ready(address, batch)
+
+    def _read_batch_ready(self, address, batch):
+        if _debug: ApplicationIOController._debug("_read_batch_ready %r %r", address, batch)
+
+        # the batch might have been sent already
+        if self.read_batches.get(address, None) is not batch:
+            return
+        del self.read_batches[address]
+
+        # the client might have given up on some of them
+        batch = [iocb for iocb in batch if iocb.ioState == PENDING]
+        if not batch:
+            return
+        if len(batch) == 1:
+            self._queue_io(batch[0])
+            return
+
+        # one specification for each object in the order they were
+        # requested, the same property might be requested more than once
+        read_requests = {}
+        property_references = {}
+        read_access_specs = []
+        for iocb in batch:
+            apdu = iocb.args[0]
+
+            objid = ObjectIdentifier(apdu.objectIdentifier).value
+            propid = PropertyIdentifier(apdu.propertyIdentifier).value
+            key = (objid, propid, apdu.propertyArrayIndex)
+
+            if key in read_requests:
+                read_requests[key].append(iocb)
+                continue
+            read_requests[key] = [iocb]
+
+            references = property_references.get(objid, None)
+            if references is None:
+                references = property_references[objid] = []
+                read_access_specs.append(ReadAccessSpecification(
+                    objectIdentifier=objid,
+                    listOfPropertyReferences=references,
+                    ))
+            references.append(PropertyReference(
+                propertyIdentifier=propid,
+                propertyArrayIndex=apdu.propertyArrayIndex,
+                ))
+
+        request = ReadPropertyMultipleRequest(
+            listOfReadAccessSpecs=read_access_specs,
+            destination=address,
+            )
+        if _debug: ApplicationIOController._debug("    - request: %r", request)
+
+        read_iocb = IOCB(request)
+        read_iocb.add_callback(self._read_multiple_complete, address, read_requests)
+        self.request_io(read_iocb)
+
+    def _read_multiple_complete(self, read_iocb, address, read_requests):
+        if _debug: ApplicationIOController._debug("_read_multiple_complete %r %r %r", read_iocb, address, read_requests)
+
+        if read_iocb.ioResponse is not None:
+            ack = read_iocb.ioResponse
+            try:
+                for read_access_result in ack.listOfReadAccessResults:
+                    objid = read_access_result.objectIdentifier
+
+                    for element in read_access_result.listOfResults:
+                        iocbs = read_requests.pop(
+                            (objid, element.propertyIdentifier, element.propertyArrayIndex), None,
+                            )
+                        if not iocbs:
+                            continue
+
+                        read_result = element.readResult
+                        if read_result.propertyAccessError:
+                            error = read_result.propertyAccessError
+                            resp = Error(errorClass=error.errorClass, errorCode=error.errorCode)
+                            resp.apduService = ReadPropertyRequest.serviceChoice
+                        else:
+                            resp = ReadPropertyACK(
+                                objectIdentifier=objid,
+                                propertyIdentifier=element.propertyIdentifier,
+                                propertyArrayIndex=element.propertyArrayIndex,
+                                propertyValue=read_result.propertyValue,
+                                )
+                        resp.pduSource = ack.pduSource
+                        resp.apduInvokeID = ack.apduInvokeID
+
+                        for iocb in iocbs:
+                            if read_result.propertyAccessError:
+                                self.abort_io(iocb, resp)
+                            else:
+                                self.complete_io(iocb, resp)
+
+            except DecodingError as err:
+                if _debug: ApplicationIOController._debug("    - decoding error: %r", err)
+
+        elif isinstance(read_iocb.ioError, RejectPDU) and \
+                (read_iocb.ioError.apduAbortRejectReason == RejectReason.unrecognizedService):
+            if _debug: ApplicationIOController._debug("    - read property multiple not supported")
+
+            device_info = self.deviceInfoCache.get_device_info(address)
+            if device_info:
+                device_info.readPropertyMultiple = False
+            else:
+                self.no_read_multiple.add(address)
+
+        # the rest are read one at a time
+        for iocbs in read_requests.values():
+            for iocb in iocbs:
+                if iocb.ioState == PENDING:
+                    self._queue_io(iocb)
+
+    def _too_busy(self, apdu):
+        """Return true if the device says it is too busy for this request,
+        so it should get only one at a time."""
+        if isinstance(apdu, AbortPDU):
+            return apdu.apduSrv and (apdu.apduAbortRejectReason in (
+                AbortReason.preemptedByHigherPriorityTask, AbortReason.outOfResources,
+                ))
+        elif isinstance(apdu, ErrorPDU):
+            return getattr(apdu, 'errorClass', None) == 'resources'
+
+        return False
+
     def _app_complete(self, address, apdu):
         if _debug: ApplicationIOController._debug("_app_complete %r %r", address, apdu)
 
@@ -444,22 +748,34 @@ class ApplicationIOController(IOController, Application):
             return
         if _debug: ApplicationIOController._debug("    - queue: %r", queue)
 
-        # make sure it has an active iocb
-        if not queue.active_iocb:
+        # find the active iocb with the same invoke ID
+        iocb = queue.find_io(getattr(apdu, 'apduInvokeID', None))
+        if not iocb:
             ApplicationIOController._debug("no active request for %r" % (address,))
             return
 
         # this request is complete
         if isinstance(apdu, (None.__class__, SimpleAckPDU, ComplexAckPDU)):
-            queue.complete_io(queue.active_iocb, apdu)
+            queue.complete_io(iocb, apdu)
         elif isinstance(apdu, (ErrorPDU, RejectPDU, AbortPDU)):
-            queue.abort_io(queue.active_iocb, apdu)
+            # fall back to one request at a time
+            if (queue.window_size > 1) and self._too_busy(apdu):
+                if _debug: ApplicationIOController._debug("    - too busy")
+                queue.window_size = 1
+
+                device_info = self.deviceInfoCache.get_device_info(address)
+                if device_info:
+                    device_info.requestWindow = 1
+                else:
+                    self.too_busy.add(address)
+
+            queue.abort_io(iocb, apdu)
         else:
             raise RuntimeError("unrecognized APDU type")
         if _debug: Application._debug("    - controller finished")
 
         # if the queue is empty and idle, forget about the controller
-        if not queue.ioQueue.queue and not queue.active_iocb:
+        if not queue.ioQueue.queue and not queue.active_iocbs:
             if _debug: ApplicationIOController._debug("    - queue is empty")
             del self.queue_by_address[address]
 
@@ -84,7 +84,7 @@ class BVLCI(PCI, DebugContents):
         self.bvlciFunction = pdu.get()
         self.bvlciLength = pdu.get_short()
 
-        if (self.bvlciLength != len(pdu.pduData) + 4):
+        if (self.bvlciLength != pdu.remaining() + 4):
             raise DecodingError("invalid BVLCI length")
 
     def bvlci_contents(self, use_dict=None, as_class=dict):
@@ -120,7 +120,7 @@ class BVLPDU(BVLCI, PDUData):
 
     def decode(self, pdu):
         BVLCI.decode(self, pdu)
-        self.pduData = pdu.get_data(len(pdu.pduData))
+        self.take_data(pdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         return PDUData.pdudata_contents(self, use_dict=use_dict, as_class=as_class)
@@ -226,7 +226,7 @@ class WriteBroadcastDistributionTable(BVLPDU):
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
         self.bvlciBDT = []
-        while bvlpdu.pduData:
+        while bvlpdu.remaining():
             bdte = Address(unpack_ip_addr(bvlpdu.get_data(6)))
             bdte.addrMask = bvlpdu.get_long()
             self.bvlciBDT.append(bdte)
@@ -306,7 +306,7 @@ class ReadBroadcastDistributionTableAck(BVLPDU):
 
         # decode the table
         self.bvlciBDT = []
-        while bvlpdu.pduData:
+        while bvlpdu.remaining():
             bdte = Address(unpack_ip_addr(bvlpdu.get_data(6)))
             bdte.addrMask = bvlpdu.get_long()
             self.bvlciBDT.append(bdte)
@@ -361,7 +361,7 @@ class ForwardedNPDU(BVLPDU):
         self.bvlciAddress = Address(unpack_ip_addr(bvlpdu.get_data(6)))
 
         # get the rest of the data
-        self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
+        self.take_data(bvlpdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
@@ -508,7 +508,7 @@ class ReadForeignDeviceTableAck(BVLPDU):
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
         self.bvlciFDT = []
-        while bvlpdu.pduData:
+        while bvlpdu.remaining():
             fdte = FDTEntry()
             fdte.fdAddress = Address(unpack_ip_addr(bvlpdu.get_data(6)))
             fdte.fdTTL = bvlpdu.get_short()
@@ -585,7 +585,7 @@ class DistributeBroadcastToNetwork(BVLPDU):
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
-        self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
+        self.take_data(bvlpdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
@@ -628,7 +628,7 @@ class OriginalUnicastNPDU(BVLPDU):
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
-        self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
+        self.take_data(bvlpdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
@@ -671,7 +671,7 @@ class OriginalBroadcastNPDU(BVLPDU):
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
-        self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
+        self.take_data(bvlpdu)
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
@@ -19,6 +19,10 @@ _log = ModuleLogger(globals())
 _short_mask = 0xFFFF
 _long_mask = 0xFFFFFFFF
 
+# decode multi-byte fields in place
+_unpack_short = struct.Struct('>H').unpack_from
+_unpack_long = struct.Struct('>L').unpack_from
+
 # maps of named clients and servers
 client_map = {}
 server_map = {}
@@ -37,6 +41,11 @@ class PCI(DebugContents):
 
     _debug_contents = ('pduUserData+', 'pduSource', 'pduDestination')
 
+    # the fields are slots of the classes that combine a PCI with PDUData,
+    # each PCI class extends the names with its own fields
+    __slots__ = ()
+    _pci_slots = ('pduUserData', 'pduSource', 'pduDestination')
+
     def __init__(self, *args, **kwargs):
         if _debug: PCI._debug("__init__ %r %r", args, kwargs)
 
@@ -100,6 +109,8 @@ class PCI(DebugContents):
 @bacpypes_debugging
 class PDUData(object):
 
+    __slots__ = ('_pduData', 'pduOffset')
+
     def __init__(self, data=None, *args, **kwargs):
         if _debug: PDUData._debug("__init__ %r %r %r", data, args, kwargs)
 
@@ -107,6 +118,9 @@ class PDUData(object):
         # is another class in the __mro__ of this thing being constructed
         super(PDUData, self).__init__(*args, **kwargs)
 
+        # the offset of the next octet to decode
+        self.pduOffset = 0
+
         # function acts like a copy constructor
         if data is None:
             self.pduData = bytearray()
@@ -117,52 +131,93 @@ class PDUData(object):
         else:
             raise TypeError("bytes or bytearray expected")
 
+    def _get_pdu_data(self):
+        # the data that has been decoded is removed when the rest is
+        # needed as a whole
+        if self.pduOffset:
+            del self._pduData[:self.pduOffset]
+            self.pduOffset = 0
+
+        return self._pduData
+
+    def _set_pdu_data(self, data):
+        self._pduData = data
+        self.pduOffset = 0
+
+    # the data that has not been decoded yet, decoding moves the offset
+    # rather than removing octets from the front of the buffer
+    pduData = property(_get_pdu_data, _set_pdu_data)
+
+    def remaining(self):
+        """Return the number of octets that have not been decoded."""
+        return len(self._pduData) - self.pduOffset
+
+    def take_data(self, pdu):
+        """Take the data that has not been decoded from another PDU without
+        copying it, the other PDU is left with no data."""
+        self._pduData = pdu._pduData
+        self.pduOffset = pdu.pduOffset
+
+        pdu._pduData = bytearray()
+        pdu.pduOffset = 0
+
     def get(self):
-        if len(self.pduData) == 0:
+        offset = self.pduOffset
+        if offset >= len(self._pduData):
             raise DecodingError("no more packet data")
 
-        octet = self.pduData[0]
-        del self.pduData[0]
-
-        return octet
+        self.pduOffset = offset + 1
+        return self._pduData[offset]
 
     def get_data(self, dlen):
-        if len(self.pduData) < dlen:
+        offset = self.pduOffset
+        end = offset + dlen
+        if end > len(self._pduData):
             raise DecodingError("no more packet data")
 
-        data = self.pduData[:dlen]
-        del self.pduData[:dlen]
-
-        return data
+        self.pduOffset = end
+        return self._pduData[offset:end]
 
     def get_short(self):
-        return struct.unpack('>H',self.get_data(2))[0]
+        offset = self.pduOffset
+        if offset + 2 > len(self._pduData):
+            raise DecodingError("no more packet data")
+
+        self.pduOffset = offset + 2
+        return _unpack_short(self._pduData, offset)[0]
 
     def get_long(self):
-        return struct.unpack('>L',self.get_data(4))[0]
+        offset = self.pduOffset
+        if offset + 4 > len(self._pduData):
+            raise DecodingError("no more packet data")
+
+        self.pduOffset = offset + 4
+        return _unpack_long(self._pduData, offset)[0]
 
     def put(self, n):
         # pduData is a bytearray
-        self.pduData += bytes([n])
+        self._pduData += bytes([n])
 
     def put_data(self, data):
         if isinstance(data, bytes):
             pass
         elif isinstance(data, bytearray):
             pass
+        elif isinstance(data, memoryview):
+            pass
         elif isinstance(data, list):
             data = bytes(data)
         else:
-            raise TypeError("data must be bytes, bytearray, or a list")
+            raise TypeError("data must be bytes, bytearray, memoryview, or a list")
 
         # regular append works
-        self.pduData += data
+        self._pduData += data
 
     def put_short(self, n):
-        self.pduData += struct.pack('>H',n & _short_mask)
+        self._pduData += struct.pack('>H',n & _short_mask)
 
     def put_long(self, n):
-        self.pduData += struct.pack('>L',n & _long_mask)
+        self._pduData += struct.pack('>L',n & _long_mask)
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         if isinstance(self.pduData, bytearray):
@@ -207,6 +262,8 @@ class PDUData(object):
 @bacpypes_debugging
 class PDU(PCI, PDUData):
 
+    __slots__ = PCI._pci_slots
+
     def __init__(self, data=None, **kwargs):
         if _debug: PDU._debug("__init__ %r %r", data, kwargs)
 
@@ -88,6 +88,8 @@ _log = ModuleLogger(globals())
 
 class DebugContents(object):
 
+    __slots__ = ()
+
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         """Debug the contents of an object."""
         if _debug: _log.debug("debug_contents indent=%r file=%r _ids=%r", indent, file, _ids)
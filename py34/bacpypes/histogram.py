@@ -0,0 +1,138 @@
+#!/usr/bin/python
+
+"""
+Histogram
+
+A small HDR-style histogram for recording things like how long it takes
+to go through the run loop.  Values are scaled to integers and counted in
+log-linear buckets, each power of two is split into the same number of
+sub-buckets so the relative error is bounded no matter how large the
+values get, and only the buckets that have been used take up space.
+"""
+
+import sys
+
+from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   Histogram
+#
+
+@bacpypes_debugging
+class Histogram(DebugContents):
+
+    _debug_contents = ('name', 'unit', 'scale', 'count', 'minValue', 'maxValue')
+
+    def __init__(self, name, unit='us', scale=1000000, bits=5):
+        if _debug: Histogram._debug("__init__ %r unit=%r scale=%r bits=%r", name, unit, scale, bits)
+
+        # the name and unit are for reporting, values are multiplied by the
+        # scale when they are recorded, bits is the number of significant
+        # bits kept for each value
+        self.name = name
+        self.unit = unit
+        self.scale = scale
+        self.bits = bits
+
+        self.reset()
+
+    def reset(self):
+        """Forget everything that has been recorded."""
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.minValue = None
+        self.maxValue = None
+
+    def record(self, value):
+        """Record a value, negative values are recorded as zero."""
+        v = int(value * self.scale)
+        if v < 0:
+            v = 0
+
+        # small values are exact, larger values keep the significant bits
+        shift = v.bit_length() - self.bits
+        if shift > 0:
+            key = (shift << self.bits) + (v >> shift)
+        else:
+            key = v
+
+        buckets = self.buckets
+        buckets[key] = buckets.get(key, 0) + 1
+
+        self.count += 1
+        self.total += v
+        if (self.minValue is None) or (v < self.minValue):
+            self.minValue = v
+        if (self.maxValue is None) or (v > self.maxValue):
+            self.maxValue = v
+
+    def _bucket_value(self, key):
+        """Return the highest scaled value that would be in a bucket."""
+        shift = key >> self.bits
+        if not shift:
+            return key
+
+        return (((key & ((1 << self.bits) - 1)) + 1) << shift) - 1
+
+    def percentile(self, p):
+        """Return the value at or below which p percent of the recorded
+        values fall, in the original units, or None if nothing has been
+        recorded."""
+        if not self.count:
+            return None
+
+        threshold = self.count * p / 100.0
+        running = 0
+        for key in sorted(self.buckets):
+            running += self.buckets[key]
+            if running >= threshold:
+                break
+
+        return min(self._bucket_value(key), self.maxValue) / float(self.scale)
+
+    def mean(self):
+        """Return the mean of the recorded values in the original units."""
+        if not self.count:
+            return None
+
+        return self.total / float(self.count) / self.scale
+
+    def summary(self):
+        """Return a dict of the interesting values in the original units."""
+        if not self.count:
+            return {'count': 0}
+
+        return {
+            'count': self.count,
+            'min': self.minValue / float(self.scale),
+            'mean': self.mean(),
+            'p50': self.percentile(50.0),
+            'p90': self.percentile(90.0),
+            'p99': self.percentile(99.0),
+            'p99.9': self.percentile(99.9),
+            'max': self.maxValue / float(self.scale),
+            }
+
+    def dump(self, file=None):
+        """Write a one line summary to the file, defaults to stderr."""
+        if file is None:
+            file = sys.stderr
+
+        summary = self.summary()
+        if not summary['count']:
+            file.write("    %s: no values\n" % (self.name,))
+            return
+
+        unit_scale = float(self.scale)
+        file.write("    %s: count %d min %d mean %.1f p50 %d p90 %d p99 %d p99.9 %d max %d %s\n" % (
+            self.name, summary['count'],
+            summary['min'] * unit_scale, summary['mean'] * unit_scale,
+            summary['p50'] * unit_scale, summary['p90'] * unit_scale,
+            summary['p99'] * unit_scale, summary['p99.9'] * unit_scale,
+            summary['max'] * unit_scale, self.unit,
+            ))
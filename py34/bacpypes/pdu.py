@@ -50,8 +50,24 @@ net_ip_address_route_re = re.compile("^([0-9])+:" + _ip_address_port + _at_route
 
 combined_pattern = re.compile("^(?:(?:([0-9]+)|([*])):)?(?:([*])|" + _field_address + "|" + _ip_address_mask_port + ")" + _at_route + "$")
 
+# the fields of addresses that have been parsed, by the class and value of
+# the argument, cleared when it gets too big
+_address_cache = {}
+_address_cache_limit = 4096
+
 @bacpypes_debugging
 class Address:
+
+    """
+    Addresses are values, once one is built it is not changed, so the
+    fields of parsed addresses are shared and the hash is kept.
+    """
+
+    __slots__ = ('addrType', 'addrNet', 'addrAddr', 'addrLen', 'addrRoute'
+        , 'addrIP', 'addrMask', 'addrHost', 'addrSubnet', 'addrPort'
+        , 'addrTuple', 'addrBroadcastTuple', '_hash'
+        )
+
     nullAddr = 0
     localBroadcastAddr = 1
     localStationAddr = 2
@@ -68,9 +84,9 @@ class Address:
         self.addrRoute = None
 
         if len(args) == 1:
-            self.decode_address(args[0])
+            self.parse_address(args[0])
         elif len(args) == 2:
-            self.decode_address(args[1])
+            self.parse_address(args[1])
             if self.addrType == Address.localStationAddr:
                 self.addrType = Address.remoteStationAddr
                 self.addrNet = args[0]
@@ -80,10 +96,52 @@ class Address:
             else:
                 raise ValueError("unrecognized address ctor form")
 
+    def parse_address(self, addr):
+        """Initialize the address like decode_address() but use the fields
+        from the last time the same value was parsed."""
+        try:
+            key = (addr.__class__, bytes(addr) if isinstance(addr, bytearray) else addr)
+            fields = _address_cache.get(key, None)
+        except TypeError:
+            # unhashable, let the decoder complain about it
+            key = fields = None
+
+        if fields is not None:
+            (self.addrType, self.addrNet, self.addrAddr, self.addrLen, self.addrRoute) = fields[:5]
+            if len(fields) > 5:
+                (self.addrIP, self.addrMask, self.addrHost, self.addrSubnet
+                    , self.addrPort, self.addrTuple, self.addrBroadcastTuple
+                    ) = fields[5:]
+            return
+
+        self.decode_address(addr)
+        if key is None:
+            return
+
+        # interface names are looked up each time, they might change
+        if isinstance(addr, str) and interface_re.match(addr) and not combined_pattern.match(addr):
+            return
+
+        fields = (self.addrType, self.addrNet, self.addrAddr, self.addrLen, self.addrRoute)
+        if hasattr(self, 'addrTuple'):
+            fields += (self.addrIP, self.addrMask, self.addrHost, self.addrSubnet
+                , self.addrPort, self.addrTuple, self.addrBroadcastTuple
+                )
+
+        if len(_address_cache) >= _address_cache_limit:
+            _address_cache.clear()
+        _address_cache[key] = fields
+
     def decode_address(self, addr):
         """Initialize the address from a string.  Lots of different forms are supported."""
         if _debug: Address._debug("decode_address %r (%s)", addr, type(addr))
 
+        # the hash is computed again when it is needed
+        try:
+            del self._hash
+        except AttributeError:
+            pass
+
         # start out assuming this is a local station and didn't get routed
         self.addrType = Address.localStationAddr
         self.addrNet = None
@@ -449,17 +507,26 @@ class Address:
             return (self.addrType, self.addrNet, self.addrAddr, self.addrRoute._tuple())
 
     def __hash__(self):
-        return hash(self._tuple())
+        # the route is not included, addresses with and without a route
+        # can be equal
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = rslt = hash((self.addrType, self.addrNet, self.addrAddr))
+            return rslt
 
     def __eq__(self, arg):
+        if arg is self:
+            return True
+
         # try an coerce it into an address
         if not isinstance(arg, Address):
             arg = Address(arg)
 
         # basic components must match
-        rslt = (self.addrType == arg.addrType)
+        rslt = (self.addrAddr == arg.addrAddr)
+        rslt = rslt and (self.addrType == arg.addrType)
         rslt = rslt and (self.addrNet == arg.addrNet)
-        rslt = rslt and (self.addrAddr == arg.addrAddr)
 
         # if both have routes they must match
         if rslt and self.addrRoute and arg.addrRoute:
@@ -502,6 +569,8 @@ def unpack_ip_addr(addr):
 
 class LocalStation(Address):
 
+    __slots__ = ()
+
     def __init__(self, addr, route=None):
         self.addrType = Address.localStationAddr
         self.addrNet = None
@@ -529,6 +598,8 @@ class LocalStation(Address):
 
 class RemoteStation(Address):
 
+    __slots__ = ()
+
     def __init__(self, net, addr, route=None):
         if not isinstance(net, int):
             raise TypeError("integer network required")
@@ -561,6 +632,8 @@ class RemoteStation(Address):
 
 class LocalBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self, route=None):
         self.addrType = Address.localBroadcastAddr
         self.addrNet = None
@@ -574,6 +647,8 @@ class LocalBroadcast(Address):
 
 class RemoteBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self, net, route=None):
         if not isinstance(net, int):
             raise TypeError("integer network required")
@@ -592,6 +667,8 @@ class RemoteBroadcast(Address):
 
 class GlobalBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self, route=None):
         self.addrType = Address.globalBroadcastAddr
         self.addrNet = None
@@ -608,6 +685,9 @@ class PCI(_PCI):
 
     _debug_contents = ('pduExpectingReply', 'pduNetworkPriority')
 
+    __slots__ = ()
+    _pci_slots = _PCI._pci_slots + ('pduExpectingReply', 'pduNetworkPriority')
+
     def __init__(self, *args, **kwargs):
         if _debug: PCI._debug("__init__ %r %r", args, kwargs)
 
@@ -669,6 +749,8 @@ class PCI(_PCI):
 @bacpypes_debugging
 class PDU(PCI, PDUData):
 
+    __slots__ = PCI._pci_slots
+
     def __init__(self, *args, **kwargs):
         if _debug: PDU._debug("__init__ %r %r", args, kwargs)
         super(PDU, self).__init__(*args, **kwargs)
@@ -0,0 +1,299 @@
+#!/usr/bin/python
+
+"""
+Shard
+
+A BACnet/IP server can be split across more than one process, each one a
+"shard" with its own stack bound to the same port with SO_REUSEPORT.  The
+kernel gives each process a copy of the broadcasts and spreads the unicast
+traffic across them by the address of the sender, so each shard looks at
+the destination of the traffic it receives and passes along the datagrams
+that belong to a different shard over a loopback link.
+
+Shard zero is the coordinator, it handles the shared state like BVLL
+messages, network layer messages and requests for the device object, the
+other shards own a partition of the remote stations (usually the devices
+on a VLAN) by a hash of their address.
+"""
+
+import socket
+import signal
+import struct
+import asyncore
+import zlib
+
+from multiprocessing import Process
+
+from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
+
+from .core import deferred
+from .comm import PDU
+from .udp import UDPActor, UDPDirector
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# the default base port for the loopback links between shards
+SHARD_LINK_PORT = 47900
+
+# BVLL functions that carry an NPDU
+_bvll_npdu_offset = {
+    0x04: 10,       # forwarded-npdu
+    0x09: 4,        # distribute-broadcast-to-network
+    0x0A: 4,        # original-unicast-npdu
+    0x0B: 4,        # original-broadcast-npdu
+    }
+
+#
+#   shard_of
+#
+
+def shard_of(key, count):
+    """Return the shard that owns the key, the same key is always owned by
+    the same shard, even in different processes."""
+    if not isinstance(key, (bytes, bytearray)):
+        key = str(key).encode('utf-8')
+
+    return (zlib.crc32(key) & 0xFFFFFFFF) % count
+
+#
+#   route_by_destination
+#
+
+def route_by_destination(data, count):
+    """Given the contents of a BACnet/IP datagram, return the shard that
+    should process it, or None if every shard should.  Messages with a
+    remote station as the destination go to the shard that owns the
+    station, remote broadcasts go to every shard and everything else goes
+    to the coordinator."""
+    data = bytearray(data)
+
+    # must be BACnet/IP with an NPDU
+    if (len(data) < 4) or (data[0] != 0x81):
+        return 0
+    offset = _bvll_npdu_offset.get(data[1], None)
+    if offset is None:
+        return 0
+
+    # network layer messages and local traffic go to the coordinator
+    if len(data) < offset + 2:
+        return 0
+    control = data[offset + 1]
+    if (control & 0x80) or not (control & 0x20):
+        return 0
+
+    # extract the destination network and address
+    if len(data) < offset + 5:
+        return 0
+    dnet = (data[offset + 2] << 8) + data[offset + 3]
+    dlen = data[offset + 4]
+
+    # remote and global broadcasts go to everyone
+    if (dnet == 0xFFFF) or (dlen == 0):
+        return None
+
+    return shard_of(data[offset + 5:offset + 5 + dlen], count)
+
+#
+#   Shard
+#
+
+@bacpypes_debugging
+class Shard(DebugContents):
+
+    _debug_contents = ('index', 'count', 'linkPort')
+
+    def __init__(self, index, count, link_port=SHARD_LINK_PORT, route=route_by_destination):
+        if _debug: Shard._debug("__init__ %r %r link_port=%r route=%r", index, count, link_port, route)
+
+        if not (0 <= index < count):
+            raise ValueError("shard index out of range")
+
+        self.index = index
+        self.count = count
+        self.linkPort = link_port
+        self.route = route
+
+    @property
+    def is_coordinator(self):
+        """Shard zero is the coordinator."""
+        return self.index == 0
+
+    def owns(self, key):
+        """Return true iff this shard owns the key, like the address of a
+        station or an object identifier."""
+        return shard_of(key, self.count) == self.index
+
+    def owner(self, data):
+        """Return the shard that should process a datagram, or None if
+        every shard should."""
+        return self.route(data, self.count)
+
+    def link_address(self, index):
+        """Return the loopback address of the link to a shard."""
+        return ('127.0.0.1', self.linkPort + index)
+
+#
+#   _ShardLink
+#
+
+@bacpypes_debugging
+class _ShardLink(asyncore.dispatcher):
+
+    """
+    A loopback socket for passing datagrams between shards.  The address of
+    the original sender is packed in front of the datagram.
+    """
+
+    def __init__(self, director):
+        if _debug: _ShardLink._debug("__init__ %r", director)
+        asyncore.dispatcher.__init__(self)
+
+        self.director = director
+
+        self.create_socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.bind(director.shard.link_address(director.shard.index))
+
+    def readable(self):
+        return 1
+
+    def writable(self):
+        return 0
+
+    def handle_read(self):
+        if _debug: _ShardLink._debug("handle_read")
+
+        try:
+            msg, addr = self.socket.recvfrom(65536)
+            if len(msg) < 6:
+                return
+
+            # extract the original source
+            source = (socket.inet_ntoa(msg[:4]), struct.unpack('!H', msg[4:6])[0])
+            if _debug: _ShardLink._debug("    - forwarded %d octets from %s", len(msg) - 6, source)
+
+            deferred(UDPDirector._response, self.director, PDU(msg[6:], source=source))
+
+        except socket.error as err:
+            if _debug: _ShardLink._debug("    - socket error: %s", err)
+
+    def forward(self, index, pdu):
+        """Pass a datagram to another shard."""
+        if _debug: _ShardLink._debug("forward %r %r", index, pdu)
+
+        host, port = pdu.pduSource
+        msg = socket.inet_aton(host) + struct.pack('!H', port) + bytes(pdu.pduData)
+
+        try:
+            self.socket.sendto(msg, self.director.shard.link_address(index))
+        except socket.error as err:
+            if _debug: _ShardLink._debug("    - socket error: %s", err)
+
+    def handle_close(self):
+        if _debug: _ShardLink._debug("handle_close")
+
+        self.close()
+
+#
+#   ShardUDPDirector
+#
+
+@bacpypes_debugging
+class ShardUDPDirector(UDPDirector):
+
+    """
+    A UDP director that shares its port with the other shards.  Incoming
+    datagrams that belong to this shard are processed normally, unicast
+    datagrams that belong to other shards are passed along to them, and
+    datagrams that the broadcast director receives for other shards are
+    dropped because the other shards received their own copies.  The BVLL
+    broadcast functions, like Distribute-Broadcast-To-Network, can arrive
+    as unicast datagrams that only one shard receives, so they are passed
+    along like any other.
+    """
+
+    def __init__(self, address, shard, broadcast=False, timeout=0, reuse=False, actorClass=UDPActor, sid=None, sapID=None):
+        if _debug: ShardUDPDirector._debug("__init__ %r %r broadcast=%r timeout=%r reuse=%r actorClass=%r sid=%r sapID=%r", address, shard, broadcast, timeout, reuse, actorClass, sid, sapID)
+        UDPDirector.__init__(self, address, timeout=timeout, reuse=reuse, reuse_port=True, actorClass=actorClass, sid=sid, sapID=sapID)
+
+        self.shard = shard
+        self.broadcast = broadcast
+
+        # the broadcast director never passes datagrams along
+        if broadcast:
+            self.link = None
+        else:
+            self.link = _ShardLink(self)
+
+    def close_socket(self):
+        if _debug: ShardUDPDirector._debug("close_socket")
+
+        if self.link:
+            self.link.close()
+            self.link = None
+
+        UDPDirector.close_socket(self)
+
+    def _response(self, pdu):
+        """Incoming datagrams are processed by the shard that owns them."""
+        if _debug: ShardUDPDirector._debug("_response %r", pdu)
+
+        data = pdu.pduData
+        owner = self.shard.owner(data)
+        if _debug: ShardUDPDirector._debug("    - owner: %r", owner)
+
+        # broadcasts are sent to every shard anyway
+        if self.broadcast:
+            if (owner is None) or (owner == self.shard.index):
+                UDPDirector._response(self, pdu)
+
+        elif owner is None:
+            # everyone gets a copy
+            for index in range(self.shard.count):
+                if index != self.shard.index:
+                    self.link.forward(index, pdu)
+            UDPDirector._response(self, pdu)
+
+        elif owner == self.shard.index:
+            UDPDirector._response(self, pdu)
+
+        else:
+            self.link.forward(owner, pdu)
+
+#
+#   run_shards
+#
+
+@bacpypes_debugging
+def run_shards(count, target, args=()):
+    """Start a process for each shard that calls target(shard_index, count,
+    *args) which builds its stack and runs, then wait for them to finish.
+    A SIGTERM or a keyboard interrupt is passed along to the shards."""
+    if _debug: run_shards._debug("run_shards %r %r %r", count, target, args)
+
+    processes = []
+    for index in range(count):
+        process = Process(target=target, args=(index, count) + tuple(args), name="shard-%d" % (index,))
+        process.start()
+        if _debug: run_shards._debug("    - started %r pid %r", process.name, process.pid)
+
+        processes.append(process)
+
+    def terminate(*args):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, terminate)
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        terminate()
+        for process in processes:
+            process.join()
+
+    return [process.exitcode for process in processes]
@@ -5,11 +5,18 @@ Task
 """
 
 import sys
+import math
+import zlib
 
 from time import time as _time
+try:
+    from time import monotonic as _monotonic
+except ImportError:
+    _monotonic = _time
 from heapq import heapify, heappush, heappop
 import itertools
 
+from .settings import settings
 from .singleton import SingletonLogging
 from .debugging import DebugContents, Logging, ModuleLogger, bacpypes_debugging
 
@@ -20,6 +27,10 @@ _log = ModuleLogger(globals())
 # globals
 _task_manager = None
 _unscheduled_tasks = []
+_phase_count = 0
+
+# fractional part of the golden ratio
+_GOLDEN_FRACTION = 0.6180339887498949
 
 # only defined for linux platforms
 if sys.platform in ('linux', 'darwin'):
@@ -43,6 +54,97 @@ if sys.platform in ('linux', 'darwin'):
 else:
     _Trigger = None
 
+#
+#   Clock
+#
+
+class Clock(object):
+
+    """
+    The source of time for a task manager, the time is in seconds.
+    """
+
+    def time(self):
+        raise NotImplementedError("time must be overridden")
+
+#
+#   WallClock
+#
+
+class WallClock(Clock):
+
+    """
+    Seconds since the epoch, the same as time.time().  This is the default
+    because task times are also used for dates and times.
+    """
+
+    def time(self):
+        return _time()
+
+#
+#   MonotonicClock
+#
+
+class MonotonicClock(Clock):
+
+    """
+    Seconds from some arbitrary point that never go backwards when the
+    system clock is changed, so timers are not thrown off.  Task times
+    are not dates and times with this clock.
+    """
+
+    def time(self):
+        return _monotonic()
+
+#
+#   VirtualClock
+#
+
+@bacpypes_debugging
+class VirtualClock(Clock, DebugContents):
+
+    """
+    Time that only moves when it is told to, it is used by the
+    VirtualTaskManager to jump from one task to the next.
+    """
+
+    _debug_contents = ('current_time',)
+
+    def __init__(self, start_time=0.0):
+        if _debug: VirtualClock._debug("__init__ start_time=%r", start_time)
+
+        self.current_time = start_time
+
+    def time(self):
+        return self.current_time
+
+    def set_time(self, when):
+        """Move the time to a specific time."""
+        if _debug: VirtualClock._debug("set_time %r", when)
+
+        self.current_time = when
+
+    def advance(self, delta):
+        """Move the time forward some number of seconds."""
+        if _debug: VirtualClock._debug("advance %r", delta)
+
+        self.current_time += delta
+
+# known clock classes
+clock_classes = {
+    'wall': WallClock,
+    'monotonic': MonotonicClock,
+    'virtual': VirtualClock,
+    }
+
+def default_clock():
+    """Return a new clock of the kind in the settings."""
+    clock_class = clock_classes.get(settings.clock, None)
+    if not clock_class:
+        raise ValueError("unknown clock: %r" % (settings.clock,))
+
+    return clock_class()
+
 #
 #   _Task
 #
@@ -159,6 +261,28 @@ def FunctionTask(fn, *args, **kwargs):
 
     return task
 
+#
+#   phase_even
+#
+
+def phase_even():
+    """Return the next phase, a fraction of an interval, in a sequence that
+    keeps the phases evenly spread no matter how many are used."""
+    global _phase_count
+
+    _phase_count += 1
+    return (_phase_count * _GOLDEN_FRACTION) % 1.0
+
+#
+#   phase_hash
+#
+
+def phase_hash(key):
+    """Return a phase, a fraction of an interval, from a key such as an
+    address or an object identifier.  The same key always gets the same
+    phase, even in different processes."""
+    return (zlib.crc32(str(key).encode('utf-8')) & 0xFFFFFFFF) / 4294967296.0
+
 #
 #   RecurringTask
 #
@@ -166,15 +290,20 @@ def FunctionTask(fn, *args, **kwargs):
 @bacpypes_debugging
 class RecurringTask(_Task):
 
-    _debug_contents = ('taskInterval', 'taskIntervalOffset')
+    _debug_contents = ('taskInterval', 'taskIntervalOffset', 'taskIntervalPhase')
 
-    def __init__(self, interval=None, offset=None):
-        if _debug: RecurringTask._debug("__init__ interval=%r offset=%r", interval, offset)
+    def __init__(self, interval=None, offset=None, phase=None):
+        if _debug: RecurringTask._debug("__init__ interval=%r offset=%r phase=%r", interval, offset, phase)
         _Task.__init__(self)
 
+        # spread the tasks out if there is no offset or phase
+        if (offset is None) and (phase is None) and settings.recurring_spread:
+            phase = phase_even()
+
         # save the interval, but do not automatically install
         self.taskInterval = interval
         self.taskIntervalOffset = offset
+        self.taskIntervalPhase = phase
 
     def install_task(self, interval=None, offset=None):
         if _debug: RecurringTask._debug("install_task interval=%r offset=%r", interval, offset)
@@ -200,10 +329,13 @@ class RecurringTask(_Task):
             # get ready for the next interval plus a jitter
             now = _task_manager.get_time() + 0.000001
 
-            # interval and offset are in milliseconds to be consistent
+            # interval and offset are in milliseconds to be consistent, the
+            # phase is a fraction of the interval
             interval = self.taskInterval / 1000.0
             if self.taskIntervalOffset:
                 offset = self.taskIntervalOffset / 1000.0
+            elif self.taskIntervalPhase:
+                offset = self.taskIntervalPhase * interval
             else:
                 offset = 0.0
             if _debug: RecurringTask._debug("    - now, interval, offset: %r, %r, %r", now, interval, offset)
@@ -223,9 +355,12 @@ class RecurringTask(_Task):
 def RecurringFunctionTask(interval, fn, *args, **kwargs):
     if _debug: RecurringFunctionTask._debug("RecurringFunctionTask %r %r %r", fn, args, kwargs)
 
+    # extract the phase if it was given
+    phase = kwargs.pop('_phase', None)
+
     class _RecurringFunctionTask(RecurringTask):
         def __init__(self, interval):
-            RecurringTask.__init__(self, interval)
+            RecurringTask.__init__(self, interval, phase=phase)
 
         def process_task(self):
             if _debug: RecurringFunctionTask._debug("process_task %r %r %r", fn, args, kwargs)
@@ -241,7 +376,7 @@ def RecurringFunctionTask(interval, fn, *args, **kwargs):
 #
 
 @bacpypes_debugging
-def recurring_function(interval, offset=None):
+def recurring_function(interval, offset=None, phase=None):
     def recurring_function_decorator(fn):
         class _RecurringFunctionTask(RecurringTask):
             def process_task(self):
@@ -249,7 +384,7 @@ def recurring_function(interval, offset=None):
                 fn()
             def __call__(self, *args, **kwargs):
                 fn(*args, **kwargs)
-        task = _RecurringFunctionTask(interval, offset)
+        task = _RecurringFunctionTask(interval, offset, phase)
         task.install_task()
 
         return task
@@ -263,17 +398,31 @@ def recurring_function(interval, offset=None):
 # @bacpypes_debugging - implicit via metaclass
 class TaskManager(SingletonLogging):
 
-    def __init__(self):
-        if _debug: TaskManager._debug("__init__")
+    def __init__(self, clock=None):
+        if _debug: TaskManager._debug("__init__ clock=%r", clock)
         global _task_manager, _unscheduled_tasks
 
-        # initialize
+        # the source of time
+        if clock is None:
+            clock = default_clock()
+        self.clock = clock
+
+        # initialize, the heap has [when, n, task] entries and the index
+        # maps a scheduled task to its entry, suspended tasks leave their
+        # entry in the heap with the task set to None
         self.tasks = []
+        self.entries = {}
+        self.canceled = 0
+
         if _Trigger:
             self.trigger = _Trigger()
         else:
             self.trigger = None
 
+        # histogram of how late tasks are processed, see
+        # core.enable_instrumentation()
+        self.lateness = None
+
         # task manager is this instance
         _task_manager = self
 
@@ -289,8 +438,8 @@ class TaskManager(SingletonLogging):
     def get_time(self):
         if _debug: TaskManager._debug("get_time")
 
-        # return the real time
-        return _time()
+        # return the time from the clock
+        return self.clock.time()
 
     def install_task(self, task):
         if _debug: TaskManager._debug("install_task %r @ %r", task, task.taskTime)
@@ -304,33 +453,36 @@ class TaskManager(SingletonLogging):
             self.suspend_task(task)
 
         # save this in the task list
-        heappush( self.tasks, (task.taskTime, next(self.counter), task) )
+        entry = [task.taskTime, next(self.counter), task]
+        heappush(self.tasks, entry)
+        self.entries[task] = entry
         if _debug: TaskManager._debug("    - tasks: %r", self.tasks)
 
         task.isScheduled = True
 
-        # trigger the event
-        if self.trigger:
+        # trigger the event if this is now the next task, otherwise the
+        # loop will wake up in time anyway
+        if self.trigger and (self.tasks[0] is entry):
             self.trigger.set()
 
     def suspend_task(self, task):
         if _debug: TaskManager._debug("suspend_task %r", task)
 
-        # remove this guy
-        for i, (when, n, curtask) in enumerate(self.tasks):
-            if task is curtask:
-                if _debug: TaskManager._debug("    - task found")
-                del self.tasks[i]
-
-                task.isScheduled = False
-                heapify(self.tasks)
-                break
+        # find the entry and mark it canceled, it is discarded when it
+        # gets to the top of the heap
+        entry = self.entries.pop(task, None)
+        if entry:
+            if _debug: TaskManager._debug("    - task found")
+            entry[-1] = None
+            self.canceled += 1
+
+            # when most of the heap is canceled entries, rebuild it
+            if (self.canceled > 1024) and (self.canceled > len(self.entries)):
+                self.compact()
         else:
             if _debug: TaskManager._debug("    - task not found")
 
-        # trigger the event
-        if self.trigger:
-            self.trigger.set()
+        task.isScheduled = False
 
     def resume_task(self, task):
         if _debug: TaskManager._debug("resume_task %r", task)
@@ -338,6 +490,42 @@ class TaskManager(SingletonLogging):
         # just re-install it
         self.install_task(task)
 
+    def compact(self):
+        """Remove the canceled entries from the heap."""
+        if _debug: TaskManager._debug("compact")
+
+        self.tasks = [entry for entry in self.tasks if entry[-1] is not None]
+        heapify(self.tasks)
+        self.canceled = 0
+
+    def peek_next_task(self):
+        """Return the (when, task) of the next scheduled task, or None if
+        there is nothing scheduled."""
+        tasks = self.tasks
+
+        # discard canceled entries
+        while tasks and (tasks[0][-1] is None):
+            heappop(tasks)
+            self.canceled -= 1
+
+        if not tasks:
+            return None
+
+        when, n, task = tasks[0]
+        return (when, task)
+
+    def pop_next_task(self):
+        """Pull the next scheduled task off the heap and mark that it is
+        no longer scheduled."""
+        if self.peek_next_task() is None:
+            raise RuntimeError("no tasks")
+
+        when, n, task = heappop(self.tasks)
+        del self.entries[task]
+        task.isScheduled = False
+
+        return task
+
     def get_next_task(self):
         """get the next task if there's one that should be processed,
         and return how long it will be until the next one should be
@@ -345,24 +533,23 @@ class TaskManager(SingletonLogging):
         if _debug: TaskManager._debug("get_next_task")
 
         # get the time
-        now = _time()
+        now = self.clock.time()
 
         task = None
         delta = None
 
-        if self.tasks:
+        next_task = self.peek_next_task()
+        if next_task:
             # look at the first task
-            when, n, nxttask = self.tasks[0]
+            when, nxttask = next_task
             if when <= now:
                 # pull it off the list and mark that it's no longer scheduled
-                heappop(self.tasks)
-                task = nxttask
-                task.isScheduled = False
+                task = self.pop_next_task()
 
-                if self.tasks:
-                    when, n, nxttask = self.tasks[0]
+                next_task = self.peek_next_task()
+                if next_task:
                     # peek at the next task, return how long to wait
-                    delta = max(when - now, 0.0)
+                    delta = max(next_task[0] - now, 0.0)
             else:
                 delta = when - now
 
@@ -372,6 +559,10 @@ class TaskManager(SingletonLogging):
     def process_task(self, task):
         if _debug: TaskManager._debug("process_task %r", task)
 
+        # keep track of how late it is
+        if self.lateness is not None:
+            self.lateness.record(self.get_time() - task.taskTime)
+
         # process the task
         task.process_task()
 
@@ -380,3 +571,329 @@ class TaskManager(SingletonLogging):
             task.install_task()
         elif isinstance(task, OneShotDeleteTask):
             del task
+
+#
+#   TimingWheel
+#
+
+# wheel geometry, the first level has 256 slots of one tick and each of
+# the other levels have 64 slots covering an entire rotation of the level
+# below, which is 2**32 ticks
+_WHEEL_BITS = (8, 6, 6, 6, 6)
+
+class TimingWheel:
+
+    """
+    A hierarchical timing wheel of tasks, adding and removing a task is
+    O(1) and tasks are cascaded down the levels as they get close.
+    """
+
+    def __init__(self, resolution, now):
+        # length of a tick in seconds
+        self.resolution = resolution
+
+        # build the levels, each is a list of slots, each slot is a dict
+        # of task -> (when, n)
+        self.levels = []
+        self.shifts = []
+        shift = 0
+        for bits in _WHEEL_BITS:
+            self.levels.append([{} for i in range(1 << bits)])
+            self.shifts.append(shift)
+            shift += bits
+        self.span = 1 << shift
+
+        # the last tick processed, task -> (level, slot) for tasks in the
+        # wheel and how many tasks are in each level
+        self.tick = int(now / resolution)
+        self.entries = {}
+        self.counts = [0] * len(self.levels)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, task):
+        return task in self.entries
+
+    def due_tick(self, when):
+        """Return the first tick at or after a time."""
+        return int(math.ceil(when / self.resolution))
+
+    def add(self, task, when, n):
+        """Add a task to the wheel and return the tick it is in, or None if
+        the task is already due."""
+        tick = self.due_tick(when)
+        if tick <= self.tick:
+            return None
+
+        self._put(task, tick, when, n)
+
+        return tick
+
+    def remove(self, task):
+        """Remove a task from the wheel, return True if it was there."""
+        entry = self.entries.pop(task, None)
+        if entry is None:
+            return False
+
+        i, slot = entry
+        del slot[task]
+        self.counts[i] -= 1
+
+        return True
+
+    def _put(self, task, tick, when, n):
+        """Put a task in the slot for a tick in the future, ticks beyond the
+        end of the wheel are put in the last level and moved again later."""
+        delta = min(tick - self.tick, self.span - 1)
+
+        for i, level in enumerate(self.levels):
+            shift = self.shifts[i]
+            if delta < (len(level) << shift):
+                break
+
+        slot = level[(tick >> shift) & (len(level) - 1)]
+        slot[task] = (when, n)
+        self.entries[task] = (i, slot)
+        self.counts[i] += 1
+
+    def advance(self, now):
+        """Turn the wheel up to the current time and return the list of
+        (when, n, task) of the tasks that have come due, in order."""
+        due = []
+
+        target = int(now / self.resolution)
+        if target <= self.tick:
+            return due
+
+        levels = self.levels
+        counts = self.counts
+        shifts = self.shifts
+        level0 = levels[0]
+        mask0 = len(level0) - 1
+        while self.tick < target:
+            # nothing in the wheel, just move the hand
+            if not self.entries:
+                self.tick = target
+                break
+
+            # when the lower levels are empty skip ahead to the next tick
+            # where the first non-empty level cascades
+            i = 0
+            while not counts[i]:
+                i += 1
+            if i:
+                boundary = ((self.tick >> shifts[i]) + 1) << shifts[i]
+                if boundary > target:
+                    self.tick = target
+                    break
+                self.tick = boundary - 1
+
+            self.tick = tick = self.tick + 1
+
+            # starting a new rotation, cascade from the higher levels
+            if not (tick & mask0):
+                for i in range(len(levels) - 1, 0, -1):
+                    shift = shifts[i]
+                    if not (tick & ((1 << shift) - 1)):
+                        self._cascade(i, levels[i][(tick >> shift) & (len(levels[i]) - 1)], due)
+
+            slot = level0[tick & mask0]
+            if slot:
+                self._cascade(0, slot, due)
+
+        due.sort()
+        return due
+
+    def _cascade(self, i, slot, due):
+        """Move the tasks out of a slot into a lower level or the due list."""
+        if not slot:
+            return
+
+        entries = list(slot.items())
+        slot.clear()
+        self.counts[i] -= len(entries)
+
+        for task, (when, n) in entries:
+            tick = self.due_tick(when)
+            if tick <= self.tick:
+                del self.entries[task]
+                due.append((when, n, task))
+            else:
+                self._put(task, tick, when, n)
+
+    def next_tick(self):
+        """Return the next tick that has something in it or the start of the
+        next rotation, or None if the wheel is empty."""
+        if not self.entries:
+            return None
+
+        level0 = self.levels[0]
+        mask0 = len(level0) - 1
+
+        tick = self.tick + 1
+        while (tick & mask0) and (not level0[tick & mask0]):
+            tick += 1
+
+        return tick
+
+#
+#   WheelTaskManager
+#
+
+# @bacpypes_debugging - implicit via metaclass
+class WheelTaskManager(TaskManager):
+
+    """
+    A task manager backed by a hierarchical timing wheel for applications
+    with very large numbers of coarse timers, like APDU and segment
+    timeouts, COV subscription lifetimes and foreign device table entries.
+    Tasks that have come due are moved into the heap of the base class so
+    they are processed in order.  Tasks are never run early, but may be run
+    up to one resolution tick late.
+    """
+
+    # length of a tick in seconds
+    resolution = 0.01
+
+    def __init__(self, resolution=None, clock=None):
+        if _debug: WheelTaskManager._debug("__init__ resolution=%r clock=%r", resolution, clock)
+
+        if resolution is not None:
+            self.resolution = resolution
+        if clock is None:
+            clock = default_clock()
+
+        # the wheel and the next tick the run loop is expecting to wake up
+        self.wheel = TimingWheel(self.resolution, clock.time())
+        self.wakeTick = None
+
+        # pass along initialization
+        TaskManager.__init__(self, clock)
+
+    def install_task(self, task):
+        if _debug: WheelTaskManager._debug("install_task %r @ %r", task, task.taskTime)
+
+        # if the taskTime is None is hasn't been computed correctly
+        if task.taskTime is None:
+            raise RuntimeError("task time is None")
+
+        # if this is already installed, suspend it
+        if task.isScheduled:
+            self.suspend_task(task)
+
+        # if it is already due it goes in the heap
+        tick = self.wheel.add(task, task.taskTime, next(self.counter))
+        if tick is None:
+            TaskManager.install_task(self, task)
+            return
+
+        task.isScheduled = True
+
+        # trigger the event if the loop would sleep past it
+        if self.trigger and ((self.wakeTick is None) or (tick < self.wakeTick)):
+            self.trigger.set()
+
+    def suspend_task(self, task):
+        if _debug: WheelTaskManager._debug("suspend_task %r", task)
+
+        if self.wheel.remove(task):
+            task.isScheduled = False
+        else:
+            TaskManager.suspend_task(self, task)
+
+    def get_next_task(self):
+        """get the next task if there's one that should be processed,
+        and return how long it will be until the next one should be
+        processed."""
+        if _debug: WheelTaskManager._debug("get_next_task")
+
+        # get the time
+        now = self.clock.time()
+
+        # turn the wheel, what is due goes into the heap
+        for when, n, task in self.wheel.advance(now):
+            entry = [when, n, task]
+            heappush(self.tasks, entry)
+            self.entries[task] = entry
+
+        task = None
+        if self.peek_next_task():
+            task = self.pop_next_task()
+
+        if self.peek_next_task():
+            delta = 0.0
+        else:
+            self.wakeTick = self.wheel.next_tick()
+            if self.wakeTick is None:
+                delta = None
+            else:
+                delta = max(self.wakeTick * self.resolution - now, 0.0)
+
+        # return the task to run and how long to wait for the next one
+        return (task, delta)
+
+#
+#   VirtualTaskManager
+#
+
+# @bacpypes_debugging - implicit via metaclass
+class VirtualTaskManager(TaskManager):
+
+    """
+    A task manager with a virtual clock.  Rather than waiting for the next
+    task to come due the clock jumps ahead to it, so the run loop goes
+    through hours of schedules, subscription lifetimes and foreign device
+    registrations in as long as it takes to process the tasks.  Use a task
+    that calls core.stop() to end the simulation.
+    """
+
+    def __init__(self, start_time=0.0, clock=None):
+        if _debug: VirtualTaskManager._debug("__init__ start_time=%r clock=%r", start_time, clock)
+
+        if clock is None:
+            clock = VirtualClock(start_time)
+
+        # pass along initialization
+        TaskManager.__init__(self, clock)
+
+    def get_next_task(self):
+        """get the next task, moving the clock ahead to it if necessary,
+        and return how long it will be until the next one should be
+        processed which is never more than zero."""
+        if _debug: VirtualTaskManager._debug("get_next_task @ %r", self.clock.current_time)
+
+        next_task = self.peek_next_task()
+        if not next_task:
+            return (None, None)
+
+        # jump ahead to the task
+        when, task = next_task
+        if when > self.clock.current_time:
+            self.clock.set_time(when)
+
+        # pull it off the list, do not wait for the next one
+        return (self.pop_next_task(), 0.0)
+
+#
+#   task_manager
+#
+
+# known task manager classes
+task_manager_classes = {
+    'heap': TaskManager,
+    'wheel': WheelTaskManager,
+    'virtual': VirtualTaskManager,
+    }
+
+def task_manager():
+    """Return the task manager, if one has not been created yet then make
+    one of the kind in the settings."""
+    if _task_manager:
+        return _task_manager
+
+    task_manager_class = task_manager_classes.get(settings.task_manager, None)
+    if not task_manager_class:
+        raise ValueError("unknown task manager: %r" % (settings.task_manager,))
+
+    return task_manager_class()
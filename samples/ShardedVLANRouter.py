@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+
+"""
+This sample application is like IP2VLANRouter but the virtual devices are
+split across a number of processes that share the same BACnet/IP port.
+Each process is a shard with its own router and the virtual devices it
+owns, shard zero is the coordinator and also announces the network.
+
+Note that the device instance number of the virtual device will be 100 times
+the network number plus its address (net2 * 100 + n).
+"""
+
+import random
+import argparse
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.core import run, deferred
+from bacpypes.comm import bind
+
+from bacpypes.pdu import Address, LocalBroadcast
+from bacpypes.netservice import NetworkServiceAccessPoint, NetworkServiceElement
+from bacpypes.bvllservice import BIPSimple, AnnexJCodec, UDPMultiplexer
+from bacpypes.shard import Shard, run_shards
+
+from bacpypes.app import Application
+from bacpypes.appservice import StateMachineAccessPoint, ApplicationServiceAccessPoint
+from bacpypes.local.device import LocalDeviceObject
+from bacpypes.service.device import WhoIsIAmServices
+from bacpypes.service.object import (
+    ReadWritePropertyServices,
+    ReadWritePropertyMultipleServices,
+    )
+
+from bacpypes.object import AnalogValueObject
+
+from bacpypes.vlan import Network, Node
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   VLANApplication
+#
+
+@bacpypes_debugging
+class VLANApplication(
+    Application,
+    WhoIsIAmServices,
+    ReadWritePropertyServices,
+    ReadWritePropertyMultipleServices,
+    ):
+
+    def __init__(self, vlan_device, vlan_address, aseID=None):
+        if _debug: VLANApplication._debug("__init__ %r %r aseID=%r", vlan_device, vlan_address, aseID)
+        Application.__init__(self, vlan_device, aseID=aseID)
+
+        # include a application decoder
+        self.asap = ApplicationServiceAccessPoint()
+
+        # pass the device object to the state machine access point so it
+        # can know if it should support segmentation
+        self.smap = StateMachineAccessPoint(vlan_device)
+
+        # the segmentation state machines need access to the same device
+        # information cache as the application
+        self.smap.deviceInfoCache = self.deviceInfoCache
+
+        # a network service access point will be needed
+        self.nsap = NetworkServiceAccessPoint()
+
+        # give the NSAP a generic network layer service element
+        self.nse = NetworkServiceElement()
+        bind(self.nse, self.nsap)
+
+        # bind the top layers
+        bind(self, self.asap, self.smap, self.nsap)
+
+        # create a vlan node at the assigned address
+        self.vlan_node = Node(vlan_address)
+
+        # bind the stack to the node, no network number, no addresss
+        self.nsap.bind(self.vlan_node)
+
+#
+#   VLANRouter
+#
+
+@bacpypes_debugging
+class VLANRouter:
+
+    def __init__(self, local_address, local_network, shard):
+        if _debug: VLANRouter._debug("__init__ %r %r %r", local_address, local_network, shard)
+
+        # a network service access point will be needed
+        self.nsap = NetworkServiceAccessPoint()
+
+        # give the NSAP a generic network layer service element
+        self.nse = NetworkServiceElement()
+        bind(self.nse, self.nsap)
+
+        # create a BIPSimple, bound to the Annex J server on a UDP
+        # multiplexer that shares the port with the other shards
+        self.bip = BIPSimple(local_address)
+        self.annexj = AnnexJCodec()
+        self.mux = UDPMultiplexer(local_address, shard=shard)
+
+        # bind the bottom layers
+        bind(self.bip, self.annexj, self.mux.annexJ)
+
+        # bind the BIP stack to the local network
+        self.nsap.bind(self.bip, local_network, local_address)
+
+#
+#   shard_main
+#
+
+def shard_main(index, count, args):
+    if _debug: _log.debug("shard_main %r %r %r", index, count, args)
+
+    shard = Shard(index, count)
+
+    # create the VLAN router, bind it to the local network
+    router = VLANRouter(Address(args.addr1), args.net1, shard)
+
+    # create a VLAN
+    vlan = Network(broadcast_address=LocalBroadcast())
+
+    # create a node for the router, address 1 on the VLAN
+    router_addr = Address(1)
+    router_node = Node(router_addr)
+    vlan.add_node(router_node)
+
+    # bind the router stack to the vlan network through this node
+    router.nsap.bind(router_node, args.net2, router_addr)
+
+    # only the coordinator sends the network topology
+    if shard.is_coordinator:
+        deferred(router.nse.i_am_router_to_network)
+
+    # make the devices this shard owns
+    for device_number in range(2, 2 + args.count):
+        vlan_address = Address(device_number)
+        if not shard.owns(vlan_address.addrAddr):
+            continue
+
+        # device identifier is assigned from the address
+        device_instance = args.net2 * 100 + device_number
+
+        # make a vlan device object
+        vlan_device = LocalDeviceObject(
+            objectName="VLAN Node %d" % (device_instance,),
+            objectIdentifier=('device', device_instance),
+            maxApduLengthAccepted=1024,
+            segmentationSupported='noSegmentation',
+            vendorIdentifier=15,
+            )
+
+        # make the application, add it to the network
+        vlan_app = VLANApplication(vlan_device, vlan_address)
+        vlan.add_node(vlan_app.vlan_node)
+
+        # make a value object
+        avo = AnalogValueObject(
+            objectIdentifier=('analogValue', 1),
+            objectName='Value-1-%d' % (device_instance,),
+            presentValue=random.random() * 100.0,
+            )
+        vlan_app.add_object(avo)
+
+    _log.debug("running shard %d", index)
+
+    run()
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        )
+
+    # add an argument for interval
+    parser.add_argument('addr1', type=str,
+        help='address of first network',
+        )
+
+    # add an argument for interval
+    parser.add_argument('net1', type=int,
+        help='network number of first network',
+        )
+
+    # add an argument for interval
+    parser.add_argument('net2', type=int,
+        help='network number of second network',
+        )
+
+    # add an argument for how many virtual devices
+    parser.add_argument('--count', type=int,
+        help='number of virtual devices',
+        default=1,
+        )
+
+    # add an argument for how many processes
+    parser.add_argument('--shards', type=int,
+        help='number of processes',
+        default=2,
+        )
+
+    # now parse the arguments
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    run_shards(args.shards, shard_main, (args,))
+
+    _log.debug("fini")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+
+"""
+Time parsing addresses in the common forms, looking them up in a dictionary
+and comparing them with strings and tuples.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import Address
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# a mix of addresses seen on a network
+samples = [
+    "192.168.1.%d" % (i,) for i in range(2, 12)
+    ] + [
+    ("192.168.1.%d" % (i,), 47808) for i in range(2, 12)
+    ] + [
+    "2001:%d" % (i,) for i in range(1, 11)
+    ] + [
+    i for i in range(1, 11)
+    ]
+
+
+@bacpypes_debugging
+def bench(fn, count):
+    """Call the function count times and return the best time for each
+    call, in microseconds."""
+    if _debug: bench._debug("bench %r %r", fn, count)
+
+    best = None
+    for j in range(5):
+        start_time = time.time()
+        for i in range(count):
+            fn()
+        elapsed = time.time() - start_time
+        if (best is None) or (elapsed < best):
+            best = elapsed
+
+    return best * 1000000.0 / count
+
+
+def parse():
+    for sample in samples:
+        Address(sample)
+
+
+addresses = [Address(sample) for sample in samples]
+lookup = dict((address, i) for i, address in enumerate(addresses))
+
+def dictionary():
+    for address in addresses:
+        lookup[address]
+
+
+def compare():
+    for address, sample in zip(addresses, samples):
+        address == sample
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--count", type=int,
+        help="number of times to go through the samples",
+        default=1000,
+        )
+    args = parser.parse_args()
+
+    sys.stdout.write("    %d addresses, time for each\n" % (len(samples),))
+    for name, fn in (("parse", parse), ("lookup", dictionary), ("compare", compare)):
+        sys.stdout.write("    %-10s %8.2f us\n" % (name, bench(fn, args.count) / len(samples)))
+
+
+if __name__ == "__main__":
+    main()
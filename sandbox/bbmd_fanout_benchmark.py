@@ -0,0 +1,118 @@
+#!/usr/bin/python
+
+"""
+Forward local broadcasts through a BBMD with a number of peers and foreign
+devices, once with the forwarded NPDU encoded for each destination, the way
+it used to be done, and once with it encoded once and the octets shared.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.comm import Server, bind
+from bacpypes.pdu import Address, LocalBroadcast, PDU
+from bacpypes.bvllservice import AnnexJCodec, BIPBBMD
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class EncodeEachBBMD(BIPBBMD):
+
+    """
+    Build the peer addresses for each broadcast and pass the PDU down the
+    stack once for each destination.
+    """
+
+    def peer_destinations(self, local_broadcast=False):
+        self.bbmdPeerDestinations = {}
+        return BIPBBMD.peer_destinations(self, local_broadcast)
+
+    def fan_out(self, xpdu, destinations):
+        for destination in destinations:
+            xpdu.pduDestination = destination
+            self.request(xpdu)
+
+
+class Discard(Server):
+
+    """Count the PDUs that would be sent."""
+
+    def __init__(self):
+        Server.__init__(self)
+        self.count = 0
+
+    def indication(self, pdu):
+        self.count += 1
+
+
+@bacpypes_debugging
+def bench(bbmd_class, peers, foreign, count):
+    """Forward a broadcast count times and return the time for each."""
+    if _debug: bench._debug("bench %r %r %r %r", bbmd_class, peers, foreign, count)
+
+    bbmd = bbmd_class(Address("10.0.0.1/16"))
+    codec = AnnexJCodec()
+    discard = Discard()
+    bind(bbmd, codec, discard)
+
+    bbmd.add_peer(Address("10.0.0.1/16"))
+    for i in range(peers):
+        bbmd.add_peer(Address("10.%d.0.1/16" % (i + 1,)))
+    for i in range(foreign):
+        bbmd.register_foreign_device(Address("172.16.%d.%d" % (i // 250, i % 250 + 1)), 300)
+
+    npdu = b'\x01\x20\xff\xff\x00\xff\x10\x08'
+    best = None
+    for j in range(5):
+        start_time = time.time()
+        for i in range(count):
+            bbmd.indication(PDU(npdu, destination=LocalBroadcast()))
+        elapsed = time.time() - start_time
+        if (best is None) or (elapsed < best):
+            best = elapsed
+
+    # one for the local network and one per destination
+    if discard.count != 5 * count * (1 + peers + foreign):
+        raise RuntimeError("wrong number of PDUs")
+
+    return best / count
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--count", type=int,
+        help="number of broadcasts to forward",
+        default=200,
+        )
+    parser.add_argument(
+        "--foreign", type=int,
+        help="number of registered foreign devices",
+        default=50,
+        )
+    parser.add_argument(
+        "peers", type=int, nargs='*',
+        help="number of peers",
+        default=[1, 10, 50],
+        )
+    args = parser.parse_args()
+
+    sys.stdout.write("    %6s %6s %12s %12s\n" % ("peers", "fds", "each", "once"))
+    for peers in args.peers:
+        each_time = bench(EncodeEachBBMD, peers, args.foreign, args.count)
+        once_time = bench(BIPBBMD, peers, args.foreign, args.count)
+
+        sys.stdout.write("    %6d %6d %9.1f us %9.1f us\n" % (
+            peers, args.foreign, each_time * 1000000.0, once_time * 1000000.0,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/python
+
+"""
+Compare the cost of an idle pass through asyncore.loop(count=1) with a
+pass through the SocketSelector used by run(selector=True) for different
+numbers of UDP dispatchers.
+"""
+
+import sys
+import time
+import asyncore
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.core import SocketSelector
+from bacpypes.udp import UDPDirector
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+def bench(label, fn, passes):
+    """Call the function a number of times and report the time per pass."""
+    if _debug: bench._debug("bench %r %r %r", label, fn, passes)
+
+    start_time = time.time()
+    for i in range(passes):
+        fn()
+    elapsed = time.time() - start_time
+
+    sys.stdout.write("    %-10s %10.2f us/pass\n" % (label, elapsed * 1000000.0 / passes))
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--passes", type=int,
+        help="number of passes through the loop",
+        default=1000,
+        )
+    parser.add_argument(
+        "counts", type=int, nargs='*',
+        help="number of dispatchers",
+        default=[10, 100, 1000],
+        )
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    for count in args.counts:
+        sys.stdout.write("%d dispatchers\n" % (count,))
+
+        # make some idle directors bound to ephemeral ports
+        directors = [UDPDirector(('127.0.0.1', 0)) for i in range(count)]
+
+        bench("asyncore", lambda: asyncore.loop(timeout=0.0, count=1), args.passes)
+
+        socket_selector = SocketSelector()
+        bench("selector", lambda: socket_selector.poll(0.0), args.passes)
+        socket_selector.close()
+
+        for director in directors:
+            director.close_socket()
+
+
+if __name__ == "__main__":
+    main()
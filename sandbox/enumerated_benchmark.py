@@ -0,0 +1,74 @@
+#!/usr/bin/python
+
+"""
+Time building, comparing, encoding and decoding enumerated values and
+object identifiers.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.primitivedata import Tag, ObjectIdentifier
+from bacpypes.basetypes import EngineeringUnits, PropertyIdentifier
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+def bench(fn, count):
+    """Call the function count times and return the best time for each
+    call, in microseconds."""
+    if _debug: bench._debug("bench %r %r", fn, count)
+
+    best = None
+    for j in range(5):
+        start_time = time.time()
+        for i in range(count):
+            fn()
+        elapsed = time.time() - start_time
+        if (best is None) or (elapsed < best):
+            best = elapsed
+
+    return best * 1000000.0 / count
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--count", type=int,
+        help="number of times to call each one",
+        default=20000,
+        )
+    args = parser.parse_args()
+
+    units = EngineeringUnits('degreesFahrenheit')
+    units_tag = Tag()
+    units.encode(units_tag)
+
+    objid = ObjectIdentifier(('analogValue', 12))
+    objid_tag = Tag()
+    objid.encode(objid_tag)
+
+    tests = [
+        ("enumerated from name", lambda: PropertyIdentifier('presentValue')),
+        ("enumerated from value", lambda: PropertyIdentifier(85)),
+        ("enumerated compare", lambda: units == 'degreesFahrenheit'),
+        ("enumerated encode", lambda: units.encode(Tag())),
+        ("enumerated decode", lambda: EngineeringUnits(units_tag)),
+        ("objectid from tuple", lambda: ObjectIdentifier(('analogValue', 12))),
+        ("objectid encode", lambda: objid.encode(Tag())),
+        ("objectid decode", lambda: ObjectIdentifier(objid_tag)),
+        ]
+
+    for name, fn in tests:
+        sys.stdout.write("    %-24s %8.2f us\n" % (name, bench(fn, args.count)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/python
+
+"""
+Answer Who-Is requests with an application stack that ends at the Annex J
+codec, once with the I-Am built and encoded for each one, the way it used
+to be done, and once with the encoded parameters kept.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.comm import Server, bind
+from bacpypes.pdu import Address
+from bacpypes.apdu import WhoIsRequest
+from bacpypes.app import ApplicationIOController
+from bacpypes.appservice import StateMachineAccessPoint, ApplicationServiceAccessPoint
+from bacpypes.netservice import NetworkServiceAccessPoint, NetworkServiceElement
+from bacpypes.bvllservice import BIPSimple, AnnexJCodec
+from bacpypes.service.device import WhoIsIAmServices
+from bacpypes.local.device import LocalDeviceObject
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class Discard(Server):
+
+    """Count the PDUs that would be sent."""
+
+    def __init__(self):
+        Server.__init__(self)
+        self.count = 0
+
+    def indication(self, pdu):
+        self.count += 1
+
+
+@bacpypes_debugging
+class CachedApplication(ApplicationIOController, WhoIsIAmServices):
+
+    def __init__(self, localDevice, localAddress):
+        ApplicationIOController.__init__(self, localDevice, localAddress)
+
+        self.asap = ApplicationServiceAccessPoint()
+        self.smap = StateMachineAccessPoint(localDevice)
+        self.nsap = NetworkServiceAccessPoint()
+        self.nse = NetworkServiceElement()
+        bind(self.nse, self.nsap)
+        bind(self, self.asap, self.smap, self.nsap)
+
+        self.bip = BIPSimple()
+        self.annexj = AnnexJCodec()
+        self.discard = Discard()
+        bind(self.bip, self.annexj, self.discard)
+
+        self.nsap.bind(self.bip, address=Address(localAddress))
+
+
+@bacpypes_debugging
+class EncodeEachApplication(CachedApplication):
+
+    """Build the I-Am for every Who-Is."""
+
+    def i_am(self, address=None):
+        self._i_am_data = None
+        CachedApplication.i_am(self, address)
+
+
+@bacpypes_debugging
+def bench(app_class, count):
+    """Answer count Who-Is requests and return the time for each."""
+    if _debug: bench._debug("bench %r %r", app_class, count)
+
+    device = LocalDeviceObject(
+        objectName="bench",
+        objectIdentifier=('device', 599),
+        maxApduLengthAccepted=1024,
+        segmentationSupported='segmentedBoth',
+        vendorIdentifier=15,
+        )
+    app = app_class(device, "10.0.0.1/24")
+
+    who_is = WhoIsRequest()
+    who_is.pduSource = Address("10.0.0.2")
+
+    best = None
+    for j in range(5):
+        start_time = time.time()
+        for i in range(count):
+            app.do_WhoIsRequest(who_is)
+        elapsed = time.time() - start_time
+        if (best is None) or (elapsed < best):
+            best = elapsed
+
+    if app.discard.count != 5 * count:
+        raise RuntimeError("wrong number of PDUs")
+
+    return best / count
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--count", type=int,
+        help="number of Who-Is requests to answer",
+        default=5000,
+        )
+    args = parser.parse_args()
+
+    each_time = bench(EncodeEachApplication, args.count)
+    cached_time = bench(CachedApplication, args.count)
+
+    sys.stdout.write("    %-8s %8.1f us\n" % ("each", each_time * 1000000.0))
+    sys.stdout.write("    %-8s %8.1f us\n" % ("cached", cached_time * 1000000.0))
+
+
+if __name__ == "__main__":
+    main()
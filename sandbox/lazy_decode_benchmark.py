@@ -0,0 +1,100 @@
+#!/usr/bin/python
+
+"""
+Decode the kinds of unconfirmed requests that a busy network is full of,
+once with all of the service parameters decoded and once lazily, the way
+they would be when the application drops them without looking.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import Address, PDU
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import PropertyValue, StatusFlags
+from bacpypes.apdu import APDU, UnconfirmedRequestPDU, IAmRequest, \
+    IHaveRequest, UnconfirmedCOVNotificationRequest
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def sample_requests():
+    """Return a list of unconfirmed requests."""
+    return [
+        IAmRequest(
+            iAmDeviceIdentifier=('device', 599),
+            maxAPDULengthAccepted=1024,
+            segmentationSupported='segmentedBoth',
+            vendorID=15,
+            ),
+        IHaveRequest(
+            deviceIdentifier=('device', 599),
+            objectIdentifier=('analogValue', 1),
+            objectName="AV-1",
+            ),
+        UnconfirmedCOVNotificationRequest(
+            subscriberProcessIdentifier=7,
+            initiatingDeviceIdentifier=('device', 599),
+            monitoredObjectIdentifier=('analogValue', 1),
+            timeRemaining=120,
+            listOfValues=[
+                PropertyValue(propertyIdentifier='presentValue', value=Any(Real(3.0))),
+                PropertyValue(propertyIdentifier='statusFlags', value=Any(StatusFlags([0, 0, 0, 0]))),
+                ],
+            ),
+        ]
+
+
+@bacpypes_debugging
+def bench(request, count, lazy):
+    """Decode the request count times and return the time per request."""
+    if _debug: bench._debug("bench %r %r %r", request, count, lazy)
+
+    request.pduDestination = Address(1)
+    apdu = APDU()
+    request.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+    data = bytes(pdu.pduData)
+
+    klass = request.__class__
+
+    start_time = time.time()
+    for i in range(count):
+        # the header is decoded by the state machine access point
+        apdu = APDU()
+        apdu.decode(PDU(data))
+        xpdu = UnconfirmedRequestPDU()
+        xpdu.decode(apdu)
+
+        # the parameters by the application service access point
+        klass().decode(xpdu, lazy=lazy)
+
+    return (time.time() - start_time) / count
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "count", type=int, nargs='?',
+        help="number of times to decode each one",
+        default=5000,
+        )
+    args = parser.parse_args()
+
+    sys.stdout.write("    %-36s %12s %12s\n" % ("", "eager", "lazy"))
+    for request in sample_requests():
+        eager = bench(request, args.count, False) * 1000000.0
+        lazy = bench(request, args.count, True) * 1000000.0
+        sys.stdout.write("    %-36s %9.2f us %9.2f us\n" % (request.__class__.__name__, eager, lazy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/python
+
+"""
+Decode a ReadPropertyMultiple-ACK that fills a 1476 octet APDU and time
+how long it takes.  The tags are decoded from a PDU that moves an offset
+through the data and from one that removes the octets from the front of
+the buffer as they are decoded, the way it used to be done.
+"""
+
+import sys
+import time
+import struct
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.errors import DecodingError
+from bacpypes.comm import PDUData
+from bacpypes.pdu import PDU
+from bacpypes.primitivedata import Real, CharacterString, TagList
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import StatusFlags
+from bacpypes.apdu import APDU, ReadPropertyMultipleACK, ReadAccessResult, \
+    ReadAccessResultElement, ReadAccessResultElementChoice
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# maximum APDU length for BACnet/IP
+MAX_APDU = 1476
+
+
+@bacpypes_debugging
+class DeletingPDUData(PDUData):
+
+    """
+    Decode by removing octets from the front of the buffer.
+    """
+
+    def remaining(self):
+        return len(self.pduData)
+
+    def get(self):
+        if len(self.pduData) == 0:
+            raise DecodingError("no more packet data")
+
+        octet = self.pduData[0]
+        del self.pduData[0]
+
+        return octet
+
+    def get_data(self, dlen):
+        if len(self.pduData) < dlen:
+            raise DecodingError("no more packet data")
+
+        data = self.pduData[:dlen]
+        del self.pduData[:dlen]
+
+        return data
+
+    def get_short(self):
+        return struct.unpack('>H', self.get_data(2))[0]
+
+    def get_long(self):
+        return struct.unpack('>L', self.get_data(4))[0]
+
+
+def read_access_result(instance):
+    """Return a result with a few properties of an analog value."""
+    results = []
+    for property_identifier, value in (
+            ('objectName', CharacterString("AV-%d" % (instance,))),
+            ('presentValue', Real(instance * 1.5)),
+            ('statusFlags', StatusFlags([0, 0, 0, 0])),
+            ):
+        results.append(ReadAccessResultElement(
+            propertyIdentifier=property_identifier,
+            readResult=ReadAccessResultElementChoice(propertyValue=Any(value)),
+            ))
+
+    return ReadAccessResult(
+        objectIdentifier=('analogValue', instance),
+        listOfResults=results,
+        )
+
+
+def rpm_ack(max_length=MAX_APDU):
+    """Return the encoded ReadPropertyMultiple-ACK with as many results
+    as will fit."""
+    results = []
+    data = None
+    while True:
+        results.append(read_access_result(len(results) + 1))
+
+        ack = ReadPropertyMultipleACK(listOfReadAccessResults=results)
+        ack.pduDestination = None
+        ack.apduInvokeID = 1
+
+        apdu = APDU()
+        ack.encode(apdu)
+        pdu = PDU()
+        apdu.encode(pdu)
+        if len(pdu.pduData) > max_length:
+            break
+
+        data = bytes(pdu.pduData)
+
+    return data
+
+
+@bacpypes_debugging
+def bench(label, fn, count):
+    """Call the function count times and report the time per call."""
+    if _debug: bench._debug("bench %r %r %r", label, fn, count)
+
+    start_time = time.time()
+    for i in range(count):
+        fn()
+    elapsed = time.time() - start_time
+
+    sys.stdout.write("    %-24s %10.3f s %10.2f us/op\n" % (label, elapsed, elapsed * 1000000.0 / count))
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "count", type=int, nargs='?',
+        help="number of times to decode",
+        default=2000,
+        )
+    args = parser.parse_args()
+
+    data = rpm_ack()
+    sys.stdout.write("ReadPropertyMultiple-ACK, %d octets\n" % (len(data),))
+
+    # the tags follow the four octet header
+    payload = data[3:]
+
+    def decode_tags(pdu_class):
+        tag_list = TagList()
+        tag_list.decode(pdu_class(payload))
+
+    def decode_ack():
+        apdu = APDU()
+        apdu.decode(PDU(data))
+        ack = ReadPropertyMultipleACK()
+        ack.decode(apdu)
+
+    bench("tags, deleting", lambda: decode_tags(DeletingPDUData), args.count)
+    bench("tags, offset", lambda: decode_tags(PDUData), args.count)
+    bench("ReadPropertyMultipleACK", decode_ack, args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+
+"""
+Decode a ReadPropertyMultiple-ACK with the present value and status flags
+of a lot of analog values, once into the ReadAccessResult objects with the
+values cast out, the usual way, and once into columns.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import Address, PDU
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import StatusFlags
+from bacpypes.apdu import APDU, ComplexAckPDU, ReadPropertyMultipleACK, \
+    ReadAccessResult, ReadAccessResultElement, ReadAccessResultElementChoice
+from bacpypes.object import get_datatype
+from bacpypes.columnar import read_access_columns
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def rpm_ack(count):
+    """Return the encoded ack for count analog values."""
+    results = []
+    for instance in range(1, count + 1):
+        results.append(ReadAccessResult(
+            objectIdentifier=('analogValue', instance),
+            listOfResults=[
+                ReadAccessResultElement(
+                    propertyIdentifier='presentValue',
+                    readResult=ReadAccessResultElementChoice(
+                        propertyValue=Any(Real(instance * 1.5)),
+                        ),
+                    ),
+                ReadAccessResultElement(
+                    propertyIdentifier='statusFlags',
+                    readResult=ReadAccessResultElementChoice(
+                        propertyValue=Any(StatusFlags([0, 0, 0, 0])),
+                        ),
+                    ),
+                ],
+            ))
+
+    ack = ReadPropertyMultipleACK(listOfReadAccessResults=results)
+    ack.pduDestination = Address(1)
+    ack.apduInvokeID = 1
+
+    apdu = APDU()
+    ack.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+
+    return bytes(pdu.pduData)
+
+
+def complex_ack(data):
+    """Decode the header like the state machine access point."""
+    apdu = APDU()
+    apdu.decode(PDU(data))
+    xpdu = ComplexAckPDU()
+    xpdu.decode(apdu)
+    return xpdu
+
+
+def decode_objects(data):
+    ack = ReadPropertyMultipleACK()
+    ack.decode(complex_ack(data))
+
+    values = []
+    for result in ack.listOfReadAccessResults:
+        object_type = result.objectIdentifier[0]
+        for element in result.listOfResults:
+            datatype = get_datatype(object_type, element.propertyIdentifier)
+            value = element.readResult.propertyValue.cast_out(datatype)
+            values.append((result.objectIdentifier, element.propertyIdentifier, value))
+
+    return values
+
+
+def decode_columns(data):
+    return read_access_columns(complex_ack(data))
+
+
+@bacpypes_debugging
+def bench(fn, data, count):
+    """Decode the data count times and return the best time for each."""
+    if _debug: bench._debug("bench %r %r", fn, count)
+
+    best = None
+    for j in range(5):
+        start_time = time.time()
+        for i in range(count):
+            fn(data)
+        elapsed = time.time() - start_time
+        if (best is None) or (elapsed < best):
+            best = elapsed
+
+    return best / count
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--count", type=int,
+        help="number of times to decode each ack",
+        default=20,
+        )
+    parser.add_argument(
+        "objects", type=int, nargs='*',
+        help="number of objects in the ack",
+        default=[10, 100, 1000],
+        )
+    args = parser.parse_args()
+
+    sys.stdout.write("    %8s %8s %12s %12s\n" % ("objects", "octets", "objects", "columns"))
+    for objects in args.objects:
+        data = rpm_ack(objects)
+        objects_time = bench(decode_objects, data, args.count)
+        columns_time = bench(decode_columns, data, args.count)
+
+        sys.stdout.write("    %8d %8d %9.1f us %9.1f us\n" % (
+            objects, len(data), objects_time * 1000000.0, columns_time * 1000000.0,
+            ))
+
+
+if __name__ == "__main__":
+    main()
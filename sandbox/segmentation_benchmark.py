@@ -0,0 +1,134 @@
+#!/usr/bin/python
+
+"""
+Split a large ComplexAck into segments and put them back together, once
+with the segments copied out of the content and appended to it one at a
+time, the way it used to be done, and once with views of the content and
+a list of pieces joined at the end.
+"""
+
+import os
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import Address
+from bacpypes.apdu import ComplexAckPDU, _APDU
+from bacpypes.app import DeviceInfoCache
+from bacpypes.appservice import SSM, StateMachineAccessPoint
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# maximum APDU length for BACnet/IP
+MAX_APDU = 1476
+
+
+@bacpypes_debugging
+class CopyingSSM(SSM):
+
+    """
+    Copy each segment out of the content and append each one that is
+    received to the content.
+    """
+
+    def get_segment(self, indx):
+        segAPDU = ComplexAckPDU(self.segmentAPDU.apduService, self.segmentAPDU.apduInvokeID)
+        segAPDU.pduUserData = self.segmentAPDU.pduUserData
+        segAPDU.pduDestination = self.pdu_address
+
+        segAPDU.apduSeg = True
+        segAPDU.apduMor = (indx < (self.segmentCount - 1))
+        segAPDU.apduSeq = indx % 256
+        segAPDU.apduWin = self.actualWindowSize
+
+        offset = indx * self.segmentSize
+        segAPDU.put_data( self.segmentAPDU.pduData[offset:offset+self.segmentSize] )
+
+        return segAPDU
+
+    def append_segment(self, apdu):
+        self.segmentAPDU.put_data(apdu.pduData)
+
+    def join_segments(self):
+        return self.segmentAPDU
+
+
+@bacpypes_debugging
+def bench(ssm_class, length, count):
+    """Send and receive an APDU of the given length count times and return
+    the time for each."""
+    if _debug: bench._debug("bench %r %r %r", ssm_class, length, count)
+
+    sap = StateMachineAccessPoint(deviceInfoCache=DeviceInfoCache())
+    content = os.urandom(length)
+
+    send_time = receive_time = 0.0
+    for i in range(count):
+        ack = ComplexAckPDU(26, 1)
+        ack.put_data(content)
+
+        # send all of the segments, the network layer encodes them
+        start_time = time.time()
+        sender = ssm_class(sap, Address(2))
+        sender.segmentSize = MAX_APDU
+        sender.actualWindowSize = 16
+        sender.set_segmentation_context(ack)
+        sender.segmentCount = (length + MAX_APDU - 1) // MAX_APDU
+
+        segments = []
+        for indx in range(sender.segmentCount):
+            apdu = _APDU()
+            sender.get_segment(indx).encode(apdu)
+            segments.append(apdu)
+        send_time += time.time() - start_time
+
+        # receive them
+        start_time = time.time()
+        receiver = ssm_class(sap, Address(2))
+        first = ComplexAckPDU(26, 1)
+        first.put_data(segments[0].pduData)
+        receiver.set_segmentation_context(first)
+        for apdu in segments[1:]:
+            receiver.append_segment(apdu)
+        result = receiver.join_segments()
+        receive_time += time.time() - start_time
+
+        if result.pduData != content:
+            raise RuntimeError("content mismatch")
+
+    return send_time / count, receive_time / count
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--count", type=int,
+        help="number of times to send and receive",
+        default=20,
+        )
+    parser.add_argument(
+        "lengths", type=int, nargs='*',
+        help="length of the content",
+        default=[16384, 65536, 262144],
+        )
+    args = parser.parse_args()
+
+    sys.stdout.write("    %8s %12s %12s %12s %12s\n" % ("", "send", "views", "receive", "join"))
+    for length in args.lengths:
+        copy_send, copy_receive = bench(CopyingSSM, length, args.count)
+        view_send, view_receive = bench(SSM, length, args.count)
+
+        sys.stdout.write("    %8d %9.1f us %9.1f us %9.1f us %9.1f us\n" % (
+            length,
+            copy_send * 1000000.0, view_send * 1000000.0,
+            copy_receive * 1000000.0, view_receive * 1000000.0,
+            ))
+
+
+if __name__ == "__main__":
+    main()
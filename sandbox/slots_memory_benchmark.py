@@ -0,0 +1,83 @@
+#!/usr/bin/python
+
+"""
+Build a lot of tags, addresses, PDUs and primitive values and report the
+memory used by each one, to compare the classes with and without slots.
+"""
+
+import sys
+import tracemalloc
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import Address, LocalStation, PDU
+from bacpypes.npdu import NPDU
+from bacpypes.apdu import APDU, ComplexAckPDU
+from bacpypes.primitivedata import Tag, ApplicationTag, Unsigned, Real, \
+    Enumerated, CharacterString, ObjectIdentifier
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# things to build, the argument is the loop counter
+builders = [
+    ("ApplicationTag", lambda i: ApplicationTag(Tag.unsignedAppTag, b'\x01')),
+    ("Address", lambda i: Address("10.0.%d.%d" % (i // 250 % 250, i % 250 + 1))),
+    ("LocalStation", lambda i: LocalStation(i % 254 + 1)),
+    ("PDU", lambda i: PDU(b'\x01\x02\x03')),
+    ("NPDU", lambda i: NPDU()),
+    ("APDU", lambda i: APDU()),
+    ("ComplexAckPDU", lambda i: ComplexAckPDU()),
+    ("Unsigned", lambda i: Unsigned(i)),
+    ("Real", lambda i: Real(i * 0.5)),
+    ("Enumerated", lambda i: Enumerated(i % 100)),
+    ("CharacterString", lambda i: CharacterString("hello")),
+    ("ObjectIdentifier", lambda i: ObjectIdentifier(('analogValue', i % 1000))),
+    ]
+
+
+@bacpypes_debugging
+def bench(builder, count):
+    """Build count objects and return the number of bytes for each, the
+    values the builder shares, like interned strings, are not counted."""
+    if _debug: bench._debug("bench %r %r", builder, count)
+
+    # build a few first so the caches are warm
+    keep = [builder(i) for i in range(10)]
+
+    tracemalloc.start()
+    try:
+        start_size = tracemalloc.get_traced_memory()[0]
+        keep = [builder(i) for i in range(count)]
+        end_size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    # the list itself is not part of the objects
+    return (end_size - start_size - sys.getsizeof(keep)) / float(count)
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--count", type=int,
+        help="number of objects to build",
+        default=10000,
+        )
+    args = parser.parse_args()
+
+    sys.stdout.write("    %-20s %8s %8s\n" % ("class", "bytes", "dict"))
+    for name, builder in builders:
+        size = bench(builder, args.count)
+        sample = builder(0)
+
+        sys.stdout.write("    %-20s %8.1f %8s\n" % (
+            name, size, "yes" if hasattr(sample, '__dict__') else "no",
+            ))
+
+
+if __name__ == "__main__":
+    main()
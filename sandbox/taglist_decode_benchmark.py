@@ -0,0 +1,70 @@
+#!/usr/bin/python
+
+"""
+Decode ReadPropertyMultiple-ACK tag lists of increasing size and report
+the time per tag, which should stay about the same as the size grows.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.primitivedata import TagList
+from bacpypes.constructeddata import Sequence
+from bacpypes.apdu import ReadPropertyMultipleACK
+
+from pdu_decode_benchmark import read_access_result
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+def bench(count, repeat):
+    """Decode the tags of an ACK with count results and report the time
+    per tag."""
+    if _debug: bench._debug("bench %r %r", count, repeat)
+
+    ack = ReadPropertyMultipleACK(
+        listOfReadAccessResults=[read_access_result(i + 1) for i in range(count)],
+        )
+
+    # skip the APDU header, just the tags
+    tag_list = TagList()
+    Sequence.encode(ack, tag_list)
+    tags = tag_list.tagList
+
+    start_time = time.time()
+    for i in range(repeat):
+        Sequence.decode(ReadPropertyMultipleACK(), TagList(tags[:]))
+    elapsed = (time.time() - start_time) / repeat
+
+    sys.stdout.write("    %6d results %7d tags %10.3f ms %8.2f us/tag\n" % (
+        count, len(tags), elapsed * 1000.0, elapsed * 1000000.0 / len(tags),
+        ))
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--repeat", type=int,
+        help="number of times to decode each size",
+        default=3,
+        )
+    parser.add_argument(
+        "sizes", type=int, nargs='*',
+        help="number of results",
+        default=[10, 100, 1000, 10000],
+        )
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        bench(count, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
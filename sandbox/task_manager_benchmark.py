@@ -0,0 +1,107 @@
+#!/usr/bin/python
+
+"""
+Schedule a large number of one-shot tasks with the task manager and time
+how long it takes to install them, reschedule them (which suspends the
+existing entry), suspend them, and run the ones that are left.  The tasks
+are spread over the next few seconds and the benchmark waits for them to
+come due before running them.
+"""
+
+import sys
+import time
+import random
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.settings import settings
+from bacpypes.task import OneShotTask, task_manager, task_manager_classes
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class BenchmarkTask(OneShotTask):
+
+    def process_task(self):
+        pass
+
+
+@bacpypes_debugging
+def bench(label, fn, count):
+    """Call the function and report the time per operation."""
+    if _debug: bench._debug("bench %r %r %r", label, fn, count)
+
+    start_time = time.time()
+    fn()
+    elapsed = time.time() - start_time
+
+    sys.stdout.write("    %-10s %10.3f s %10.2f us/op\n" % (label, elapsed, elapsed * 1000000.0 / count))
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--task-manager",
+        help="kind of task manager",
+        choices=sorted(task_manager_classes),
+        default=settings.task_manager,
+        )
+    parser.add_argument(
+        "--spread", type=float,
+        help="seconds to spread the tasks over",
+        default=3.0,
+        )
+    parser.add_argument(
+        "count", type=int, nargs='?',
+        help="number of tasks",
+        default=100000,
+        )
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    # make the kind of task manager, the trigger is not needed since there
+    # is no run loop
+    settings.task_manager = args.task_manager
+    manager = task_manager()
+    manager.trigger = None
+
+    now = manager.get_time()
+    tasks = [BenchmarkTask() for i in range(args.count)]
+    sys.stdout.write("%d tasks, %s\n" % (args.count, manager.__class__.__name__))
+
+    def install():
+        for task in tasks:
+            task.install_task(now + random.random() * args.spread)
+    bench("install", install, args.count)
+
+    def reinstall():
+        for task in tasks:
+            task.install_task(now + random.random() * args.spread)
+    bench("reinstall", reinstall, args.count)
+
+    def suspend():
+        for task in tasks[::2]:
+            task.suspend_task()
+    bench("suspend", suspend, args.count // 2)
+
+    # wait for them to come due
+    time.sleep(max(now + args.spread - manager.get_time(), 0.0))
+
+    def process():
+        while True:
+            task, delta = manager.get_next_task()
+            if not task:
+                break
+            manager.process_task(task)
+    bench("process", process, args.count // 2)
+
+
+if __name__ == "__main__":
+    main()
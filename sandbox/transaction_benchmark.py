@@ -0,0 +1,141 @@
+#!/usr/bin/python
+
+"""
+Keep a number of confirmed requests outstanding to a number of devices,
+then time sending another request and matching an ack to a transaction.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.task import TaskManager
+from bacpypes.comm import Server, ApplicationServiceElement, bind
+from bacpypes.pdu import Address, PDU
+from bacpypes.apdu import APDU, ConfirmedRequestPDU, SimpleAckPDU
+from bacpypes.app import DeviceInfoCache
+from bacpypes.appservice import StateMachineAccessPoint
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class Collect(ApplicationServiceElement, Server):
+
+    """Keep the last request sent down the stack."""
+
+    def __init__(self):
+        ApplicationServiceElement.__init__(self)
+        Server.__init__(self)
+        self.last_request = None
+
+    def confirmation(self, apdu):
+        pass
+
+    def indication(self, pdu):
+        self.last_request = pdu
+
+
+def request(address):
+    apdu = ConfirmedRequestPDU(12)
+    apdu.pduDestination = address
+    return apdu
+
+
+def simple_ack(address, invoke_id):
+    """Return a simple ack as it comes up the stack."""
+    ack = SimpleAckPDU(12, invoke_id)
+    ack.pduSource = address
+
+    apdu = APDU()
+    ack.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+
+    apdu = APDU()
+    apdu.decode(pdu)
+    return apdu
+
+
+@bacpypes_debugging
+def bench(devices, outstanding, count):
+    """Return the time for a request and its ack."""
+    if _debug: bench._debug("bench %r %r %r", devices, outstanding, count)
+
+    sap = StateMachineAccessPoint(deviceInfoCache=DeviceInfoCache())
+    above = Collect()
+    below = Collect()
+    bind(above, sap)
+    bind(sap, below)
+
+    addresses = [Address("10.0.%d.%d" % (i // 250, i % 250 + 1)) for i in range(devices)]
+
+    # the transactions that are waiting, oldest first
+    waiting = []
+    for i in range(outstanding):
+        address = addresses[i % devices]
+        sap.sap_indication(request(address))
+        waiting.append((address, below.last_request.apduInvokeID))
+
+    best = None
+    for j in range(5):
+        elapsed = 0.0
+        done = 0
+        while done < count:
+            # ack all of the transactions that are waiting, send a new
+            # request after each one
+            acks = [simple_ack(address, invoke_id) for address, invoke_id in waiting]
+            del waiting[:]
+
+            start_time = time.time()
+            for i, ack in enumerate(acks):
+                sap.confirmation(ack)
+
+                address = addresses[i % devices]
+                sap.sap_indication(request(address))
+                waiting.append((address, below.last_request.apduInvokeID))
+            elapsed += time.time() - start_time
+            done += len(acks)
+
+        if (best is None) or (elapsed / done < best):
+            best = elapsed / done
+
+    return best
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--count", type=int,
+        help="number of requests and acks",
+        default=1000,
+        )
+    parser.add_argument(
+        "--devices", type=int,
+        help="number of devices",
+        default=500,
+        )
+    parser.add_argument(
+        "outstanding", type=int, nargs='*',
+        help="number of outstanding requests",
+        default=[10, 200, 2000],
+        )
+    args = parser.parse_args()
+
+    # the transactions have timers
+    TaskManager()
+
+    sys.stdout.write("    %8s %12s %12s\n" % ("devices", "outstanding", "time"))
+    for outstanding in args.outstanding:
+        elapsed = bench(args.devices, outstanding, args.count)
+        sys.stdout.write("    %8d %12d %9.1f us\n" % (
+            args.devices, outstanding, elapsed * 1000000.0,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+
+"""
+Run a simulation with the virtual task manager.  A number of recurring
+tasks are polling at the same interval, phase spread across it, and the
+run loop stops when the simulated duration has passed.  The time it
+takes depends on the number of tasks processed, not the duration.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.core import run, stop
+from bacpypes.task import RecurringFunctionTask, FunctionTask, \
+    VirtualTaskManager, phase_even
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# globals
+poll_count = 0
+
+
+@bacpypes_debugging
+def poll():
+    global poll_count
+    if _debug: poll._debug("poll")
+
+    poll_count += 1
+
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--interval", type=float,
+        help="polling interval in seconds",
+        default=60.0,
+        )
+    parser.add_argument(
+        "--duration", type=float,
+        help="simulated seconds to run",
+        default=86400.0,
+        )
+    parser.add_argument(
+        "count", type=int, nargs='?',
+        help="number of pollers",
+        default=100,
+        )
+    args = parser.parse_args()
+
+    # make a task manager with a virtual clock
+    task_manager = VirtualTaskManager()
+
+    # make the pollers
+    for i in range(args.count):
+        task = RecurringFunctionTask(args.interval * 1000.0, poll, _phase=phase_even())
+        task.install_task()
+
+    # stop when the time is up
+    FunctionTask(stop).install_task(delta=args.duration)
+
+    start_time = time.time()
+    run()
+    elapsed = time.time() - start_time
+
+    sys.stdout.write("%d polls, %.1f simulated seconds in %.3f s\n" % (
+        poll_count, task_manager.get_time(), elapsed,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ BACpypes Testing
 ----------------
 """
 
+import sys
+
 from . import test__template
 
 from . import utilities
@@ -15,12 +17,17 @@ from . import extended_tag_list
 from . import trapped_classes
 
 from . import test_comm
+from . import test_core
+from . import test_task
 from . import test_pdu
 from . import test_primitive_data
 from . import test_constructed_data
 from . import test_base_types
 from . import test_utilities
 from . import test_vlan
+if sys.version_info >= (3, 4):
+    from . import test_aio
+from . import test_shard
 
 from . import test_bvll
 from . import test_npdu
@@ -4,8 +4,15 @@
 Glue routines to simulate package setup and teardown.
 """
 
+import sys
+
 from .utilities import setup_package, teardown_package
 
+# asyncio is not available for the older versions
+collect_ignore = []
+if sys.version_info < (3, 4):
+    collect_ignore.append("test_aio")
+
 def pytest_configure(config):
     setup_package()
 
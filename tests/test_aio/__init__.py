@@ -0,0 +1,11 @@
+#!/usr/bin/python
+
+"""
+Test BACpypes Asyncio Integration
+"""
+
+from . import test_iocb
+from . import test_udp
+from . import test_enable
+from . import test_task_manager
+from . import test_tcp
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Asyncio Enable
+-------------------
+"""
+
+import asyncio
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import task
+from bacpypes.aio import AsyncioTaskManager, enable
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestEnable(unittest.TestCase):
+
+    def test_other_task_manager(self):
+        """The stack cannot move to the event loop when another kind of
+        task manager has been created, like the time machine."""
+        if _debug: TestEnable._debug("test_other_task_manager")
+
+        assert task._task_manager is not None
+        assert not isinstance(task._task_manager, AsyncioTaskManager)
+
+        loop = asyncio.new_event_loop()
+        try:
+            with self.assertRaises(RuntimeError) as context:
+                enable(loop)
+            assert "another task manager" in str(context.exception)
+        finally:
+            loop.close()
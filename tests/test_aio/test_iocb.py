@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Asyncio IOCB
+-----------------
+"""
+
+import asyncio
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.iocb import IOCB
+from bacpypes.aio import IOCBAbort, iocb_future
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestIOCBFuture(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestIOCBFuture._debug("setup_method %r", method)
+
+        self.loop = asyncio.new_event_loop()
+
+    def teardown_method(self, method):
+        if _debug: TestIOCBFuture._debug("teardown_method %r", method)
+
+        self.loop.close()
+
+    def test_complete(self):
+        """Awaiting an IOCB gives the response."""
+        if _debug: TestIOCBFuture._debug("test_complete")
+
+        iocb = IOCB()
+        future = iocb_future(iocb, self.loop)
+        self.loop.call_soon(iocb.complete, 12)
+
+        assert self.loop.run_until_complete(future) == 12
+
+    def test_already_complete(self):
+        """An IOCB that has already been completed resolves immediately."""
+        if _debug: TestIOCBFuture._debug("test_already_complete")
+
+        iocb = IOCB()
+        iocb.complete(34)
+
+        assert self.loop.run_until_complete(iocb_future(iocb, self.loop)) == 34
+
+    def test_abort(self):
+        """An aborted IOCB raises the error."""
+        if _debug: TestIOCBFuture._debug("test_abort")
+
+        iocb = IOCB()
+        future = iocb_future(iocb, self.loop)
+        self.loop.call_soon(iocb.abort, "not an exception")
+
+        with self.assertRaises(IOCBAbort) as context:
+            self.loop.run_until_complete(future)
+        assert context.exception.args[0] == "not an exception"
+
+        iocb = IOCB()
+        future = iocb_future(iocb, self.loop)
+        self.loop.call_soon(iocb.abort, ValueError("oops"))
+
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(future)
+
+    def test_gather(self):
+        """IOCBs can be awaited together."""
+        if _debug: TestIOCBFuture._debug("test_gather")
+
+        iocbs = [IOCB() for i in range(5)]
+        for i, iocb in enumerate(iocbs):
+            self.loop.call_soon(iocb.complete, i)
+
+        futures = [iocb_future(iocb, self.loop) for iocb in iocbs]
+        results = self.loop.run_until_complete(asyncio.gather(*futures))
+        assert results == [0, 1, 2, 3, 4]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Asyncio Task Manager
+-------------------------
+
+The task manager is a singleton and the test suite has already created the
+time machine, so each scenario runs in its own interpreter.  Running this
+file with the name of a scenario prints what happened as JSON.
+"""
+
+import os
+import sys
+import json
+import logging
+import asyncio
+import threading
+import subprocess
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import core
+from bacpypes import task
+from bacpypes.comm import Client, bind
+from bacpypes.task import RecurringTask, FunctionTask
+from bacpypes.aio import AsyncioTaskManager, AsyncioTCPServerDirector, \
+    enable, run
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+def run_scenario(path, name):
+    """Run a scenario in a new interpreter and return what it printed."""
+    if _debug: run_scenario._debug("run_scenario %r %r", path, name)
+
+    # the new interpreter finds the same bacpypes
+    import bacpypes
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (
+        os.path.dirname(os.path.dirname(os.path.abspath(bacpypes.__file__))),
+        env.get('PYTHONPATH'),
+        )))
+
+    output = subprocess.check_output(
+        [sys.executable, path, name], env=env, timeout=30,
+        )
+    return json.loads(output.decode('utf-8'))
+
+
+class _Events(logging.Handler):
+
+    """Collect the log messages and the scenario events in one list."""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.events = []
+
+    def emit(self, record):
+        self.events.append(['log', record.getMessage()])
+
+
+def tasks():
+    """Tasks are scheduled on the event loop until core.stop()."""
+    loop = asyncio.new_event_loop()
+    loop = enable(loop)
+    task_manager = task._task_manager
+
+    events = _Events()
+    logging.getLogger('bacpypes.aio.AsyncioTaskManager').addHandler(events)
+
+    class Tick(RecurringTask):
+        def __init__(self):
+            RecurringTask.__init__(self, 100)
+            self.count = 0
+
+        def process_task(self):
+            self.count += 1
+
+    def fail():
+        raise ValueError("nope")
+
+    tick = Tick()
+    tick.install_task()
+
+    once = FunctionTask(events.events.append, 'once')
+    once.install_task(delta=0.2)
+
+    # installing it again moves it
+    moved = FunctionTask(events.events.append, 'moved')
+    moved.install_task(delta=0.1)
+    moved.install_task(delta=0.3)
+
+    suspended = FunctionTask(events.events.append, 'suspended')
+    suspended.install_task(delta=0.1)
+    suspended.suspend_task()
+
+    FunctionTask(fail).install_task(delta=0.25)
+    FunctionTask(core.stop).install_task(delta=0.45)
+
+    events.events.append(['handles', len(task_manager.handles)])
+    events.events.append(['loop', core.eventLoop is loop])
+
+    run(loop)
+
+    events.events.append(['ticks', tick.count >= 3])
+    events.events.append(['scheduled', tick.isScheduled, moved.isScheduled, suspended.isScheduled])
+    events.events.append(['handles', len(task_manager.handles)])
+    events.events.append(['running', core.running, core.eventLoop is None])
+    loop.close()
+
+    return events.events
+
+
+def deferred():
+    """Deferred functions go to the event loop."""
+    events = []
+
+    # deferred before there is a loop
+    core.deferred(events.append, 'early')
+    events.append(['queued', len(core.deferredFns)])
+
+    loop = enable(asyncio.new_event_loop())
+    events.append(['queued', len(core.deferredFns)])
+
+    # now they go right to the loop, even from another thread
+    core.deferred(events.append, 'late')
+    thread = threading.Thread(target=core.deferred, args=(events.append, 'thread'))
+    thread.start()
+    thread.join()
+    events.append(['queued', len(core.deferredFns)])
+
+    core.deferred(core.stop)
+    run(loop)
+    loop.close()
+
+    return events
+
+
+def other_loop():
+    """The task manager stays with the first event loop."""
+    loop = enable(asyncio.new_event_loop())
+
+    events = [isinstance(task._task_manager, AsyncioTaskManager)]
+    events.append(enable(loop) is loop)
+    try:
+        enable(asyncio.new_event_loop())
+    except RuntimeError as err:
+        events.append(str(err))
+
+    return events
+
+
+def idle_timeout():
+    """A TCP connection that is not used is closed by a task."""
+    loop = enable(asyncio.new_event_loop())
+    director = AsyncioTCPServerDirector(('127.0.0.1', 0), idle_timeout=0.4, loop=loop)
+    events = []
+
+    class Received(Client):
+        def confirmation(self, pdu):
+            events.append(['received', pdu.pduData.decode('ascii')])
+
+    bind(Received(), director)
+
+    async def connect():
+
+        reader, writer = await asyncio.open_connection(*director.socket.getsockname())
+        peer = writer.get_extra_info('sockname')[:2]
+        await asyncio.sleep(0.2)
+        events.append(['connected', list(director.servers) == [peer]])
+
+        # sending keeps it open a little longer
+        writer.write(b'hello')
+        await asyncio.sleep(0.3)
+        events.append(['connected', list(director.servers) == [peer]])
+
+        data = await asyncio.wait_for(reader.read(), 1.0)
+        events.append(['closed', data.decode('ascii'), len(director.servers)])
+        writer.close()
+
+    loop.run_until_complete(connect())
+    director.close_socket()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+
+    return events
+
+
+@bacpypes_debugging
+class TestAsyncioTaskManager(unittest.TestCase):
+
+    def test_tasks(self):
+        """Tasks run in order, moved and suspended tasks are not run
+        where they were, and run() returns after core.stop()."""
+        if _debug: TestAsyncioTaskManager._debug("test_tasks")
+
+        events = run_scenario(__file__, 'tasks')
+        assert events == [
+            ['handles', 5],
+            ['loop', True],
+            'once',
+            ['log', 'an error has occurred: nope'],
+            'moved',
+            ['ticks', True],
+            ['scheduled', True, False, False],
+            ['handles', 1],
+            ['running', False, True],
+            ]
+
+    def test_deferred(self):
+        """Deferred functions are moved to the event loop by enable() and
+        then passed along as they are deferred."""
+        if _debug: TestAsyncioTaskManager._debug("test_deferred")
+
+        events = run_scenario(__file__, 'deferred')
+        assert events == [
+            ['queued', 1],
+            ['queued', 0],
+            ['queued', 0],
+            'early',
+            'late',
+            'thread',
+            ]
+
+    def test_other_loop(self):
+        """Enabling again with the same loop is fine, another one is not."""
+        if _debug: TestAsyncioTaskManager._debug("test_other_loop")
+
+        events = run_scenario(__file__, 'other_loop')
+        assert events == [
+            True,
+            True,
+            "the task manager is using another event loop",
+            ]
+
+    def test_idle_timeout(self):
+        """An idle connection is closed by a task on the event loop."""
+        if _debug: TestAsyncioTaskManager._debug("test_idle_timeout")
+
+        events = run_scenario(__file__, 'idle_timeout')
+        assert events == [
+            ['connected', True],
+            ['received', 'hello'],
+            ['connected', True],
+            ['closed', '', 0],
+            ]
+
+
+if __name__ == "__main__":
+    json.dump(globals()[sys.argv[1]](), sys.stdout)
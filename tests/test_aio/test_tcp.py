@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Asyncio TCP Server Director
+--------------------------------
+"""
+
+import asyncio
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import Client, PDU, bind
+from bacpypes.aio import AsyncioTCPServerDirector
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class SampleClient(Client):
+
+    def __init__(self):
+        if _debug: SampleClient._debug("__init__")
+        Client.__init__(self)
+
+        self.confirmations = []
+
+    def confirmation(self, pdu):
+        if _debug: SampleClient._debug("confirmation %r", pdu)
+
+        self.confirmations.append(pdu)
+
+
+@bacpypes_debugging
+class TestAsyncioTCPServerDirector(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestAsyncioTCPServerDirector._debug("setup_method %r", method)
+
+        self.loop = asyncio.new_event_loop()
+
+    def teardown_method(self, method):
+        if _debug: TestAsyncioTCPServerDirector._debug("teardown_method %r", method)
+
+        self.loop.close()
+
+    def director(self):
+        """Return a director on any port and a client bound to it."""
+        director = AsyncioTCPServerDirector(('127.0.0.1', 0), loop=self.loop)
+        client = SampleClient()
+        bind(client, director)
+
+        return director, client
+
+    async def wait_for(self, predicate):
+        """Give the loop a chance to run until the predicate is true."""
+        for i in range(100):
+            if predicate():
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError("timeout")
+
+    def test_actor_class(self):
+        """The actors must be asyncio actors."""
+        if _debug: TestAsyncioTCPServerDirector._debug("test_actor_class")
+
+        with self.assertRaises(TypeError):
+            AsyncioTCPServerDirector(('127.0.0.1', 0), actorClass=object, loop=self.loop)
+
+    def test_exchange(self):
+        """Data from a connection goes up with the peer as the source, and
+        data for the peer goes down the connection."""
+        if _debug: TestAsyncioTCPServerDirector._debug("test_exchange")
+
+        director, client = self.director()
+
+        async def exchange():
+            reader, writer = await asyncio.open_connection(*director.socket.getsockname())
+            peer = writer.get_extra_info('sockname')[:2]
+
+            writer.write(b'hello')
+            await self.wait_for(lambda: client.confirmations)
+            pdu = client.confirmations[0]
+            assert pdu.pduData == b'hello'
+            assert pdu.pduSource == peer
+
+            # an actor was added for the peer
+            actor = director.get_actor(peer)
+            assert actor is not None
+
+            client.request(PDU(b'world', destination=peer))
+            data = await asyncio.wait_for(reader.readexactly(5), 1.0)
+            assert data == b'world'
+
+            # the actor goes away with the connection
+            writer.close()
+            await self.wait_for(lambda: not director.servers)
+            assert actor.transport is None
+
+            # nothing to send it to
+            with self.assertRaises(RuntimeError):
+                director.indication(PDU(b'gone', destination=peer))
+
+        self.loop.run_until_complete(exchange())
+
+        director.close_socket()
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+    def test_close_socket(self):
+        """Closing the director closes the connections."""
+        if _debug: TestAsyncioTCPServerDirector._debug("test_close_socket")
+
+        director, client = self.director()
+
+        async def close():
+            reader, writer = await asyncio.open_connection(*director.socket.getsockname())
+            await self.wait_for(lambda: director.servers and director.server)
+
+            director.close_socket()
+            assert not director.servers
+            assert director.socket is None
+
+            # the other end sees the connection closed
+            data = await asyncio.wait_for(reader.read(), 1.0)
+            assert data == b''
+            writer.close()
+
+        self.loop.run_until_complete(close())
+        self.loop.run_until_complete(asyncio.sleep(0))
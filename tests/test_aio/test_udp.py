@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Asyncio UDP Director
+-------------------------
+"""
+
+import asyncio
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import Client, PDU, bind
+from bacpypes.aio import AsyncioUDPDirector
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class SampleClient(Client):
+
+    def __init__(self, future):
+        if _debug: SampleClient._debug("__init__")
+        Client.__init__(self)
+
+        self.future = future
+
+    def confirmation(self, pdu):
+        if _debug: SampleClient._debug("confirmation %r", pdu)
+
+        self.future.set_result(pdu)
+
+
+@bacpypes_debugging
+class TestAsyncioUDPDirector(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestAsyncioUDPDirector._debug("setup_method %r", method)
+
+        self.loop = asyncio.new_event_loop()
+
+    def teardown_method(self, method):
+        if _debug: TestAsyncioUDPDirector._debug("teardown_method %r", method)
+
+        self.loop.close()
+
+    def test_exchange(self):
+        """Send a datagram from one director to another."""
+        if _debug: TestAsyncioUDPDirector._debug("test_exchange")
+
+        future = self.loop.create_future()
+
+        d1 = AsyncioUDPDirector(('127.0.0.1', 0), loop=self.loop)
+        d2 = AsyncioUDPDirector(('127.0.0.1', 0), loop=self.loop)
+        c1 = SampleClient(None)
+        c2 = SampleClient(future)
+        bind(c1, d1)
+        bind(c2, d2)
+
+        # sent before the transport is ready
+        c1.request(PDU(b'hello', destination=d2.socket.getsockname()))
+
+        pdu = self.loop.run_until_complete(asyncio.wait_for(future, 1.0))
+        assert pdu.pduData == b'hello'
+        assert pdu.pduSource == d1.socket.getsockname()
+
+        # an actor was created for the peer
+        assert d2.get_actor(d1.socket.getsockname())
+
+        d1.close_socket()
+        d2.close_socket()
+
+        # let the transports finish closing
+        self.loop.run_until_complete(asyncio.sleep(0))
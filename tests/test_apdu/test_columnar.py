@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Columnar Decoding
+----------------------
+"""
+
+import math
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.errors import DecodingError
+from bacpypes.pdu import Address, PDU
+from bacpypes.primitivedata import Tag, Unsigned, Integer, Real, Double, \
+    Boolean, CharacterString
+from bacpypes.constructeddata import Any, ArrayOf
+from bacpypes.basetypes import StatusFlags, PropertyIdentifier, \
+    EngineeringUnits, ErrorType
+from bacpypes.apdu import APDU, ComplexAckPDU, ReadPropertyMultipleACK, \
+    ReadAccessResult, ReadAccessResultElement, ReadAccessResultElementChoice
+
+from bacpypes import columnar
+from bacpypes.columnar import read_access_columns
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def element(property_identifier, value=None, index=None, error=None):
+    """Return a read access result element with a value or an error."""
+    if error:
+        choice = ReadAccessResultElementChoice(
+            propertyAccessError=ErrorType(errorClass=error[0], errorCode=error[1]),
+            )
+    else:
+        choice = ReadAccessResultElementChoice(propertyValue=Any(value))
+
+    return ReadAccessResultElement(
+        propertyIdentifier=property_identifier,
+        propertyArrayIndex=index,
+        readResult=choice,
+        )
+
+
+def rpm_ack():
+    """Return a ReadPropertyMultiple-ACK with a mix of results."""
+    return ReadPropertyMultipleACK(listOfReadAccessResults=[
+        ReadAccessResult(
+            objectIdentifier=('analogValue', 1),
+            listOfResults=[
+                element('presentValue', Real(72.5)),
+                element('statusFlags', StatusFlags([0, 1, 0, 1])),
+                element('units', EngineeringUnits('degreesFahrenheit')),
+                element('objectName', CharacterString("AV-1")),
+                ],
+            ),
+        ReadAccessResult(
+            objectIdentifier=('analogInput', 4194302),
+            listOfResults=[
+                element('presentValue', Integer(-300)),
+                element('covIncrement', Double(0.25)),
+                element('outOfService', Boolean(True)),
+                element('priorityArray', Unsigned(3), index=0),
+                element('eventTimeStamps', error=('property', 'unknownProperty')),
+                element('propertyList', ArrayOf(PropertyIdentifier)([85, 111])),
+                element(512, Unsigned(70000)),
+                ],
+            ),
+        ])
+
+
+def complex_ack(ack):
+    """Return the ack as it comes up the stack."""
+    ack.pduSource = Address(1)
+    ack.apduInvokeID = 1
+
+    apdu = APDU()
+    ack.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+
+    apdu = APDU()
+    apdu.decode(pdu)
+    xpdu = ComplexAckPDU()
+    xpdu.decode(apdu)
+
+    return xpdu
+
+
+@bacpypes_debugging
+class TestReadAccessColumns(unittest.TestCase):
+
+    def check_columns(self, columns):
+        if _debug: TestReadAccessColumns._debug("check_columns %r", columns)
+
+        assert len(columns) == 11
+        assert columns.object_identifier(0) == ('analogValue', 1)
+        assert columns.object_identifier(4) == ('analogInput', 4194302)
+        assert columns.property_identifier(0) == 'presentValue'
+        assert columns.property_identifier(10) == 512
+        assert list(columns.propertyIdentifier) == [
+            85, 111, 117, 77, 85, 22, 81, 87, 130, 371, 512,
+            ]
+        assert list(columns.propertyArrayIndex) == [
+            -1, -1, -1, -1, -1, -1, -1, 0, -1, -1, -1,
+            ]
+
+        values = list(columns.value)
+        assert values[:3] == [72.5, 10.0, 64.0]
+        assert values[4:8] == [-300.0, 0.25, 1.0, 3.0]
+        assert values[10] == 70000.0
+        for row in (3, 8, 9):
+            assert math.isnan(values[row])
+
+        assert list(columns.valueTag) == [
+            Tag.realAppTag, Tag.bitStringAppTag, Tag.enumeratedAppTag,
+            Tag.characterStringAppTag, Tag.integerAppTag, Tag.doubleAppTag,
+            Tag.booleanAppTag, Tag.unsignedAppTag, -1, -1, Tag.unsignedAppTag,
+            ]
+        assert list(columns.errorClass) == [-1] * 8 + [2, -1, -1]
+        assert list(columns.errorCode) == [-1] * 8 + [32, -1, -1]
+
+    def test_complex_ack(self):
+        """Decode an ack that has only the header decoded."""
+        if _debug: TestReadAccessColumns._debug("test_complex_ack")
+
+        columns = read_access_columns(complex_ack(rpm_ack()), use_numpy=False)
+        self.check_columns(columns)
+
+    def test_lazy_ack(self):
+        """Decode an ack that was decoded lazily, it can still be decoded
+        the normal way afterwards."""
+        if _debug: TestReadAccessColumns._debug("test_lazy_ack")
+
+        ack = ReadPropertyMultipleACK()
+        ack.decode(complex_ack(rpm_ack()), lazy=True)
+
+        columns = read_access_columns(ack, use_numpy=False)
+        self.check_columns(columns)
+        assert '_lazy_data' in ack.__dict__
+
+        assert len(ack.listOfReadAccessResults) == 2
+
+    def test_decoded_ack(self):
+        """An ack that has been decoded is encoded again."""
+        if _debug: TestReadAccessColumns._debug("test_decoded_ack")
+
+        columns = read_access_columns(rpm_ack(), use_numpy=False)
+        self.check_columns(columns)
+
+    def test_empty(self):
+        """No results is no rows."""
+        if _debug: TestReadAccessColumns._debug("test_empty")
+
+        columns = read_access_columns(b'', use_numpy=False)
+        assert len(columns) == 0
+
+    def test_errors(self):
+        """Truncated and malformed acks are decoding errors."""
+        if _debug: TestReadAccessColumns._debug("test_errors")
+
+        ack = complex_ack(rpm_ack())
+        data = bytes(ack.pduData)
+
+        with self.assertRaises(DecodingError):
+            read_access_columns(data[:-1], use_numpy=False)
+        with self.assertRaises(DecodingError):
+            read_access_columns(data[:30], use_numpy=False)
+        with self.assertRaises(DecodingError):
+            read_access_columns(xtob('1e'), use_numpy=False)
+
+        ack.apduService = 12
+        with self.assertRaises(DecodingError):
+            read_access_columns(ack)
+
+    def test_large_array_index(self):
+        """Array indexes are unsigned 32 bit values."""
+        if _debug: TestReadAccessColumns._debug("test_large_array_index")
+
+        ack = ReadPropertyMultipleACK(listOfReadAccessResults=[
+            ReadAccessResult(
+                objectIdentifier=('analogValue', 1),
+                listOfResults=[
+                    element('priorityArray', Unsigned(3), index=4294967295),
+                    element('priorityArray', Unsigned(4), index=2147483648),
+                    ],
+                ),
+            ])
+
+        columns = read_access_columns(complex_ack(ack), use_numpy=False)
+        assert list(columns.propertyArrayIndex) == [4294967295, 2147483648]
+        assert list(columns.value) == [3.0, 4.0]
+
+    @unittest.skipIf(columnar.numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        """The columns are NumPy arrays."""
+        if _debug: TestReadAccessColumns._debug("test_numpy")
+
+        columns = read_access_columns(complex_ack(rpm_ack()))
+        assert isinstance(columns.value, columnar.numpy.ndarray)
+        assert columns.value.dtype == columnar.numpy.float64
+        self.check_columns(columns)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Lazy Decoding
+------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.errors import DecodingError, TooManyArguments
+from bacpypes.pdu import Address, PDU
+from bacpypes.apdu import APDU, UnconfirmedRequestPDU, IAmRequest, \
+    WhoIsRequest, ReadPropertyMultipleACK
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def i_am_request():
+    """Return an I-Am request as it comes up the stack."""
+    request = IAmRequest(
+        iAmDeviceIdentifier=('device', 599),
+        maxAPDULengthAccepted=1024,
+        segmentationSupported='segmentedBoth',
+        vendorID=15,
+        )
+    request.pduSource = Address(1)
+
+    apdu = APDU()
+    request.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+
+    # the state machine access point decodes the header
+    apdu = APDU()
+    apdu.decode(pdu)
+    xpdu = UnconfirmedRequestPDU()
+    xpdu.decode(apdu)
+
+    return xpdu
+
+
+@bacpypes_debugging
+class TestLazyDecode(unittest.TestCase):
+
+    def test_header(self):
+        """The header is decoded, the parameters are not."""
+        if _debug: TestLazyDecode._debug("test_header")
+
+        request = IAmRequest()
+        request.decode(i_am_request(), lazy=True)
+
+        assert request.apduService == IAmRequest.serviceChoice
+        assert request.pduSource == Address(1)
+        assert 'iAmDeviceIdentifier' not in request.__dict__
+
+    def test_parameters(self):
+        """The parameters are decoded when they are needed."""
+        if _debug: TestLazyDecode._debug("test_parameters")
+
+        request = IAmRequest()
+        request.decode(i_am_request(), lazy=True)
+
+        assert request.vendorID == 15
+        assert request.iAmDeviceIdentifier == ('device', 599)
+        assert request.maxAPDULengthAccepted == 1024
+        assert '_lazy_data' not in request.__dict__
+
+        # other attributes are still missing
+        with self.assertRaises(AttributeError):
+            request.no_such_attribute
+
+    def test_same_as_eager(self):
+        """Both ways have the same contents."""
+        if _debug: TestLazyDecode._debug("test_same_as_eager")
+
+        lazy_request = IAmRequest()
+        lazy_request.decode(i_am_request(), lazy=True)
+
+        request = IAmRequest()
+        request.decode(i_am_request())
+
+        assert lazy_request.apdu_contents() == request.apdu_contents()
+
+    def test_trailing_tags(self):
+        """Too many arguments are found when the parameters are decoded."""
+        if _debug: TestLazyDecode._debug("test_trailing_tags")
+
+        apdu = UnconfirmedRequestPDU(WhoIsRequest.serviceChoice)
+        apdu.put_data(xtob('0901' '1902' '2903'))
+
+        request = WhoIsRequest()
+        request.decode(apdu, lazy=True)
+
+        with self.assertRaises(TooManyArguments):
+            request.deviceInstanceRangeLowLimit
+
+    def test_decoding_error(self):
+        """A choice that cannot be found is a decoding error, not a missing
+        attribute."""
+        if _debug: TestLazyDecode._debug("test_decoding_error")
+
+        # a result element with an unknown read result choice
+        apdu = APDU()
+        apdu.put_data(xtob('0c0200000a' '1e' '2955' '6e6f' '1f'))
+
+        ack = ReadPropertyMultipleACK()
+        ack.decode(apdu, lazy=True)
+
+        with self.assertRaises(DecodingError):
+            getattr(ack, 'listOfReadAccessResults', None)
@@ -8,4 +8,5 @@ from . import test_codec
 from . import test_simple
 from . import test_foreign
 from . import test_bbmd
+from . import test_fan_out
 
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test BBMD Fan Out
+-----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.comm import Server, bind
+from bacpypes.pdu import PDU, Address, LocalBroadcast
+
+from bacpypes.bvll import BVLPDU, ForwardedNPDU, DistributeBroadcastToNetwork
+from bacpypes.bvllservice import AnnexJCodec, BIPBBMD
+
+from ..time_machine import reset_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class PDUCollector(Server):
+
+    """Keep the PDUs that are sent down the stack."""
+
+    def __init__(self):
+        if _debug: PDUCollector._debug("__init__")
+        Server.__init__(self)
+
+        self.pdus = []
+
+    def indication(self, pdu):
+        if _debug: PDUCollector._debug("indication %r", pdu)
+        self.pdus.append(pdu)
+
+
+@bacpypes_debugging
+class TestFanOut(unittest.TestCase):
+
+    def setup_method(self, method):
+        """Build a BBMD with a couple of peers and foreign devices."""
+        if _debug: TestFanOut._debug("setup_method %r", method)
+
+        reset_time_machine()
+
+        self.bbmd = BIPBBMD(Address("192.168.1.2/24"))
+        self.codec = AnnexJCodec()
+        self.collector = PDUCollector()
+        bind(self.bbmd, self.codec, self.collector)
+
+        self.bbmd.add_peer(Address("192.168.1.2/24"))
+        self.bbmd.add_peer(Address("192.168.2.2/24"))
+        self.bbmd.add_peer(Address("192.168.3.2/32"))
+
+        self.bbmd.register_foreign_device(Address("10.0.0.1"), 30)
+        self.bbmd.register_foreign_device(Address("10.0.0.2"), 30)
+
+    def test_broadcast(self):
+        """A local broadcast is forwarded with the same octets."""
+        if _debug: TestFanOut._debug("test_broadcast")
+
+        self.bbmd.indication(PDU(xtob('01.02.03'), destination=LocalBroadcast()))
+
+        pdus = self.collector.pdus
+        destinations = [pdu.pduDestination for pdu in pdus]
+        assert destinations == [
+            LocalBroadcast(),
+            Address("192.168.2.255"),
+            Address("192.168.3.2"),
+            Address("10.0.0.1"),
+            Address("10.0.0.2"),
+            ]
+
+        # the forwarded copies are the same octets
+        forwarded = pdus[1:]
+        for pdu in forwarded:
+            assert pdu.pduData == forwarded[0].pduData
+
+        # which decode as a forwarded NPDU from this BBMD
+        bvlpdu = BVLPDU()
+        bvlpdu.decode(PDU(forwarded[0].pduData))
+        xpdu = ForwardedNPDU()
+        xpdu.decode(bvlpdu)
+        assert xpdu.bvlciAddress == Address("192.168.1.2")
+        assert xpdu.pduData == xtob('01.02.03')
+
+    def test_distribute(self):
+        """A distributed broadcast skips the foreign device that sent it."""
+        if _debug: TestFanOut._debug("test_distribute")
+
+        self.bbmd.confirmation(DistributeBroadcastToNetwork(
+            xtob('01.02.03'), source=Address("10.0.0.1"),
+            ))
+
+        pdus = self.collector.pdus
+        destinations = [pdu.pduDestination for pdu in pdus]
+        assert destinations == [
+            LocalBroadcast(),
+            Address("192.168.2.255"),
+            Address("192.168.3.2"),
+            Address("10.0.0.2"),
+            ]
+        for pdu in pdus[1:]:
+            assert pdu.pduData == pdus[0].pduData
+
+    def test_peer_change(self):
+        """Changing the BDT changes the destinations."""
+        if _debug: TestFanOut._debug("test_peer_change")
+
+        assert self.bbmd.peer_destinations() == [
+            Address("192.168.2.255"),
+            Address("192.168.3.2"),
+            ]
+
+        self.bbmd.delete_peer(Address("192.168.2.2/24"))
+        assert self.bbmd.peer_destinations() == [Address("192.168.3.2")]
+
+        self.bbmd.add_peer(Address("192.168.4.2/24"))
+        assert self.bbmd.peer_destinations() == [
+            Address("192.168.3.2"),
+            Address("192.168.4.255"),
+            ]
+        assert self.bbmd.peer_destinations(local_broadcast=True) == [
+            LocalBroadcast(),
+            Address("192.168.3.2"),
+            Address("192.168.4.255"),
+            ]
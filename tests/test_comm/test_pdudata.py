@@ -1 +1,116 @@
-# placeholder
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+BACpypes PDUData Testing
+------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.errors import DecodingError
+from bacpypes.comm import PDUData
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestPDUData(unittest.TestCase):
+
+    def test_get(self):
+        """Getting moves through the data."""
+        if _debug: TestPDUData._debug("test_get")
+
+        pdu = PDUData(xtob('01020304050607080910'))
+        buffer = pdu._pduData
+
+        assert pdu.get() == 0x01
+        assert pdu.get_short() == 0x0203
+        assert pdu.get_long() == 0x04050607
+        assert pdu.get_data(2) == xtob('0809')
+        assert pdu.remaining() == 1
+
+        # the buffer has not been changed
+        assert pdu._pduData is buffer
+        assert len(buffer) == 10
+
+        # the rest of the data is still available
+        assert pdu.pduData == xtob('10')
+        assert len(pdu.pduData) == 1
+
+    def test_no_more_data(self):
+        """Getting past the end is an error."""
+        if _debug: TestPDUData._debug("test_no_more_data")
+
+        pdu = PDUData(xtob('0102'))
+        pdu.get()
+
+        with self.assertRaises(DecodingError):
+            pdu.get_short()
+        with self.assertRaises(DecodingError):
+            pdu.get_long()
+        with self.assertRaises(DecodingError):
+            pdu.get_data(2)
+
+        # nothing was consumed by the errors
+        assert pdu.get() == 0x02
+        with self.assertRaises(DecodingError):
+            pdu.get()
+
+    def test_put_after_get(self):
+        """Data can be added after some has been decoded."""
+        if _debug: TestPDUData._debug("test_put_after_get")
+
+        pdu = PDUData(xtob('0102'))
+        pdu.get()
+        pdu.put(0x03)
+        pdu.put_short(0x0405)
+        pdu.put_data(xtob('06'))
+
+        assert pdu.pduData == xtob('0203040506')
+
+    def test_set_data(self):
+        """Setting the data starts over."""
+        if _debug: TestPDUData._debug("test_set_data")
+
+        pdu = PDUData(xtob('0102'))
+        pdu.get()
+
+        pdu.pduData = xtob('0304')
+        assert pdu.remaining() == 2
+        assert pdu.get() == 0x03
+
+    def test_take_data(self):
+        """Taking the data leaves the other empty."""
+        if _debug: TestPDUData._debug("test_take_data")
+
+        pdu1 = PDUData(xtob('01020304'))
+        pdu1.get()
+
+        pdu2 = PDUData()
+        pdu2.take_data(pdu1)
+
+        assert pdu1.remaining() == 0
+        assert pdu1.pduData == xtob('')
+        assert pdu2.remaining() == 3
+        assert pdu2.pduData == xtob('020304')
+
+    def test_copy(self):
+        """Copying gets the rest of the data."""
+        if _debug: TestPDUData._debug("test_copy")
+
+        pdu1 = PDUData(xtob('010203'))
+        pdu1.get()
+
+        pdu2 = PDUData(pdu1)
+        assert pdu2.pduData == xtob('0203')
+
+        # they are independent
+        assert pdu2.get() == 0x02
+        pdu2.put(0x04)
+        assert pdu1.pduData == xtob('0203')
+        assert pdu2.pduData == xtob('0304')
@@ -0,0 +1,9 @@
+#!/usr/bin/python
+
+"""
+Test BACpypes Core Module
+"""
+
+from . import test_socket_selector
+from . import test_deferred
+from . import test_instrumentation
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Deferred Functions
+-----------------------
+"""
+
+import threading
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import core
+from bacpypes.core import deferred, run_deferred
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestDeferred(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestDeferred._debug("setup_method %r", method)
+
+        self.called = []
+
+    def teardown_method(self, method):
+        if _debug: TestDeferred._debug("teardown_method %r", method)
+
+        # leave nothing behind for other tests
+        core.deferredFns.clear()
+
+    def test_order(self):
+        """Functions are called in order, including ones deferred along
+        the way."""
+        if _debug: TestDeferred._debug("test_order")
+
+        def fn(x):
+            self.called.append(x)
+            if x == 1:
+                deferred(fn, 3)
+
+        deferred(fn, 1)
+        deferred(fn, 2)
+        assert run_deferred() == 3
+        assert self.called == [1, 2, 3]
+
+    def test_count_budget(self):
+        """The count budget leaves the rest for later."""
+        if _debug: TestDeferred._debug("test_count_budget")
+
+        for i in range(10):
+            deferred(self.called.append, i)
+
+        budget_exceeded = core.deferredStats['budgetExceeded']
+        assert run_deferred(count=4) == 4
+        assert self.called == [0, 1, 2, 3]
+        assert len(core.deferredFns) == 6
+        assert core.deferredStats['budgetExceeded'] == budget_exceeded + 1
+
+        assert run_deferred() == 6
+        assert self.called == list(range(10))
+
+    def test_duration_budget(self):
+        """The time budget always makes some progress."""
+        if _debug: TestDeferred._debug("test_duration_budget")
+
+        for i in range(10):
+            deferred(self.called.append, i)
+
+        assert run_deferred(duration=0.0) == 1
+        assert self.called == [0]
+
+    def test_error(self):
+        """An error does not lose the rest of the queue."""
+        if _debug: TestDeferred._debug("test_error")
+
+        def oops():
+            raise ValueError("oops")
+
+        deferred(oops)
+        deferred(self.called.append, 1)
+
+        with self.assertRaises(ValueError):
+            run_deferred()
+        assert run_deferred() == 1
+        assert self.called == [1]
+
+    def test_threads(self):
+        """Functions can be deferred from other threads."""
+        if _debug: TestDeferred._debug("test_threads")
+
+        def worker():
+            for i in range(1000):
+                deferred(self.called.append, i)
+
+        threads = [threading.Thread(target=worker) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        max_depth = core.deferredStats['maxDepth']
+        assert run_deferred() == 4000
+        assert len(self.called) == 4000
+        assert max_depth >= 1
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Instrumentation
+--------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import core
+from bacpypes.histogram import Histogram
+from bacpypes.task import FunctionTask
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class StringFile(list):
+
+    """Collect what is written."""
+
+    def write(self, text):
+        self.append(text)
+
+    def getvalue(self):
+        return ''.join(self)
+
+
+@bacpypes_debugging
+class TestHistogram(unittest.TestCase):
+
+    def test_empty(self):
+        if _debug: TestHistogram._debug("test_empty")
+
+        h = Histogram('empty')
+        assert h.percentile(50.0) is None
+        assert h.mean() is None
+        assert h.summary() == {'count': 0}
+
+    def test_small_values(self):
+        """Small values are exact."""
+        if _debug: TestHistogram._debug("test_small_values")
+
+        h = Histogram('small', scale=1)
+        for v in range(1, 11):
+            h.record(v)
+
+        assert h.count == 10
+        assert h.percentile(50.0) == 5
+        assert h.percentile(100.0) == 10
+        assert h.mean() == 5.5
+
+    def test_relative_error(self):
+        """Large values are within the precision of the bits."""
+        if _debug: TestHistogram._debug("test_relative_error")
+
+        h = Histogram('large')
+        for v in (0.001, 0.01, 0.1, 1.0, 10.0):
+            h.reset()
+            h.record(v)
+            assert abs(h.percentile(50.0) - v) <= v / 16.0
+
+    def test_percentiles(self):
+        if _debug: TestHistogram._debug("test_percentiles")
+
+        h = Histogram('spread', scale=1)
+        for v in range(1000):
+            h.record(v)
+
+        assert abs(h.percentile(90.0) - 900) <= 900 / 16
+        assert h.percentile(100.0) == 999
+        assert h.minValue == 0
+
+        summary = h.summary()
+        assert summary['count'] == 1000
+        assert summary['max'] == 999
+
+    def test_dump(self):
+        if _debug: TestHistogram._debug("test_dump")
+
+        h = Histogram('dump')
+        h.record(0.5)
+
+        f = StringFile()
+        h.dump(f)
+        assert f.getvalue().startswith("    dump: count 1 min 500000")
+
+
+@bacpypes_debugging
+class TestInstrumentation(unittest.TestCase):
+
+    def teardown_method(self, method):
+        if _debug: TestInstrumentation._debug("teardown_method %r", method)
+
+        core.enable_instrumentation(False)
+
+    def test_task_lateness(self):
+        """The task manager records how late tasks are."""
+        if _debug: TestInstrumentation._debug("test_task_lateness")
+
+        core.enable_instrumentation()
+        lateness = core.instruments['lateness']
+
+        # run a task at the time it was scheduled
+        reset_time_machine()
+        FunctionTask(lambda: None).install_task(1.0)
+        run_time_machine(5.0)
+
+        assert lateness.count == 1
+        assert lateness.maxValue == 0
+
+        # turned off
+        core.enable_instrumentation(False)
+        assert core.taskManager.lateness is None
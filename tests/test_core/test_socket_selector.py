@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Socket Selector
+--------------------
+"""
+
+import asyncore
+import socket
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.core import SocketSelector, selectors
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class SampleDispatcher(asyncore.dispatcher):
+
+    def __init__(self, socket_map):
+        if _debug: SampleDispatcher._debug("__init__")
+        asyncore.dispatcher.__init__(self, map=socket_map)
+
+        self.create_socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.bind(('127.0.0.1', 0))
+
+        self.outbound = []
+        self.inbound = []
+
+    def readable(self):
+        return True
+
+    def handle_read(self):
+        self.inbound.append(self.socket.recvfrom(1024))
+
+    def writable(self):
+        return bool(self.outbound)
+
+    def handle_write(self):
+        data, addr = self.outbound.pop(0)
+        self.socket.sendto(data, addr)
+
+
+@unittest.skipIf(selectors is None, "no selectors module")
+@bacpypes_debugging
+class TestSocketSelector(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestSocketSelector._debug("setup_method %r", method)
+
+        self.socket_map = {}
+        self.socket_selector = SocketSelector(self.socket_map)
+
+    def teardown_method(self, method):
+        if _debug: TestSocketSelector._debug("teardown_method %r", method)
+
+        for obj in list(self.socket_map.values()):
+            obj.close()
+        self.socket_selector.close()
+
+    def test_register_once(self):
+        """Dispatchers are registered once and modified on interest change."""
+        if _debug: TestSocketSelector._debug("test_register_once")
+
+        d1 = SampleDispatcher(self.socket_map)
+        self.socket_selector.poll(0.0)
+
+        assert self.socket_selector.registered[d1._fileno] is d1
+        assert self.socket_selector.interest[d1._fileno] == selectors.EVENT_READ
+
+        # something to write changes the interest
+        d1.outbound.append((b'x', ('127.0.0.1', 9)))
+        self.socket_selector.update()
+
+        assert self.socket_selector.interest[d1._fileno] == \
+            selectors.EVENT_READ | selectors.EVENT_WRITE
+
+    def test_exchange(self):
+        """Every ready descriptor is handled in one pass."""
+        if _debug: TestSocketSelector._debug("test_exchange")
+
+        d1 = SampleDispatcher(self.socket_map)
+        d2 = SampleDispatcher(self.socket_map)
+        d3 = SampleDispatcher(self.socket_map)
+
+        d1.outbound.append((b'hello', d2.socket.getsockname()))
+        d1.outbound.append((b'there', d3.socket.getsockname()))
+
+        # first pass sends one, second pass sends the other
+        self.socket_selector.poll(0.1)
+        self.socket_selector.poll(0.1)
+        assert not d1.outbound
+
+        # both receivers are ready in the same pass
+        self.socket_selector.poll(0.1)
+        assert [data for data, addr in d2.inbound] == [b'hello']
+        assert [data for data, addr in d3.inbound] == [b'there']
+
+    def test_closed(self):
+        """Closed dispatchers are unregistered."""
+        if _debug: TestSocketSelector._debug("test_closed")
+
+        d1 = SampleDispatcher(self.socket_map)
+        fd = d1._fileno
+        self.socket_selector.poll(0.0)
+        assert fd in self.socket_selector.registered
+
+        d1.close()
+        self.socket_selector.poll(0.0)
+        assert fd not in self.socket_selector.registered
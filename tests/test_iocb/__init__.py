@@ -12,3 +12,6 @@ from . import test_iocontroller
 from . import test_ioqcontroller
 from . import test_clientcontroller
 from . import test_sieveclientcontroller
+from . import test_windowqueue
+from . import test_read_coalesce
+from . import test_single_flight
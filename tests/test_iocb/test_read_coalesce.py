@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Read Coalescing
+--------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.settings import settings
+from bacpypes.iocb import IOCB, PENDING, ACTIVE, COMPLETED, ABORTED
+from bacpypes.pdu import Address
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import ErrorType
+from bacpypes.apdu import ReadPropertyRequest, ReadPropertyACK, \
+    ReadPropertyMultipleRequest, ReadPropertyMultipleACK, \
+    ReadAccessResult, ReadAccessResultElement, ReadAccessResultElementChoice, \
+    RejectPDU, RejectReason, Error
+from bacpypes.app import DeviceInfo
+
+from ..time_machine import reset_time_machine, run_time_machine
+from .test_windowqueue import RequestWindowApplication
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def read_property(objid, propid='presentValue'):
+    """Return a request for a property of an object."""
+    request = ReadPropertyRequest(
+        objectIdentifier=objid,
+        propertyIdentifier=propid,
+        )
+    request.pduDestination = Address(2)
+    return request
+
+
+def read_result(objid, *elements):
+    """Return the result for an object, the elements are property values
+    or errors."""
+    list_of_results = []
+    for propid, value in elements:
+        if isinstance(value, ErrorType):
+            result = ReadAccessResultElementChoice(propertyAccessError=value)
+        else:
+            result = ReadAccessResultElementChoice(propertyValue=Any(Real(value)))
+        list_of_results.append(ReadAccessResultElement(
+            propertyIdentifier=propid,
+            readResult=result,
+            ))
+
+    return ReadAccessResult(objectIdentifier=objid, listOfResults=list_of_results)
+
+
+@bacpypes_debugging
+class TestReadCoalesce(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+        self.read_coalesce_window = settings.read_coalesce_window
+        settings.read_coalesce_window = 10
+
+    def tearDown(self):
+        settings.read_coalesce_window = self.read_coalesce_window
+
+    def test_one_read(self):
+        """A read by itself is sent when the window closes."""
+        if _debug: TestReadCoalesce._debug("test_one_read")
+
+        app = RequestWindowApplication()
+        iocb = IOCB(read_property(('analogValue', 1)))
+        app.request_io(iocb)
+        assert not app.send.requests
+
+        run_time_machine(0.02)
+        assert app.send.requests == [iocb.args[0]]
+
+    def test_read_multiple(self):
+        """The reads are combined and the ack is split up."""
+        if _debug: TestReadCoalesce._debug("test_read_multiple")
+
+        app = RequestWindowApplication()
+        iocbs = [
+            IOCB(read_property(('analogValue', 1))),
+            IOCB(read_property(('analogValue', 2))),
+            IOCB(read_property(('analogValue', 1), 'statusFlags')),
+            IOCB(read_property((2, 1), 85)),
+            ]
+        for iocb in iocbs:
+            app.request_io(iocb)
+        run_time_machine(0.02)
+
+        # one request, one specification for each object
+        assert len(app.send.requests) == 1
+        request = app.send.requests[0]
+        assert isinstance(request, ReadPropertyMultipleRequest)
+        assert [(spec.objectIdentifier, [ref.propertyIdentifier for ref in spec.listOfPropertyReferences])
+            for spec in request.listOfReadAccessSpecs] == [
+            (('analogValue', 1), ['presentValue', 'statusFlags']),
+            (('analogValue', 2), ['presentValue']),
+            ]
+
+        # status flags are left out of the ack
+        ack = ReadPropertyMultipleACK(
+            listOfReadAccessResults=[
+                read_result(('analogValue', 1), ('presentValue', 1.5)),
+                read_result(('analogValue', 2), ('presentValue',
+                    ErrorType(errorClass='object', errorCode='unknownObject'))),
+                ],
+            context=request,
+            )
+        ack.pduSource = Address(2)
+        app.confirmation(ack)
+        run_time_machine(0.02)
+
+        assert [iocb.ioState for iocb in iocbs] == [COMPLETED, ABORTED, ACTIVE, COMPLETED]
+        assert isinstance(iocbs[0].ioResponse, ReadPropertyACK)
+        assert iocbs[0].ioResponse.pduSource == Address(2)
+        assert iocbs[0].ioResponse.propertyValue.cast_out(Real) == 1.5
+        assert iocbs[3].ioResponse is iocbs[0].ioResponse
+        assert isinstance(iocbs[1].ioError, Error)
+        assert iocbs[1].ioError.errorCode == 'unknownObject'
+
+        # the one that was left out is read by itself
+        assert app.send.requests[1] is iocbs[2].args[0]
+
+    def test_not_supported(self):
+        """Devices that reject read property multiple get one read at a
+        time."""
+        if _debug: TestReadCoalesce._debug("test_not_supported")
+
+        app = RequestWindowApplication()
+        iocbs = [IOCB(read_property(('analogValue', i))) for i in range(2)]
+        for iocb in iocbs:
+            app.request_io(iocb)
+        run_time_machine(0.02)
+
+        reject = RejectPDU(app.send.requests[0].apduInvokeID, RejectReason.unrecognizedService)
+        reject.pduSource = Address(2)
+        app.confirmation(reject)
+        run_time_machine(0.02)
+
+        assert not app.read_multiple(Address(2))
+        assert app.send.requests[1] is iocbs[0].args[0]
+
+        # not combined and not waiting for the window
+        iocb = IOCB(read_property(('analogValue', 3)))
+        app.request_io(iocb)
+        assert iocb.ioState == PENDING
+        assert iocb not in app.read_batches.get(Address(2), [])
+
+    def test_batch_size(self):
+        """The batch is sent when it is as big as the device can take."""
+        if _debug: TestReadCoalesce._debug("test_batch_size")
+
+        app = RequestWindowApplication()
+        device_info = DeviceInfo(100, Address(2))
+        device_info.maxApduLengthAccepted = 50
+        app.deviceInfoCache.cache[Address(2)] = device_info
+        assert app.read_batch_size(Address(2)) == 2
+
+        for i in range(2):
+            app.request_io(IOCB(read_property(('analogValue', i))))
+        assert isinstance(app.send.requests[0], ReadPropertyMultipleRequest)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Single Flight
+------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.settings import settings
+from bacpypes.iocb import IOCB, PENDING, COMPLETED, ABORTED
+from bacpypes.pdu import Address
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any
+from bacpypes.apdu import ReadPropertyRequest, ReadPropertyACK, Error
+
+from ..time_machine import reset_time_machine, run_time_machine
+from .test_windowqueue import RequestWindowApplication
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def read_property(objid, index=None):
+    """Return a request for the present value of an object."""
+    request = ReadPropertyRequest(
+        objectIdentifier=objid,
+        propertyIdentifier='presentValue',
+        propertyArrayIndex=index,
+        )
+    request.pduDestination = Address(2)
+    return request
+
+
+def read_property_ack(request, value):
+    """Return the ack for a read."""
+    ack = ReadPropertyACK(
+        objectIdentifier=request.objectIdentifier,
+        propertyIdentifier=request.propertyIdentifier,
+        propertyValue=Any(Real(value)),
+        context=request,
+        )
+    ack.pduSource = Address(2)
+    return ack
+
+
+@bacpypes_debugging
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+        self.single_flight = settings.single_flight
+        settings.single_flight = True
+
+    def tearDown(self):
+        settings.single_flight = self.single_flight
+
+    def test_shared(self):
+        """The same read is sent once and the response is shared."""
+        if _debug: TestSingleFlight._debug("test_shared")
+
+        app = RequestWindowApplication()
+        iocbs = [
+            IOCB(read_property(('analogValue', 1))),
+            IOCB(read_property((2, 1))),
+            IOCB(read_property(('analogValue', 1), 1)),
+            ]
+        for iocb in iocbs:
+            app.request_io(iocb)
+
+        # the third one is different
+        assert len(app.send.requests) == 1
+        assert len(app.in_flight) == 2
+
+        request = app.send.requests[0]
+        ack = read_property_ack(request, 1.5)
+        app.confirmation(ack)
+        run_time_machine(1.0)
+
+        assert [iocb.ioState for iocb in iocbs[:2]] == [COMPLETED, COMPLETED]
+        assert iocbs[0].ioResponse is ack
+        assert iocbs[1].ioResponse is ack
+
+        assert app.single_flight_stats() == {
+            'hits': 1, 'misses': 2, 'hit_rate': 1 / 3.0, 'in_flight': 1,
+            }
+
+        # the read is not remembered after it completes
+        iocb = IOCB(read_property(('analogValue', 1)))
+        app.request_io(iocb)
+        assert app.single_flight_misses == 3
+
+    def test_client_abort(self):
+        """The read continues when the one that started it gives up."""
+        if _debug: TestSingleFlight._debug("test_client_abort")
+
+        app = RequestWindowApplication()
+        iocbs = [IOCB(read_property(('analogValue', 1))) for i in range(2)]
+        for iocb in iocbs:
+            app.request_io(iocb)
+
+        iocbs[0].abort(RuntimeError("timeout"))
+        assert iocbs[1].ioState == PENDING
+
+        app.confirmation(read_property_ack(app.send.requests[0], 1.5))
+        run_time_machine(1.0)
+
+        assert [iocb.ioState for iocb in iocbs] == [ABORTED, COMPLETED]
+        assert isinstance(iocbs[0].ioError, RuntimeError)
+
+    def test_error(self):
+        """An error is shared like a response."""
+        if _debug: TestSingleFlight._debug("test_error")
+
+        app = RequestWindowApplication()
+        iocbs = [IOCB(read_property(('analogValue', 1))) for i in range(2)]
+        for iocb in iocbs:
+            app.request_io(iocb)
+
+        request = app.send.requests[0]
+        error = Error(errorClass='object', errorCode='unknownObject', context=request)
+        error.pduSource = Address(2)
+        app.confirmation(error)
+        run_time_machine(1.0)
+
+        assert [iocb.ioState for iocb in iocbs] == [ABORTED, ABORTED]
+        assert iocbs[1].ioError is error
+        assert not app.in_flight
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Window Queue
+-----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.settings import settings
+from bacpypes.iocb import IOCB, WindowQueue, ACTIVE, PENDING, COMPLETED, ABORTED
+from bacpypes.pdu import Address
+from bacpypes.apdu import ReadPropertyRequest, WhoIsRequest, \
+    SimpleAckPDU, AbortPDU, AbortReason
+from bacpypes.app import DeviceInfo, ApplicationIOController
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def read_property(address):
+    """Return a request for the present value of an object."""
+    request = ReadPropertyRequest(
+        objectIdentifier=('analogValue', 1),
+        propertyIdentifier='presentValue',
+        )
+    request.pduDestination = address
+    return request
+
+
+@bacpypes_debugging
+class SendRequests:
+
+    """Collect the requests and give them invoke IDs like the state
+    machine access point."""
+
+    def __init__(self):
+        if _debug: SendRequests._debug("__init__")
+        self.requests = []
+        self.next_invoke_id = 1
+
+    def __call__(self, apdu):
+        if _debug: SendRequests._debug("__call__ %r", apdu)
+        if apdu.apduInvokeID is None:
+            apdu.apduInvokeID = self.next_invoke_id
+            self.next_invoke_id += 1
+        self.requests.append(apdu)
+
+
+@bacpypes_debugging
+class RequestWindowApplication(ApplicationIOController):
+
+    """An application without a stack, the requests are collected."""
+
+    def __init__(self):
+        if _debug: RequestWindowApplication._debug("__init__")
+        ApplicationIOController.__init__(self)
+        self.send = SendRequests()
+
+    def _app_request(self, apdu):
+        if _debug: RequestWindowApplication._debug("_app_request %r", apdu)
+        self.send(apdu)
+
+
+@bacpypes_debugging
+class TestWindowQueue(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+
+    def test_window(self):
+        """Requests up to the window size are active at the same time."""
+        if _debug: TestWindowQueue._debug("test_window")
+
+        send = SendRequests()
+        queue = WindowQueue(send, Address(2), 2)
+
+        iocbs = [IOCB(read_property(Address(2))) for i in range(3)]
+        for iocb in iocbs:
+            queue.request_io(iocb)
+
+        assert [iocb.ioState for iocb in iocbs] == [ACTIVE, ACTIVE, PENDING]
+        assert len(send.requests) == 2
+
+        # the second one finishes first
+        assert queue.find_io(2) is iocbs[1]
+        queue.complete_io(iocbs[1], None)
+        run_time_machine(1.0)
+
+        assert [iocb.ioState for iocb in iocbs] == [ACTIVE, COMPLETED, ACTIVE]
+        assert sorted(queue.active_iocbs) == [1, 3]
+
+        # aborted by the client
+        iocbs[0].abort(RuntimeError("timeout"))
+        assert queue.find_io(1) is None
+        assert sorted(queue.active_iocbs) == [3]
+
+    def test_response_while_sending(self):
+        """A response that comes back before the request function returns
+        is for the request being sent."""
+        if _debug: TestWindowQueue._debug("test_response_while_sending")
+
+        def send(apdu):
+            queue.complete_io(queue.find_io(None), None)
+
+        queue = WindowQueue(send, Address(2), 2)
+        iocb = IOCB(WhoIsRequest(destination=Address(2)))
+        queue.request_io(iocb)
+
+        assert iocb.ioState == COMPLETED
+        assert not queue.active_iocbs
+
+
+@bacpypes_debugging
+class TestRequestWindow(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+        self.request_window = settings.request_window
+
+    def tearDown(self):
+        settings.request_window = self.request_window
+
+    def test_default(self):
+        """One request at a time by default."""
+        if _debug: TestRequestWindow._debug("test_default")
+
+        settings.request_window = 1
+        app = RequestWindowApplication()
+
+        iocbs = [IOCB(read_property(Address(2))) for i in range(2)]
+        for iocb in iocbs:
+            app.request_io(iocb)
+        assert len(app.send.requests) == 1
+
+        ack = SimpleAckPDU(12, 1)
+        ack.pduSource = Address(2)
+        app.confirmation(ack)
+        run_time_machine(1.0)
+
+        assert iocbs[0].ioState == COMPLETED
+        assert len(app.send.requests) == 2
+
+    def test_window(self):
+        """Acks are matched by invoke ID."""
+        if _debug: TestRequestWindow._debug("test_window")
+
+        settings.request_window = 4
+        app = RequestWindowApplication()
+
+        iocbs = [IOCB(read_property(Address(2))) for i in range(5)]
+        for iocb in iocbs:
+            app.request_io(iocb)
+        assert [apdu.apduInvokeID for apdu in app.send.requests] == [1, 2, 3, 4]
+
+        # the third one is acked
+        ack = SimpleAckPDU(12, 3)
+        ack.pduSource = Address(2)
+        app.confirmation(ack)
+        run_time_machine(1.0)
+
+        assert iocbs[2].ioResponse is ack
+        assert [iocb.ioState for iocb in iocbs] == [ACTIVE, ACTIVE, COMPLETED, ACTIVE, ACTIVE]
+
+    def test_device_info(self):
+        """The device information can change the window."""
+        if _debug: TestRequestWindow._debug("test_device_info")
+
+        settings.request_window = 4
+        app = RequestWindowApplication()
+
+        device_info = DeviceInfo(100, Address(2))
+        device_info.requestWindow = 2
+        app.deviceInfoCache.cache[Address(2)] = device_info
+
+        assert app.request_window(Address(2)) == 2
+        assert app.request_window(Address(3)) == 4
+
+    def test_too_busy(self):
+        """A device that is too busy gets one request at a time."""
+        if _debug: TestRequestWindow._debug("test_too_busy")
+
+        settings.request_window = 4
+        app = RequestWindowApplication()
+
+        iocbs = [IOCB(read_property(Address(2))) for i in range(3)]
+        for iocb in iocbs:
+            app.request_io(iocb)
+
+        abort = AbortPDU(True, 2, AbortReason.outOfResources)
+        abort.pduSource = Address(2)
+        app.confirmation(abort)
+        run_time_machine(1.0)
+
+        assert iocbs[1].ioState == ABORTED
+        assert iocbs[1].ioError is abort
+        assert app.queue_by_address[Address(2)].window_size == 1
+        assert app.request_window(Address(2)) == 1
+
+        # the others finish, nothing new is sent until they are all done
+        iocb = IOCB(read_property(Address(2)))
+        app.request_io(iocb)
+        assert iocb.ioState == PENDING
+
+        for invoke_id in (1, 3):
+            ack = SimpleAckPDU(12, invoke_id)
+            ack.pduSource = Address(2)
+            app.confirmation(ack)
+            run_time_machine(1.0)
+        assert iocb.ioState == ACTIVE
@@ -646,3 +646,42 @@ class TestAddressEquality(unittest.TestCase, MatchAddressMixin):
         assert Address(u"5:*") == RemoteBroadcast(5)
         assert Address(u"*:*") == GlobalBroadcast()
 
+
+@bacpypes_debugging
+class TestAddressCache(unittest.TestCase, MatchAddressMixin):
+
+    def test_address_cache_parse(self):
+        if _debug: TestAddressCache._debug("test_address_cache_parse")
+
+        # parsed again from the cache
+        for i in range(2):
+            test_addr = Address("1.2.3.4/24:47809")
+            self.match_address(test_addr, 2, None, 6, '01020304BAC1')
+            assert test_addr.addrTuple == ('1.2.3.4', 47809)
+            assert test_addr.addrBroadcastTuple == ('1.2.3.255', 47809)
+
+            test_addr = Address(("1.2.3.4", 47809))
+            self.match_address(test_addr, 2, None, 6, '01020304BAC1')
+            assert test_addr.addrBroadcastTuple == ('1.2.3.4', 47809)
+
+            test_addr = Address("0x010203040506")
+            self.match_address(test_addr, 2, None, 6, '010203040506')
+
+        # a remote station built from a cached local station does not
+        # change the next one
+        test_addr = Address(5, "3")
+        self.match_address(test_addr, 4, 5, 1, '03')
+        test_addr = Address("3")
+        self.match_address(test_addr, 2, None, 1, '03')
+
+    def test_address_cache_hash(self):
+        if _debug: TestAddressCache._debug("test_address_cache_hash")
+
+        addrs = {}
+        addrs[Address("3:4")] = 1
+        addrs[Address("1.2.3.4")] = 2
+
+        assert addrs[RemoteStation(3, 4)] == 1
+        assert addrs[RemoteStation(3, 4, route=Address("6.7.8.9"))] == 1
+        assert addrs[Address(("1.2.3.4", 47808))] == 2
+        assert addrs[Address('0x01020304bac0')] == 2
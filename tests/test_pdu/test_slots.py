@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Slots
+----------
+"""
+
+import copy
+import pickle
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.comm import PDUData
+from bacpypes.pdu import Address, LocalStation, LocalBroadcast, PDU
+from bacpypes.npdu import NPDU
+from bacpypes.apdu import APDU, ConfirmedRequestPDU, ComplexAckPDU, \
+    ReadPropertyRequest
+from bacpypes.primitivedata import ApplicationTag, Tag, Unsigned, Real, \
+    Enumerated, CharacterString, ObjectIdentifier
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestSlots(unittest.TestCase):
+
+    def test_no_dict(self):
+        """The hot classes do not have a dictionary."""
+        if _debug: TestSlots._debug("test_no_dict")
+
+        for obj in (
+                PDUData(), Address("192.168.0.1"), LocalStation(1), LocalBroadcast(),
+                PDU(), NPDU(), APDU(), ConfirmedRequestPDU(), ComplexAckPDU(),
+                ApplicationTag(Tag.unsignedAppTag, b'\x01'),
+                Unsigned(1), Real(1.0), Enumerated(1), CharacterString("x"),
+                ObjectIdentifier(('analogValue', 1)),
+                ):
+            assert not hasattr(obj, '__dict__'), obj.__class__.__name__
+
+        # sequences still have one
+        assert hasattr(ReadPropertyRequest(), '__dict__')
+
+    def test_subclass(self):
+        """Subclasses without slots get a dictionary."""
+        if _debug: TestSlots._debug("test_subclass")
+
+        class VendorEnumerated(Enumerated):
+            enumerations = {'one': 1, 'two': 2}
+
+        class VendorPDU(PDU):
+            pass
+
+        obj = VendorEnumerated('two')
+        assert obj.value == 'two'
+        obj.extra = 1
+        assert obj.extra == 1
+
+        pdu = VendorPDU(xtob('01'), destination=Address(2))
+        pdu.extra = 2
+        assert pdu.extra == 2
+        assert pdu.pduData == xtob('01')
+
+    def test_copy(self):
+        """PDUs and addresses can be copied and pickled."""
+        if _debug: TestSlots._debug("test_copy")
+
+        pdu = PDU(xtob('01.02'), source=Address("10.0.0.1"), destination=LocalBroadcast())
+        for other in (copy.deepcopy(pdu), pickle.loads(pickle.dumps(pdu))):
+            assert other.pduData == pdu.pduData
+            assert other.pduSource == pdu.pduSource
+            assert other.pduDestination == pdu.pduDestination
+            assert other.pduExpectingReply == pdu.pduExpectingReply
+
+        addr = Address("10.0.0.1:47809")
+        assert copy.copy(addr).addrTuple == addr.addrTuple
@@ -185,3 +185,28 @@ class TestEnumerated(unittest.TestCase):
 
         enumerated_endec(2147483647, '7fffffff')
         enumerated_endec(2147483648, '80000000')
+
+    def test_enumerated_expanded(self):
+        if _debug: TestEnumerated._debug("test_enumerated_expanded")
+
+        # the table is built when the class is created
+        assert QuickBrownFox._xlate_table['brown'] == 1
+        assert QuickBrownFox._xlate_table[2] == 'fox'
+        assert QuickBrownFox.fox == 2
+
+    def test_enumerated_compare(self):
+        if _debug: TestEnumerated._debug("test_enumerated_compare")
+
+        obj = QuickBrownFox('brown')
+        assert obj == 'brown'
+        assert obj == 1
+        assert obj == QuickBrownFox(1)
+        assert obj != 'fox'
+        assert obj != 2
+
+        # enumeration order, not alphabetic order
+        assert QuickBrownFox('quick') < QuickBrownFox('brown')
+        assert obj < 'fox'
+
+        with self.assertRaises(ValueError):
+            obj == 'slow'
@@ -8,7 +8,7 @@ Test Primitive Data Tag
 
 import unittest
 
-from bacpypes.errors import InvalidTag
+from bacpypes.errors import InvalidTag, DecodingError
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob, btox
 from bacpypes.primitivedata import Tag, ApplicationTag, ContextTag, \
     OpeningTag, ClosingTag, TagList, \
@@ -496,6 +496,62 @@ class TestTagList(unittest.TestCase):
         taglist.push(tag1)
         assert taglist.tagList == [tag1]
 
+    def test_position(self):
+        """Test backing up by restoring the position."""
+        if _debug: TestTagList._debug("test_position")
+
+        tag0 = IntegerTag(0)
+        tag1 = IntegerTag(1)
+        tag2 = IntegerTag(2)
+        taglist = TagList([tag0, tag1, tag2])
+
+        # pop a tag, the rest are still available
+        assert taglist.Pop() == tag0
+        assert len(taglist) == 2
+        assert taglist[0] == tag1
+        assert taglist[-1] == tag2
+        assert taglist[:] == [tag1, tag2]
+        assert list(taglist) == [tag1, tag2]
+
+        # save the position, pop the rest, then back up
+        backup = taglist.position
+        assert taglist.Pop() == tag1
+        assert taglist.Pop() == tag2
+        assert taglist.Pop() is None
+        assert not taglist
+
+        taglist.position = backup
+        assert taglist.tagList == [tag1, tag2]
+
+        # copies start with the remaining tags
+        assert TagList(taglist).tagList == [tag1, tag2]
+
+        # pushing a different tag inserts it
+        taglist.push(tag0)
+        assert taglist.tagList == [tag0, tag1, tag2]
+
+    def test_pop_balanced(self):
+        """Test removing the tags up to an unbalanced closing tag."""
+        if _debug: TestTagList._debug("test_pop_balanced")
+
+        tag0 = OpeningTag(1)
+        tag1 = IntegerTag(1)
+        tag2 = ClosingTag(1)
+        tag3 = ClosingTag(0)
+        taglist = TagList([tag0, tag1, tag2, tag3])
+
+        assert taglist.pop_balanced() == [tag0, tag1, tag2]
+        assert taglist.tagList == [tag3]
+
+        # nothing to take
+        assert taglist.pop_balanced() == []
+        assert taglist.tagList == [tag3]
+
+        # missing closing tag
+        taglist = TagList([tag0, tag1])
+        with self.assertRaises(DecodingError):
+            taglist.pop_balanced()
+
     def test_get_context(self):
         """Test extracting specific context encoded content.
         """
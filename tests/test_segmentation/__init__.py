@@ -5,3 +5,6 @@ Test Segmentation
 """
 
 from . import test_1
+from . import test_segments
+from . import test_transactions
+from . import test_apdu_timing
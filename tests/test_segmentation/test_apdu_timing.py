@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test APDU Timing
+----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.settings import settings
+from bacpypes.pdu import Address, PDU
+from bacpypes.apdu import APDU, AbortPDU, AbortReason
+from bacpypes.app import DeviceInfo
+from bacpypes.appservice import APDUTiming
+
+from ..time_machine import reset_time_machine, run_time_machine
+from .test_transactions import state_machine_access_point, request, simple_ack
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def abort(address, invoke_id):
+    """Return an abort from a peer as it comes up the stack."""
+    xpdu = AbortPDU(True, invoke_id, AbortReason.applicationExceededReplyTime)
+    xpdu.pduSource = address
+
+    apdu = APDU()
+    xpdu.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+
+    apdu = APDU()
+    apdu.decode(pdu)
+    return apdu
+
+
+@bacpypes_debugging
+class TestAPDUTiming(unittest.TestCase):
+
+    def test_estimate(self):
+        """The timeout follows the round trip time."""
+        if _debug: TestAPDUTiming._debug("test_estimate")
+
+        apdu_timing = APDUTiming()
+        assert apdu_timing.timeout(3000, 200, 12000) == 3000
+
+        apdu_timing.sample(100.0)
+        assert apdu_timing.smoothedRTT == 100.0
+        assert apdu_timing.rttVariance == 50.0
+        assert apdu_timing.timeout(3000, 200, 12000) == 300
+        assert apdu_timing.timeout(3000, 200, 12000, 2) == 1200
+
+        # a steady peer settles down to the minimum
+        for i in range(50):
+            apdu_timing.sample(20.0)
+        assert apdu_timing.timeout(3000, 200, 12000) == 200
+
+        # a slow peer can wait longer than the default
+        for i in range(50):
+            apdu_timing.sample(5000.0)
+        assert apdu_timing.timeout(3000, 200, 12000) > 5000
+        assert apdu_timing.timeout(3000, 200, 12000, 3) == 12000
+
+
+@bacpypes_debugging
+class TestAdaptiveTimeout(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+        self.adaptive_apdu_timeout = settings.adaptive_apdu_timeout
+
+    def tearDown(self):
+        run_time_machine(60.0)
+        settings.adaptive_apdu_timeout = self.adaptive_apdu_timeout
+
+    def test_counters(self):
+        """The retries and timeouts are counted for the peer."""
+        if _debug: TestAdaptiveTimeout._debug("test_counters")
+
+        settings.adaptive_apdu_timeout = False
+        sap, above, below = state_machine_access_point()
+        peer = Address(2)
+
+        sap.sap_indication(request(peer))
+        run_time_machine(60.0)
+
+        # sent four times, three seconds apart
+        assert len(below.requests) == 4
+        assert above.confirmations[0].apduAbortRejectReason == AbortReason.noResponse
+
+        apdu_timing = sap.apdu_timing(peer)
+        assert (apdu_timing.retries, apdu_timing.timeouts) == (3, 1)
+        assert apdu_timing.smoothedRTT is None
+
+    def test_abort(self):
+        """An abort from the peer counts the retries before it and is not a
+        sample of the round trip time."""
+        if _debug: TestAdaptiveTimeout._debug("test_abort")
+
+        settings.adaptive_apdu_timeout = True
+        sap, above, below = state_machine_access_point()
+        peer = Address(2)
+
+        # aborted right away
+        sap.sap_indication(request(peer))
+        run_time_machine(0.5)
+        sap.confirmation(abort(peer, 1))
+        assert above.confirmations[0].apduType == AbortPDU.pduType
+
+        apdu_timing = sap.apdu_timing(peer)
+        assert (apdu_timing.retries, apdu_timing.timeouts) == (0, 0)
+        assert apdu_timing.smoothedRTT is None
+
+        # aborted after it was sent again
+        sap.sap_indication(request(peer))
+        run_time_machine(3.5)
+        assert len(below.requests) == 3
+        sap.confirmation(abort(peer, 2))
+        assert above.confirmations[1].apduType == AbortPDU.pduType
+
+        assert (apdu_timing.retries, apdu_timing.timeouts) == (1, 0)
+        assert apdu_timing.smoothedRTT is None
+
+        # a timeout after a sample leaves the sample alone
+        sap.sap_indication(request(peer))
+        run_time_machine(0.1)
+        sap.confirmation(simple_ack(peer, 3))
+        smoothed_rtt = apdu_timing.smoothedRTT
+        assert round(smoothed_rtt) == 100
+
+        sap.sap_indication(request(peer))
+        run_time_machine(60.0)
+        assert above.confirmations[3].apduAbortRejectReason == AbortReason.noResponse
+
+        assert (apdu_timing.retries, apdu_timing.timeouts) == (4, 1)
+        assert apdu_timing.smoothedRTT == smoothed_rtt
+
+    def test_adaptive(self):
+        """The timeout and retries are shorter for a fast peer."""
+        if _debug: TestAdaptiveTimeout._debug("test_adaptive")
+
+        settings.adaptive_apdu_timeout = True
+        sap, above, below = state_machine_access_point()
+        peer = Address(2)
+
+        # the peer answers in 100ms
+        sap.sap_indication(request(peer))
+        run_time_machine(0.1)
+        sap.confirmation(simple_ack(peer, 1))
+
+        apdu_timing = sap.apdu_timing(peer)
+        assert apdu_timing.smoothedRTT == 100.0
+
+        # the next one is sent again after 300ms, then after 600ms more
+        sap.sap_indication(request(peer))
+        run_time_machine(0.35)
+        assert len(below.requests) == 3
+        run_time_machine(0.6)
+        assert len(below.requests) == 4
+
+        # the response to a retry is not a sample
+        sap.confirmation(simple_ack(peer, 2))
+        assert apdu_timing.smoothedRTT == 100.0
+        assert apdu_timing.retries == 2
+
+    def test_device_info(self):
+        """The estimate is kept in the device information."""
+        if _debug: TestAdaptiveTimeout._debug("test_device_info")
+
+        settings.adaptive_apdu_timeout = True
+        sap, above, below = state_machine_access_point()
+        peer = Address(2)
+
+        # first request before the device is known
+        sap.sap_indication(request(peer))
+        run_time_machine(0.1)
+        sap.confirmation(simple_ack(peer, 1))
+
+        device_info = DeviceInfo(100, peer)
+        sap.deviceInfoCache.cache[peer] = device_info
+        sap.deviceInfoCache.update_device_info(device_info)
+
+        sap.sap_indication(request(peer))
+        run_time_machine(0.2)
+        sap.confirmation(simple_ack(peer, 2))
+
+        assert device_info.apduTiming is sap.apdu_timing(peer, device_info)
+        assert device_info.apduTiming.smoothedRTT == 112.5
+        assert peer not in sap.apduTimings
+
+    def test_limit(self):
+        """The peers not in the cache that were used least recently are
+        forgotten."""
+        if _debug: TestAdaptiveTimeout._debug("test_limit")
+
+        sap, above, below = state_machine_access_point()
+        sap.apduTimingsLimit = 2
+
+        apdu_timing = sap.apdu_timing(Address(2))
+        sap.apdu_timing(Address(3))
+
+        # using a peer again keeps it
+        assert sap.apdu_timing(Address(2)) is apdu_timing
+        sap.apdu_timing(Address(4))
+        assert list(sap.apduTimings) == [Address(2), Address(4)]
+
+        # the peer starts over when it is used after it was forgotten
+        sap.apdu_timing(Address(3))
+        assert list(sap.apduTimings) == [Address(4), Address(3)]
+        assert sap.apdu_timing(Address(2)) is not apdu_timing
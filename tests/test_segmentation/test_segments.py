@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Segments
+-------------
+"""
+
+import sys
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.pdu import Address
+from bacpypes.apdu import ComplexAckPDU
+from bacpypes.app import DeviceInfoCache
+from bacpypes.appservice import SSM, StateMachineAccessPoint
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def segmentation_state_machine():
+    """Return a state machine for a transaction with a peer."""
+    sap = StateMachineAccessPoint(deviceInfoCache=DeviceInfoCache())
+    ssm = SSM(sap, Address(2))
+    ssm.invokeID = 3
+    ssm.segmentSize = 4
+    ssm.actualWindowSize = 2
+
+    return ssm
+
+
+@bacpypes_debugging
+class TestSegments(unittest.TestCase):
+
+    def test_get_segment(self):
+        """Segments are views of the content with their own headers."""
+        if _debug: TestSegments._debug("test_get_segment")
+
+        ssm = segmentation_state_machine()
+
+        ack = ComplexAckPDU(12, 3)
+        ack.put_data(xtob('0102030405060708090a'))
+        ssm.set_segmentation_context(ack)
+        ssm.segmentCount = 3
+
+        segments = [ssm.get_segment(i) for i in range(3)]
+        assert [bytes(segment.pduData) for segment in segments] == \
+            [xtob('01020304'), xtob('05060708'), xtob('090a')]
+
+        # the py34 tree slices a view of the content rather than copying it
+        if sys.version_info[0] == 3:
+            assert isinstance(segments[0].pduData, memoryview)
+
+        # the header fields are the same but the sequence is not
+        for indx, segment in enumerate(segments):
+            assert segment.apduService == 12
+            assert segment.apduInvokeID == 3
+            assert segment.pduDestination == Address(2)
+            assert segment.apduSeg
+            assert segment.apduSeq == indx
+            assert segment.apduMor == (indx < 2)
+
+        # a retransmission is a new segment
+        assert ssm.get_segment(1) is not segments[1]
+        assert segments[0].apduWin == ssm.ssmSAP.proposedWindowSize
+        assert segments[1].apduWin == 2
+
+    def test_join_segments(self):
+        """Received segments are joined together once."""
+        if _debug: TestSegments._debug("test_join_segments")
+
+        ssm = segmentation_state_machine()
+
+        first = ComplexAckPDU(12, 3)
+        first.put_data(xtob('0102'))
+        ssm.set_segmentation_context(first)
+
+        for data in ('0304', '05'):
+            segment = ComplexAckPDU(12, 3)
+            segment.put_data(xtob(data))
+            ssm.append_segment(segment)
+
+        # nothing has been joined yet
+        assert first.pduData == xtob('0102')
+
+        assert ssm.join_segments() is first
+        assert first.pduData == xtob('0102030405')
+        if sys.version_info[0] == 3:
+            assert isinstance(first.pduData, bytearray)
+
+        # one segment is left alone
+        ssm.set_segmentation_context(first)
+        assert ssm.join_segments().pduData == xtob('0102030405')
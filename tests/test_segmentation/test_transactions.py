@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Transactions
+-----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import Server, ApplicationServiceElement, bind
+from bacpypes.pdu import Address, PDU
+from bacpypes.apdu import APDU, ConfirmedRequestPDU, SimpleAckPDU
+from bacpypes.app import DeviceInfoCache
+from bacpypes.appservice import StateMachineAccessPoint
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class Collect(ApplicationServiceElement, Server):
+
+    """Collect what goes up and down the stack."""
+
+    def __init__(self):
+        ApplicationServiceElement.__init__(self)
+        Server.__init__(self)
+        self.confirmations = []
+        self.requests = []
+
+    def confirmation(self, apdu):
+        self.confirmations.append(apdu)
+
+    def indication(self, pdu):
+        self.requests.append(pdu)
+
+
+def state_machine_access_point():
+    """Return a state machine access point with something above and
+    below it."""
+    sap = StateMachineAccessPoint(deviceInfoCache=DeviceInfoCache())
+    above = Collect()
+    below = Collect()
+    bind(above, sap)
+    bind(sap, below)
+
+    return sap, above, below
+
+
+def request(address, invoke_id=None):
+    """Return a confirmed request to a peer."""
+    apdu = ConfirmedRequestPDU(12)
+    apdu.pduDestination = address
+    apdu.apduInvokeID = invoke_id
+    return apdu
+
+
+def simple_ack(address, invoke_id):
+    """Return a simple ack from a peer as it comes up the stack."""
+    ack = SimpleAckPDU(12, invoke_id)
+    ack.pduSource = address
+
+    apdu = APDU()
+    ack.encode(apdu)
+    pdu = PDU()
+    apdu.encode(pdu)
+
+    apdu = APDU()
+    apdu.decode(pdu)
+    return apdu
+
+
+@bacpypes_debugging
+class TestTransactions(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+
+    def tearDown(self):
+        run_time_machine(60.0)
+
+    def test_invoke_ids(self):
+        """Invoke IDs skip the ones in use for the peer."""
+        if _debug: TestTransactions._debug("test_invoke_ids")
+
+        sap, above, below = state_machine_access_point()
+        peer1, peer2 = Address(2), Address(3)
+
+        # the application picked one for the first peer
+        sap.sap_indication(request(peer1, 2))
+        with self.assertRaises(RuntimeError):
+            sap.sap_indication(request(peer1, 2))
+
+        for address in (peer1, peer1, peer2):
+            sap.sap_indication(request(address))
+        assert [apdu.apduInvokeID for apdu in below.requests] == [2, 1, 3, 4]
+
+        assert sorted(sap.clientTransactions) == \
+            [(peer1, 1), (peer1, 2), (peer1, 3), (peer2, 4)]
+        assert sap.clientTransactions[(peer1, 3)].pdu_address == peer1
+        assert sap.transaction_counts() == {peer1: (3, 0), peer2: (1, 0)}
+
+    def test_no_invoke_id(self):
+        """All of the invoke IDs for a peer can be used."""
+        if _debug: TestTransactions._debug("test_no_invoke_id")
+
+        sap, above, below = state_machine_access_point()
+        peer1, peer2 = Address(2), Address(3)
+
+        for i in range(256):
+            sap.sap_indication(request(peer1))
+        assert len(sap.clientInvokeIDs[peer1]) == 256
+
+        with self.assertRaises(RuntimeError):
+            sap.get_next_invoke_id(peer1)
+
+        # other peers are not affected
+        assert sap.get_next_invoke_id(peer2) == 1
+
+    def test_ack(self):
+        """An ack completes the transaction and it is removed."""
+        if _debug: TestTransactions._debug("test_ack")
+
+        sap, above, below = state_machine_access_point()
+        peer1, peer2 = Address(2), Address(3)
+
+        sap.sap_indication(request(peer1))
+        sap.sap_indication(request(peer2))
+
+        # not for any transaction
+        sap.confirmation(simple_ack(peer1, 2))
+        assert not above.confirmations
+
+        sap.confirmation(simple_ack(peer2, 2))
+        assert len(above.confirmations) == 1
+        assert above.confirmations[0].pduSource == peer2
+
+        assert list(sap.clientTransactions) == [(peer1, 1)]
+        assert sap.transaction_counts() == {peer1: (1, 0)}
@@ -152,6 +152,35 @@ class TestWhoIsIAm(unittest.TestCase):
         anet.run()
 
 
+    def test_whois_changed(self):
+        """Test the I-Am is encoded again when the device changes."""
+        if _debug: TestWhoIsIAm._debug("test_whois_changed")
+
+        # create a network
+        anet = ApplicationNetwork("test_whois_changed")
+
+        # add the service capability to the IUT
+        anet.iut.add_capability(WhoIsIAmServices)
+
+        # send a WhoIs, get back an IAm, change the vendor, do it again
+        anet.td.start_state.doc("4-2-0") \
+            .send(WhoIsRequest(destination=anet.vlan.broadcast_address)).doc("4-2-1") \
+            .receive(IAmRequest, pduSource=anet.iut.address, vendorID=999).doc("4-2-2") \
+            .call(setattr, anet.iut_device_object, 'vendorIdentifier', 888).doc("4-2-3") \
+            .send(WhoIsRequest(destination=anet.vlan.broadcast_address)).doc("4-2-4") \
+            .receive(IAmRequest, pduSource=anet.iut.address, vendorID=888).doc("4-2-5") \
+            .success()
+
+        # no IUT application layer matching
+        anet.iut.start_state.success()
+
+        # run the group
+        anet.run()
+
+        # the new parameters are kept
+        assert anet.iut._i_am_data is not None
+
+
 @bacpypes_debugging
 class TestWhoHasIHave(unittest.TestCase):
 
@@ -205,6 +234,37 @@ class TestWhoHasIHave(unittest.TestCase):
         # run the group
         anet.run()
 
+    def test_who_has_object_renamed(self):
+        """Test the I-Have is encoded again when the object is renamed."""
+        if _debug: TestWhoIsIAm._debug("test_who_has_object_renamed")
+
+        # create a network
+        anet = ApplicationNetwork("test_who_has_object_renamed")
+
+        # add the service capability to the IUT
+        anet.iut.add_capability(WhoHasIHaveServices)
+
+        # ask for the device
+        who_has = WhoHasRequest(
+            destination=anet.vlan.broadcast_address,
+            object=WhoHasObject(objectIdentifier=('device', 20)),
+            )
+
+        # send the Who-Has, rename the object, send it again
+        anet.td.start_state.doc("6-2-0") \
+            .send(who_has).doc("6-2-1") \
+            .receive(IHaveRequest, pduSource=anet.iut.address, objectName="iut").doc("6-2-2") \
+            .call(setattr, anet.iut_device_object, 'objectName', "iut-2").doc("6-2-3") \
+            .send(who_has).doc("6-2-4") \
+            .receive(IHaveRequest, pduSource=anet.iut.address, objectName="iut-2").doc("6-2-5") \
+            .success()
+
+        # no IUT application layer matching
+        anet.iut.start_state.success()
+
+        # run the group
+        anet.run()
+
 @bacpypes_debugging
 class TestDeviceCommunicationControl(unittest.TestCase):
 
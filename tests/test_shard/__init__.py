@@ -0,0 +1,8 @@
+#!/usr/bin/python
+
+"""
+Test BACpypes Shard Module
+"""
+
+from . import test_route
+from . import test_director
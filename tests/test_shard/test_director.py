@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Shard UDP Director
+-----------------------
+"""
+
+import random
+import socket
+import asyncore
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.core import run_deferred
+from bacpypes.comm import Client, bind
+from bacpypes.shard import Shard, ShardUDPDirector, shard_of
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class SampleClient(Client):
+
+    def __init__(self):
+        if _debug: SampleClient._debug("__init__")
+        Client.__init__(self)
+
+        self.received = []
+
+    def confirmation(self, pdu):
+        if _debug: SampleClient._debug("confirmation %r", pdu)
+
+        self.received.append((pdu.pduSource, bytes(pdu.pduData)))
+
+
+@unittest.skipIf(not hasattr(socket, 'SO_REUSEPORT'), "no SO_REUSEPORT")
+@bacpypes_debugging
+class TestShardUDPDirector(unittest.TestCase):
+
+    def setup_method(self, method):
+        if _debug: TestShardUDPDirector._debug("setup_method %r", method)
+
+        link_port = random.randint(40000, 60000)
+
+        # two shards sharing a port
+        self.directors = []
+        self.clients = []
+        port = 0
+        for index in range(2):
+            director = ShardUDPDirector(('127.0.0.1', port), Shard(index, 2, link_port=link_port))
+            port = director.socket.getsockname()[1]
+
+            client = SampleClient()
+            bind(client, director)
+
+            self.directors.append(director)
+            self.clients.append(client)
+
+        self.address = ('127.0.0.1', port)
+
+        # lots of senders so the kernel spreads them across the shards
+        self.senders = []
+        for i in range(16):
+            sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sender.bind(('127.0.0.1', 0))
+            self.senders.append(sender)
+
+    def teardown_method(self, method):
+        if _debug: TestShardUDPDirector._debug("teardown_method %r", method)
+
+        for director in self.directors:
+            director.close_socket()
+        for sender in self.senders:
+            sender.close()
+
+    def run_loop(self):
+        """Let the shards receive and pass along the datagrams, one at a
+        time for each socket."""
+        for i in range(4 * len(self.senders)):
+            asyncore.loop(timeout=0.001, count=1)
+            run_deferred()
+
+    def test_remote_station(self):
+        """Messages to a remote station end up at the owner."""
+        if _debug: TestShardUDPDirector._debug("test_remote_station")
+
+        for addr in (1, 2, 3, 4):
+            data = xtob('810a000e' '0124' '006401%02x' 'ff' '0005010c0c' % (addr,))
+            for sender in self.senders:
+                sender.sendto(data, self.address)
+            self.run_loop()
+
+            owner = shard_of(bytearray([addr]), 2)
+            received = self.clients[owner].received
+            assert len(received) == len(self.senders)
+            assert set(source for source, _ in received) == \
+                set(sender.getsockname() for sender in self.senders)
+            assert all(msg == data for _, msg in received)
+            assert not self.clients[1 - owner].received
+
+            for client in self.clients:
+                del client.received[:]
+
+    def test_bvll_broadcast_functions(self):
+        """Distribute-Broadcast-To-Network and Forwarded-NPDU messages sent
+        to the unicast port end up at the owner like any other."""
+        if _debug: TestShardUDPDirector._debug("test_bvll_broadcast_functions")
+
+        for addr in (1, 2, 3, 4):
+            npdu = '0124' '006401%02x' 'ff' '0005010c0c' % (addr,)
+            for data in (
+                    xtob('8109000e' + npdu),
+                    xtob('81040014' 'c0a80001bac0' + npdu),
+                    ):
+                for sender in self.senders:
+                    sender.sendto(data, self.address)
+                self.run_loop()
+
+                owner = shard_of(bytearray([addr]), 2)
+                received = self.clients[owner].received
+                assert len(received) == len(self.senders)
+                assert all(msg == data for _, msg in received)
+                assert not self.clients[1 - owner].received
+
+                for client in self.clients:
+                    del client.received[:]
+
+    def test_distribute_global_broadcast(self):
+        """A global broadcast in a unicast Distribute-Broadcast-To-Network
+        message goes to every shard."""
+        if _debug: TestShardUDPDirector._debug("test_distribute_global_broadcast")
+
+        data = xtob('8109000c' '0120' 'ffff00' 'ff' '1008')
+        for sender in self.senders:
+            sender.sendto(data, self.address)
+        self.run_loop()
+
+        for client in self.clients:
+            assert len(client.received) == len(self.senders)
+
+    def test_remote_broadcast(self):
+        """Unicast messages to a remote broadcast go to every shard."""
+        if _debug: TestShardUDPDirector._debug("test_remote_broadcast")
+
+        data = xtob('810a0009' '0120' '006400' 'ff' '1008')
+        for sender in self.senders:
+            sender.sendto(data, self.address)
+        self.run_loop()
+
+        for client in self.clients:
+            assert len(client.received) == len(self.senders)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Shard Routing
+------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.shard import Shard, shard_of, route_by_destination
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestShardOf(unittest.TestCase):
+
+    def test_stable(self):
+        """The same key is always in the same shard."""
+        if _debug: TestShardOf._debug("test_stable")
+
+        assert shard_of(b'\x05', 4) == shard_of(bytearray(b'\x05'), 4)
+        assert shard_of(('analogValue', 1), 4) == shard_of(('analogValue', 1), 4)
+
+    def test_spread(self):
+        """Keys are spread across the shards."""
+        if _debug: TestShardOf._debug("test_spread")
+
+        counts = [0] * 4
+        for i in range(1000):
+            counts[shard_of(('analogValue', i), 4)] += 1
+
+        assert min(counts) > 200
+
+    def test_owns(self):
+        """Each key is owned by exactly one shard."""
+        if _debug: TestShardOf._debug("test_owns")
+
+        shards = [Shard(i, 3) for i in range(3)]
+        assert shards[0].is_coordinator
+        assert not shards[1].is_coordinator
+
+        for i in range(100):
+            assert sum(shard.owns(i) for shard in shards) == 1
+
+        with self.assertRaises(ValueError):
+            Shard(3, 3)
+
+
+@bacpypes_debugging
+class TestRouteByDestination(unittest.TestCase):
+
+    def test_bvll(self):
+        """BVLL messages go to the coordinator."""
+        if _debug: TestRouteByDestination._debug("test_bvll")
+
+        # read-broadcast-distribution-table
+        assert route_by_destination(xtob('81020004'), 4) == 0
+
+        # not BACnet/IP
+        assert route_by_destination(xtob('0102'), 4) == 0
+
+    def test_local(self):
+        """Local traffic goes to the coordinator."""
+        if _debug: TestRouteByDestination._debug("test_local")
+
+        # original-unicast-npdu, no destination
+        assert route_by_destination(xtob('810a000a' '0104' '0005010c0c'), 4) == 0
+
+        # original-broadcast-npdu, who-is
+        assert route_by_destination(xtob('810b0008' '0120' 'ffff00ff' '1008'), 4) is None
+        assert route_by_destination(xtob('810b0006' '0100' '1008'), 4) == 0
+
+    def test_network_message(self):
+        """Network layer messages go to the coordinator."""
+        if _debug: TestRouteByDestination._debug("test_network_message")
+
+        # who-is-router-to-network
+        assert route_by_destination(xtob('810b0006' '0180' '00'), 4) == 0
+
+    def test_remote_station(self):
+        """Messages to a remote station go to the shard that owns it."""
+        if _debug: TestRouteByDestination._debug("test_remote_station")
+
+        for addr in range(1, 20):
+            data = xtob('810a000e' '0124' '006401%02x' 'ff' '0005010c0c' % (addr,))
+            assert route_by_destination(data, 4) == shard_of(bytearray([addr]), 4)
+
+        # forwarded-npdu has the original source in front
+        data = xtob('8104' '0014' 'c0a80001bac0' '0124' '006401%02x' 'ff' '0005010c0c' % (5,))
+        assert route_by_destination(data, 4) == shard_of(bytearray([5]), 4)
+
+    def test_remote_broadcast(self):
+        """Remote broadcasts go to every shard."""
+        if _debug: TestRouteByDestination._debug("test_remote_broadcast")
+
+        assert route_by_destination(xtob('810b0009' '0120' '006400' 'ff' '1008'), 4) is None
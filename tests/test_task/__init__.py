@@ -0,0 +1,8 @@
+#!/usr/bin/python
+
+"""
+Test BACpypes Task Module
+"""
+
+from . import test_timing_wheel
+from . import test_clock
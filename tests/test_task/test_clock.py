@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Clocks
+-----------
+"""
+
+import time
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.settings import settings
+from bacpypes.task import TaskManager, FunctionTask, WallClock, MonotonicClock, \
+    VirtualClock, VirtualTaskManager, default_clock
+
+from ..time_machine import reset_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestClock(unittest.TestCase):
+
+    def test_wall_clock(self):
+        """The wall clock is seconds since the epoch."""
+        if _debug: TestClock._debug("test_wall_clock")
+
+        before = time.time()
+        now = WallClock().time()
+        after = time.time()
+        assert before <= now <= after
+
+    def test_monotonic_clock(self):
+        """The monotonic clock never goes backwards."""
+        if _debug: TestClock._debug("test_monotonic_clock")
+
+        clock = MonotonicClock()
+        then = clock.time()
+        now = clock.time()
+        assert then <= now
+
+    def test_virtual_clock(self):
+        """The virtual clock only moves when told."""
+        if _debug: TestClock._debug("test_virtual_clock")
+
+        clock = VirtualClock(10.0)
+        assert clock.time() == 10.0
+
+        clock.advance(2.5)
+        assert clock.time() == 12.5
+
+        clock.set_time(100.0)
+        assert clock.time() == 100.0
+
+    def test_default_clock(self):
+        """The default clock comes from the settings."""
+        if _debug: TestClock._debug("test_default_clock")
+
+        save_clock = settings.clock
+        try:
+            assert isinstance(default_clock(), WallClock)
+
+            settings.clock = "monotonic"
+            assert isinstance(default_clock(), MonotonicClock)
+
+            settings.clock = "virtual"
+            assert isinstance(default_clock(), VirtualClock)
+
+            settings.clock = "sundial"
+            with self.assertRaises(ValueError):
+                default_clock()
+        finally:
+            settings.clock = save_clock
+
+
+@bacpypes_debugging
+class TestVirtualTaskManager(unittest.TestCase):
+
+    def test_time_machine_clock(self):
+        """The time machine is a virtual task manager."""
+        if _debug: TestVirtualTaskManager._debug("test_time_machine_clock")
+
+        time_machine = TaskManager()
+        assert isinstance(time_machine, VirtualTaskManager)
+        assert isinstance(time_machine.clock, VirtualClock)
+
+        reset_time_machine(50.0)
+        assert time_machine.get_time() == 50.0
+
+    def test_jump_ahead(self):
+        """Getting the next task moves the clock to it."""
+        if _debug: TestVirtualTaskManager._debug("test_jump_ahead")
+
+        time_machine = TaskManager()
+        reset_time_machine()
+
+        ft1 = FunctionTask(lambda: None)
+        ft1.install_task(when=5.0)
+        ft2 = FunctionTask(lambda: None)
+        ft2.install_task(when=3600.0)
+
+        # no waiting, the clock jumps
+        assert VirtualTaskManager.get_next_task(time_machine) == (ft1, 0.0)
+        assert time_machine.get_time() == 5.0
+
+        assert VirtualTaskManager.get_next_task(time_machine) == (ft2, 0.0)
+        assert time_machine.get_time() == 3600.0
+
+        # nothing left to do
+        assert VirtualTaskManager.get_next_task(time_machine) == (None, None)
+        assert time_machine.get_time() == 3600.0
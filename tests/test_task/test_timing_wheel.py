@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Timing Wheel
+-----------------
+"""
+
+import random
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.task import TimingWheel
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestTimingWheel(unittest.TestCase):
+
+    def test_due(self):
+        """Tasks at or before the current tick are not added."""
+        if _debug: TestTimingWheel._debug("test_due")
+
+        wheel = TimingWheel(0.01, 100.0)
+        assert wheel.add('a', 99.0, 1) is None
+        assert wheel.add('b', 100.0, 2) is None
+        assert wheel.add('c', 100.005, 3) == 10001
+        assert len(wheel) == 1
+        assert 'c' in wheel
+
+    def test_remove(self):
+        """Removed tasks are not returned."""
+        if _debug: TestTimingWheel._debug("test_remove")
+
+        wheel = TimingWheel(0.01, 0.0)
+        wheel.add('a', 1.0, 1)
+        wheel.add('b', 2.0, 2)
+        assert wheel.remove('a')
+        assert not wheel.remove('a')
+
+        assert wheel.advance(5.0) == [(2.0, 2, 'b')]
+        assert len(wheel) == 0
+
+    def test_order(self):
+        """Due tasks come out in time order, never early."""
+        if _debug: TestTimingWheel._debug("test_order")
+
+        wheel = TimingWheel(0.01, 0.0)
+        wheel.add('c', 0.5, 1)
+        wheel.add('a', 0.1, 2)
+        wheel.add('b', 0.1, 3)
+
+        assert wheel.advance(0.09) == []
+        assert wheel.advance(0.1) == [(0.1, 2, 'a'), (0.1, 3, 'b')]
+        assert wheel.next_tick() == 50
+        assert wheel.advance(0.499) == []
+        assert wheel.advance(0.5) == [(0.5, 1, 'c')]
+        assert wheel.next_tick() is None
+
+    def test_cascade(self):
+        """Tasks in the higher levels are cascaded down."""
+        if _debug: TestTimingWheel._debug("test_cascade")
+
+        random.seed(1234)
+        times = sorted(random.random() * 100000.0 for i in range(1000))
+
+        wheel = TimingWheel(0.01, 0.0)
+        for i, when in enumerate(times):
+            wheel.add(i, when, i)
+
+        # step along in uneven chunks
+        due = []
+        now = 0.0
+        while wheel:
+            now += random.random() * 500.0
+            for when, n, task in wheel.advance(now):
+                assert when <= now
+                due.append(when)
+
+        assert due == times
+
+    def test_beyond(self):
+        """Tasks beyond the end of the wheel still come out on time."""
+        if _debug: TestTimingWheel._debug("test_beyond")
+
+        wheel = TimingWheel(1.0, 0.0)
+        far = float(wheel.span * 2 + 5)
+        wheel.add('far', far, 1)
+
+        assert wheel.advance(far - 1.0) == []
+        assert wheel.advance(far) == [(far, 1, 'far')]
@@ -12,7 +12,8 @@ import pytest
 
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger
 
-from bacpypes.task import OneShotTask, FunctionTask, RecurringTask
+from bacpypes.task import OneShotTask, FunctionTask, RecurringTask, \
+    RecurringFunctionTask, phase_even, phase_hash
 from ..time_machine import TimeMachine, reset_time_machine, run_time_machine, \
     xdatetime
 
@@ -94,9 +95,9 @@ def sample_task_function(*args, **kwargs):
 @bacpypes_debugging
 class SampleRecurringTask(RecurringTask):
 
-    def __init__(self):
-        if _debug: SampleRecurringTask._debug("__init__")
-        RecurringTask.__init__(self)
+    def __init__(self, phase=None):
+        if _debug: SampleRecurringTask._debug("__init__ phase=%r", phase)
+        RecurringTask.__init__(self, phase=phase)
 
         self.process_task_called = []
 
@@ -264,6 +265,135 @@ class TestTimeMachine(unittest.TestCase):
         assert almost_equal(ft.process_task_called, [0.9, 1.9, 2.9, 3.9, 4.9])
         assert time_machine.current_time == 5.0
 
+    def test_recurring_task_phase(self):
+        if _debug: TestTimeMachine._debug("test_recurring_task_phase")
+
+        # create a function task a quarter of the way into the interval
+        ft = SampleRecurringTask(phase=0.25)
+
+        # reset the time machine, install the task, let it run
+        reset_time_machine()
+        ft.install_task(1000.0)
+        run_time_machine(5.0)
+
+        # function called, 5 seconds have passed
+        assert almost_equal(ft.process_task_called, [0.25, 1.25, 2.25, 3.25, 4.25])
+        assert time_machine.current_time == 5.0
+
+    def test_recurring_task_offset_and_phase(self):
+        if _debug: TestTimeMachine._debug("test_recurring_task_offset_and_phase")
+
+        # create a function task, the offset wins over the phase
+        ft = SampleRecurringTask(phase=0.5)
+
+        # reset the time machine, install the task, let it run
+        reset_time_machine()
+        ft.install_task(1000.0, offset=100.0)
+        run_time_machine(3.0)
+
+        # function called, 3 seconds have passed
+        assert almost_equal(ft.process_task_called, [0.1, 1.1, 2.1])
+
+    def test_recurring_function_task_phase(self):
+        if _debug: TestTimeMachine._debug("test_recurring_function_task_phase")
+
+        called = []
+
+        # create a recurring function task half way into the interval
+        ft = RecurringFunctionTask(2000.0, lambda: called.append(time_machine.current_time), _phase=0.5)
+
+        # reset the time machine, install the task, let it run
+        reset_time_machine()
+        ft.install_task()
+        run_time_machine(5.0)
+
+        # function called at 1 and 3 seconds
+        assert almost_equal(called, [1.0, 3.0])
+
+    def test_phase_hash(self):
+        if _debug: TestTimeMachine._debug("test_phase_hash")
+
+        # the same key gets the same phase
+        assert phase_hash("10.0.1.2") == phase_hash("10.0.1.2")
+        assert phase_hash(("device", 12)) == phase_hash(("device", 12))
+
+        # the phases are fractions
+        for i in range(100):
+            assert 0.0 <= phase_hash(i) < 1.0
+
+    def test_phase_even(self):
+        if _debug: TestTimeMachine._debug("test_phase_even")
+
+        # however many phases are used, each tenth of the interval has
+        # some and none have too many
+        phases = [phase_even() for i in range(100)]
+        buckets = [0] * 10
+        for phase in phases:
+            assert 0.0 <= phase < 1.0
+            buckets[int(phase * 10)] += 1
+
+        assert min(buckets) >= 8
+        assert max(buckets) <= 12
+
+    def test_suspend_task(self):
+        if _debug: TestTimeMachine._debug("test_suspend_task")
+
+        # create some tasks
+        ft1 = SampleOneShotTask()
+        ft2 = SampleOneShotTask()
+
+        # reset the time machine, install the tasks, suspend one
+        reset_time_machine()
+        ft1.install_task(1.0)
+        ft2.install_task(2.0)
+        ft1.suspend_task()
+        assert not ft1.isScheduled
+        run_time_machine(5.0)
+
+        # only the second one was called
+        assert ft1.process_task_called == []
+        assert almost_equal(ft2.process_task_called, [2.0])
+
+        # suspending it again is harmless
+        ft1.suspend_task()
+
+    def test_reinstall_task(self):
+        if _debug: TestTimeMachine._debug("test_reinstall_task")
+
+        # create a task
+        ft = SampleOneShotTask()
+
+        # reset the time machine, install the task and then move it
+        reset_time_machine()
+        ft.install_task(1.0)
+        ft.install_task(3.0)
+        ft.install_task(2.0)
+        run_time_machine(5.0)
+
+        # called once at the last time it was given
+        assert almost_equal(ft.process_task_called, [2.0])
+
+    def test_compact_tasks(self):
+        if _debug: TestTimeMachine._debug("test_compact_tasks")
+
+        # lots of tasks
+        tasks = [SampleOneShotTask() for i in range(3000)]
+
+        # reset the time machine, install and suspend most of them
+        reset_time_machine()
+        for i, ft in enumerate(tasks):
+            ft.install_task(1.0 + i / 1000.0)
+        for ft in tasks[:2500]:
+            ft.suspend_task()
+
+        # canceled entries have been cleaned out
+        assert len(time_machine.tasks) < 3000
+        assert len(time_machine.entries) == 500
+        run_time_machine(5.0)
+
+        # only the ones still scheduled were called
+        assert sum(len(ft.process_task_called) for ft in tasks) == 500
+
     @pytest.mark.skip("Do not work on Github Actions. Needs investigation")
     def test_recurring_task_5(self):
         if _debug: TestTimeMachine._debug("test_recurring_task_5")
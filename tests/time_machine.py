@@ -7,12 +7,11 @@ Testing Time Machine
 
 import re
 import time
-from heapq import heappop
 
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger
 
 import bacpypes.core as _core
-from bacpypes.task import TaskManager as _TaskManager
+from bacpypes.task import TaskManager as _TaskManager, VirtualTaskManager as _VirtualTaskManager
 
 # some debugging
 _debug = 0
@@ -28,17 +27,16 @@ _deltatime_regex = re.compile(r"^(\d+(?:[.]\d+))?$")
 
 
 # @bacpypes_debugging - implicit via metaclass
-class TimeMachine(_TaskManager):
+class TimeMachine(_VirtualTaskManager):
 
     def __init__(self):
         if _debug: TimeMachine._debug("__init__")
         global time_machine
 
         # pass along initialization
-        _TaskManager.__init__(self)
+        _VirtualTaskManager.__init__(self, start_time=None)
 
-        # initialize the time
-        self.current_time = None
+        # initialize the time limit
         self.time_limit = None
 
         # a little error checking
@@ -48,11 +46,13 @@ class TimeMachine(_TaskManager):
         # save a reference
         time_machine = self
 
-    def get_time(self):
-        if _debug: TimeMachine._debug("get_time @ %r:", self.current_time)
+    @property
+    def current_time(self):
+        return self.clock.current_time
 
-        # return the fake time
-        return self.current_time
+    @current_time.setter
+    def current_time(self, when):
+        self.clock.set_time(when)
 
     def install_task(self, task):
         if _debug: TimeMachine._debug("install_task @ %r: %r @ %r", self.current_time, task, task.taskTime)
@@ -85,12 +85,13 @@ class TimeMachine(_TaskManager):
             if _debug: TimeMachine._debug("    - time limit reached or exceeded")
             return False
 
-        if not self.tasks:
+        next_task = self.peek_next_task()
+        if not next_task:
             if _debug: TimeMachine._debug("    - no more tasks")
             return False
 
         # peek at the next task and see when it is supposed to run
-        when, n, task = self.tasks[0]
+        when, task = next_task
         if when >= self.time_limit:
             if _debug: TimeMachine._debug("    - next task at or exceeds time limit")
             return False
@@ -110,16 +111,17 @@ class TimeMachine(_TaskManager):
 
         task = None
         delta = None
+        next_task = self.peek_next_task()
 
         if (self.time_limit is not None) and (self.current_time >= self.time_limit):
             if _debug: TimeMachine._debug("    - time limit reached")
 
-        elif not self.tasks:
+        elif not next_task:
             if _debug: TimeMachine._debug("    - no more tasks")
 
         else:
             # peek at the next task and see when it is supposed to run
-            when, n, _ = self.tasks[0]
+            when, _ = next_task
             if when >= self.time_limit:
                 if _debug: TimeMachine._debug("    - time limit reached")
 
@@ -127,13 +129,10 @@ class TimeMachine(_TaskManager):
                 self.current_time = self.time_limit
 
             else:
-                # pull it off the list
-                when, n, task = heappop(self.tasks)
+                # pull it off the list, it is no longer scheduled
+                task = self.pop_next_task()
                 if _debug: TimeMachine._debug("    - when, task: %r, %s", when, task)
 
-                # mark that it is no longer scheduled
-                task.isScheduled = False
-
                 # advance the time
                 self.current_time = when
 
@@ -254,6 +253,8 @@ def reset_time_machine(start_time=0.0):
 
     # begin time at the beginning
     time_machine.tasks = []
+    time_machine.entries = {}
+    time_machine.canceled = 0
     time_machine.current_time = start_time
     time_machine.time_limit = None
 